@@ -0,0 +1,199 @@
+"""
+bench.py — Offline throughput benchmarks on synthetic scenes.
+
+Responsibilities:
+• Time the detection stages (mask, contours, filter, color, classify),
+  detect(), analyze_frame() and analyze_image() on seeded scenes from
+  utils/synth.py; "color_loop" times the per-contour color path as a
+  reference for the batch engine ("color").
+• Report medians, frames/s and objects/s, plus recall / label accuracy
+  against the scene's ground truth.
+• Write machine-readable JSON and compare a run against a stored baseline.
+
+Does NOT:
+• Need a camera, sample images or network access.
+
+Notes:
+• Stage timings follow detect()'s full-resolution path; with a `scale`
+  below 1 only detect/analyze_* reflect the downscaled path.
+• analyze_frame runs with the camera settings, as in the camera command.
+• analyze_* log into a temporary file, never into cfg.paths.log_csv.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+import platform
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import cv2
+import numpy as np
+
+from .detection.colors import FrameContext, classify_color_in_frame, classify_colors_batch
+from .detection.shapes import ContourFeatures, filter_contours
+from .pipeline import _classify, _color_mask, _detect_kwargs, _filled_roi_mask, _mask_sv, analyze_frame, analyze_image, color_lut, detect, open_logger
+from .utils.synth import RESOLUTIONS, SceneSpec, make_scene, match_truth
+
+# Benchmark scenes: name → SceneSpec keyword arguments
+PRESETS: Dict[str, List[dict]] = {
+    "quick": [
+        dict(resolution="vga", objects=10),
+        dict(resolution="hd", objects=100, noise=6.0, outline=2),
+    ],
+    "full": [
+        dict(resolution="vga", objects=1),
+        dict(resolution="vga", objects=10),
+        dict(resolution="hd", objects=100),
+        dict(resolution="hd", objects=100, noise=6.0, outline=2),
+        dict(resolution="fhd", objects=500),
+        dict(resolution="4k", objects=1000),
+        dict(resolution="8k", objects=2000),
+    ],
+}
+
+# Timed metrics compared against a baseline (milliseconds, lower is better)
+TIMED = ("mask", "contours", "filter", "color", "classify", "detect", "analyze_frame", "analyze_image")
+
+
+def scene_spec(resolution: str = "vga", seed: int = 0, **kwargs) -> SceneSpec:
+    """SceneSpec from a named resolution ('vga' … '8k') or 'WxH'."""
+    if resolution in RESOLUTIONS:
+        w, h = RESOLUTIONS[resolution]
+    else:
+        w, h = (int(v) for v in resolution.lower().split("x"))
+    return SceneSpec(width=w, height=h, seed=seed, **kwargs)
+
+def _median_ms(fn: Callable[[], object], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return float(np.median(times))
+
+def _color_loop(ctx: FrameContext, kept: List[ContourFeatures], lut) -> list:
+    """Per-contour color classification, the path classify_colors_batch replaces."""
+    out = []
+    for f in kept:
+        x, y, w, h = f.bbox
+        out.append(classify_color_in_frame(ctx, f.bbox, _filled_roi_mask(f.contour, w, h, x, y), lut=lut))
+    return out
+
+def _stage_times(img: np.ndarray, cfg, repeat: int) -> Dict[str, float]:
+    """Median time of each detection stage, following detect()'s full-resolution path."""
+    h, w = img.shape[:2]
+    s_min, v_min = _mask_sv(cfg, False)
+    kwargs = _detect_kwargs(cfg, False)
+    lut = color_lut(cfg)
+
+    ctx = FrameContext.from_bgr(img)
+    mask = _color_mask(img, s_min, v_min, hsv=ctx.hsv)
+    cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    def filt():
+        return filter_contours(cnts, **kwargs, image_area=h * w)[1]
+
+    kept = filt()
+    return {
+        "mask": _median_ms(lambda: _color_mask(img, s_min, v_min, hsv=FrameContext.from_bgr(img).hsv), repeat),
+        "contours": _median_ms(lambda: cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE), repeat),
+        "filter": _median_ms(filt, repeat),
+        "color": _median_ms(lambda: classify_colors_batch(ctx, [f.contour for f in kept], [f.bbox for f in kept], lut=lut), repeat),
+        "color_loop": _median_ms(lambda: _color_loop(ctx, kept, lut), repeat),
+        # fresh features per run so lazy per-contour metrics are not cached
+        "classify": _median_ms(lambda: _classify(ctx, [ContourFeatures(f.contour) for f in kept], lut=lut), repeat),
+    }
+
+def run_scene(spec: SceneSpec, cfg, repeat: int = 5) -> dict:
+    """Benchmark one scene; returns a JSON-ready record."""
+    img, truth = make_scene(spec)
+    cfg = copy.deepcopy(cfg)
+    cfg.video.show_window = False
+
+    result = detect(img, cfg)
+    labels = [(result.shape(i), result.color(i)) for i in range(len(result))]
+    quality = match_truth(truth, result.bboxes, labels)
+
+    ms = _stage_times(img, cfg, repeat)
+    ms["detect"] = _median_ms(lambda: detect(img, cfg), repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scene.png")
+        cv2.imwrite(path, img)
+        cfg.paths.log_csv = os.path.join(tmp, "detections.csv")
+        # analyze_frame renders onto a copy, so `img` can be reused for every run
+        with open_logger(cfg) as logger:
+            ms["analyze_frame"] = _median_ms(lambda: analyze_frame(img, cfg, logger), repeat)
+        ms["analyze_image"] = _median_ms(lambda: analyze_image(path, cfg), repeat)
+
+    name = f"{spec.width}x{spec.height}-n{spec.objects}"
+    if spec.noise or spec.outline:
+        name += f"-noise{spec.noise:g}-outline{spec.outline}"
+    return {
+        "name": name,
+        "spec": asdict(spec),
+        "detected": len(result),
+        **quality,
+        "ms": {k: round(v, 3) for k, v in ms.items()},
+        "fps": {k: round(1000.0 / v, 2) if v > 0 else None for k, v in ms.items() if k in ("detect", "analyze_frame", "analyze_image")},
+        "objects_per_s": round(len(result) * 1000.0 / ms["detect"], 1) if ms["detect"] > 0 else None,
+    }
+
+def run_suite(specs: List[SceneSpec], cfg, repeat: int = 5, progress: Callable[[dict], None] | None = None) -> dict:
+    """Benchmark every scene and wrap the records with environment metadata."""
+    scenes = []
+    for spec in specs:
+        rec = run_scene(spec, cfg, repeat)
+        scenes.append(rec)
+        if progress is not None:
+            progress(rec)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "repeat": repeat,
+        },
+        "scenes": scenes,
+    }
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.25) -> List[str]:
+    """
+    Regressions of `current` against `baseline`, matched by scene name.
+
+    A timed metric regresses when it is more than `tolerance` (fraction)
+    slower than the baseline; recall / label accuracy regress when they drop.
+    Scenes missing from either run are ignored.
+    """
+    base = {s["name"]: s for s in baseline.get("scenes", [])}
+    out = []
+    for s in current.get("scenes", []):
+        b = base.get(s["name"])
+        if b is None:
+            continue
+        for k in TIMED:
+            now, then = s["ms"].get(k), b["ms"].get(k)
+            if now is not None and then and now > then * (1.0 + tolerance):
+                out.append(f"{s['name']}: {k} {now:.2f} ms vs {then:.2f} ms baseline (+{now / then - 1:.0%})")
+        for k in ("recall", "label_accuracy"):
+            if k in b and s.get(k, 0.0) < b[k] - 1e-9:
+                out.append(f"{s['name']}: {k} {s[k]:.3f} vs {b[k]:.3f} baseline")
+    return out
+
+def save_results(results: dict, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+def load_results(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
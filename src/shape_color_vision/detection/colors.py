@@ -3,7 +3,7 @@ colors.py — HSV-based color classification.
 
 Responsibilities:
 • Convert frames to HSV.
-• Apply threshold masks for configured color ranges.
+• Compile the configured color ranges (colors_hsv) into a lookup table.
 • Classify colors inside detected shape regions.
 • Keep color logic separate from shape geometry (SRP).
 
@@ -15,40 +15,244 @@ Does NOT:
 
 import cv2
 import numpy as np
-from typing import Tuple, Optional, Dict
+from typing import Tuple, Optional, Dict, Callable
 
 # Ignore highlights/shadows
 PIX_MIN_S, PIX_MIN_V = 40, 40  # tweak if needed
 
+# Color ids used by the vectorized/batch paths
+COLOR_NAMES = ("unknown", "red", "yellow", "green", "blue", "violet")
+UNKNOWN, RED, YELLOW, GREEN, BLUE, VIOLET = range(len(COLOR_NAMES))
+
+
+class FrameContext:
+    """
+    Per-frame color data shared by masking and color classification.
+
+    Built once per frame so the BGR→HSV conversion and the S/V validity
+    test run on the full frame exactly once; ROI lookups are plain slices
+    (views) into these arrays.
+    """
+
+    __slots__ = ("bgr", "hsv", "valid")
+
+    def __init__(self, bgr: np.ndarray, hsv: np.ndarray, valid: np.ndarray):
+        self.bgr = bgr      # HxWx3 uint8, BGR
+        self.hsv = hsv      # HxWx3 uint8, OpenCV HSV (H in 0..179)
+        self.valid = valid  # HxW uint8, 255 where S >= PIX_MIN_S and V >= PIX_MIN_V
+
+    @classmethod
+    def from_bgr(cls, bgr: np.ndarray, ws=None) -> "FrameContext":
+        """`ws` (a workspace.Workspace) supplies reused buffers for hsv/valid."""
+        if ws is None:
+            hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+            valid = cv2.inRange(hsv, (0, PIX_MIN_S, PIX_MIN_V), (255, 255, 255))
+        else:
+            h, w = bgr.shape[:2]
+            hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV, dst=ws.get("ctx_hsv", (h, w, 3)))
+            valid = cv2.inRange(hsv, (0, PIX_MIN_S, PIX_MIN_V), (255, 255, 255), dst=ws.get("ctx_valid", (h, w)))
+        return cls(bgr, hsv, valid)
+
 def _masked_hsv_pixels(bgr_roi: np.ndarray, roi_mask: Optional[np.ndarray]) -> np.ndarray:
     """Return HSV pixels inside mask with sufficient S and V."""
     hsv = cv2.cvtColor(bgr_roi, cv2.COLOR_BGR2HSV)
-    if roi_mask is None:
-        roi_mask = np.ones(hsv.shape[:2], np.uint8) * 255
-    m = roi_mask.astype(bool)
-    m &= (hsv[..., 1] >= PIX_MIN_S) & (hsv[..., 2] >= PIX_MIN_V)
+    m = (hsv[..., 1] >= PIX_MIN_S) & (hsv[..., 2] >= PIX_MIN_V)
+    if roi_mask is not None:
+        m &= roi_mask.astype(bool)
     return hsv[m]
 
 def _masked_bgr_means(bgr_roi: np.ndarray, roi_mask: Optional[np.ndarray]) -> Tuple[float, float, float]:
     """Mean B, G, R inside mask (float)."""
     if roi_mask is None:
-        mask = np.ones(bgr_roi.shape[:2], np.uint8) * 255
+        b, g, r, _ = cv2.mean(bgr_roi)
     else:
-        mask = (roi_mask > 0).astype(np.uint8) * 255
-    b = float(cv2.mean(bgr_roi[:, :, 0], mask=mask)[0])
-    g = float(cv2.mean(bgr_roi[:, :, 1], mask=mask)[0])
-    r = float(cv2.mean(bgr_roi[:, :, 2], mask=mask)[0])
-    return b, g, r
+        mask = roi_mask if roi_mask.dtype == np.uint8 else (roi_mask > 0).astype(np.uint8)
+        b, g, r, _ = cv2.mean(bgr_roi, mask=mask)
+    return float(b), float(g), float(r)
+
+# ───────────────────────── compiled lookup table ─────────────────────────
+
+# Hue ranges as [h_lo, s_lo, v_lo, h_hi, s_hi, v_hi]: hue is half-open
+# [h_lo, h_hi) on OpenCV's 0..180 scale, S and V are inclusive. A color may
+# have several ranges (red1/red2 wrap around 180). These defaults reproduce
+# the hand-tuned hue bands; configs/default.yaml carries the same values.
+DEFAULT_HSV_RANGES: Dict[str, list] = {
+    "red1":   [0,   110, 0,   5, 255, 255],
+    "red2":   [175, 110, 0, 180, 255, 255],
+    "yellow": [22,   60, 0,  40, 255, 255],
+    "green":  [40,   60, 0,  95, 255, 255],
+    "blue":   [95,   60, 0, 132, 255, 255],
+    "violet": [132,  60, 0, 155, 255, 255],
+}
+
+# Veto rules (applied before the ranges) and the blue/violet tie-break zone
+MIN_S_OVERALL = 60               # low-saturation overall -> unknown
+MAGENTA_VETO = (155, 175)        # hot pink / magenta: don't call it violet
+LIGHT_PINK_VETO = (150, 175, 120)  # (h_lo, h_hi, s below) less saturated magenta
+ORANGE_VETO = (5.0, 22.0)        # distance to the red axis: orange, not true red
+TIE_ZONE = (125, 140)            # purple vs blue decided by mean R/B
+TIE_RATIO = 0.55                 # R/B >= this -> violet
+
+_TIE = len(COLOR_NAMES)          # LUT marker: resolve with the tie-breaker
+_H2, _S2 = 360, 511              # LUT axes: 2*h (0..179.5), 2*s (0..255)
+
+
+def _ranges_key(hsv_cfg) -> Tuple[Tuple[str, Tuple[int, ...]], ...]:
+    """Canonical, hashable form of a colors_hsv config (dict or HSVRanges)."""
+    if hsv_cfg is not None and not isinstance(hsv_cfg, dict):
+        hsv_cfg = vars(hsv_cfg)
+    items = [(k, v) for k, v in (hsv_cfg or {}).items() if v is not None]
+    if not items:
+        items = list(DEFAULT_HSV_RANGES.items())
+    key = []
+    for name, rng in items:
+        if len(rng) != 6:
+            raise ValueError(f"colors_hsv.{name}: expected [h_lo, s_lo, v_lo, h_hi, s_hi, v_hi], got {rng!r}")
+        key.append((name, tuple(int(round(float(x))) for x in rng)))
+    return tuple(key)
+
+def _color_of(range_name: str) -> int:
+    color = range_name.rstrip("0123456789")
+    if color not in COLOR_NAMES or color == "unknown":
+        raise ValueError(f"colors_hsv.{range_name}: unknown color {color!r}")
+    return COLOR_NAMES.index(color)
+
+
+class ColorLUT:
+    """
+    Color classifier compiled from hue ranges plus the veto rules.
+
+    • ids[2h, 2s]  → color id (or the tie-break marker), one int8 table
+    • conf[c, 2h]  → confidence of color c at hue h (distance to its band edges)
+    • v_lo/v_hi[c] → V gate per color
+    Per-object medians are .5-aligned, so indexing by 2h / 2s is exact.
+    """
+
+    __slots__ = ("key", "ids", "conf", "v_lo", "v_hi")
+
+    def __init__(self, key):
+        self.key = key
+        n_colors = len(COLOR_NAMES)
+        h = np.arange(_H2) / 2.0
+        s = np.arange(_S2) / 2.0
+
+        # color ids: first matching range (in config order) wins
+        ids = np.full((_H2, _S2), -1, dtype=np.int8)
+        bands: Dict[int, list] = {}
+        self.v_lo = np.zeros(n_colors, dtype=np.float64)
+        self.v_hi = np.full(n_colors, 255.0)
+        seen = set()
+        for name, (h_lo, s_lo, v_lo, h_hi, s_hi, v_hi) in key:
+            c = _color_of(name)
+            hit = ((h >= h_lo) & (h < h_hi))[:, None] & ((s >= s_lo) & (s <= s_hi))[None, :]
+            ids[hit & (ids < 0)] = c
+            bands.setdefault(c, []).append((float(h_lo), float(h_hi)))
+            self.v_lo[c] = v_lo if c not in seen else min(self.v_lo[c], v_lo)
+            self.v_hi[c] = v_hi if c not in seen else max(self.v_hi[c], v_hi)
+            seen.add(c)
+        ids[ids < 0] = UNKNOWN
+
+        # vetoes, then the tie-break zone
+        H, S = h[:, None], s[None, :]
+        red_dist = np.minimum(H, 180.0 - H)
+        vetoed = (
+            (S < MIN_S_OVERALL)
+            | ((MAGENTA_VETO[0] <= H) & (H < MAGENTA_VETO[1]))
+            | ((LIGHT_PINK_VETO[0] <= H) & (H < LIGHT_PINK_VETO[1]) & (S < LIGHT_PINK_VETO[2]))
+            | ((ORANGE_VETO[0] <= red_dist) & (red_dist < ORANGE_VETO[1]))
+        )
+        if BLUE in bands and VIOLET in bands:
+            # only cells the ranges gave to blue or violet are re-decided by R/B
+            tie = ((TIE_ZONE[0] <= H) & (H < TIE_ZONE[1])) & ((ids == BLUE) | (ids == VIOLET))
+            ids[tie] = _TIE
+        ids[vetoed] = UNKNOWN
+        self.ids = ids
+
+        # confidence: distance from band edges normalized to [0..1]
+        conf = np.zeros((n_colors, _H2), dtype=np.float64)
+        for c, intervals in bands.items():
+            lo, hi = _bands_at(h, intervals)
+            edge_dist = np.minimum(np.abs(h - lo), np.abs(hi - h))
+            band_half = np.maximum(1e-6, (hi - lo) / 2.0)
+            conf[c] = np.clip(edge_dist / band_half, 0.0, 1.0)
+        conf[UNKNOWN] = 0.0
+        self.conf = conf
+
+    def classify(self, h, s, v, rb_ratio) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized classification of per-object median H, S, V.
+
+        `rb_ratio` is mean(R) / mean(B) over each object's mask; it is only
+        consulted inside TIE_ZONE. Returns (color ids, confidences).
+        """
+        h2 = np.rint(np.asarray(h, dtype=np.float64) * 2).astype(np.intp)
+        s2 = np.rint(np.asarray(s, dtype=np.float64) * 2).astype(np.intp)
+        ids = self.ids[h2, s2]
+
+        tie = ids == _TIE
+        if tie.any():
+            purple = np.asarray(rb_ratio, dtype=np.float64)[tie] >= TIE_RATIO
+            ids[tie] = np.where(purple, VIOLET, BLUE)
+
+        v = np.asarray(v, dtype=np.float64)
+        ids[(v < self.v_lo[ids]) | (v > self.v_hi[ids])] = UNKNOWN
+        return ids, self.conf[ids, h2]
+
+    def classify_pixels(self, hsv: np.ndarray, bgr: np.ndarray) -> np.ndarray:
+        """Per-pixel color ids for an HSV image (tie-break from each pixel's own R/B)."""
+        h, s, v = (hsv[..., i].astype(np.float64) for i in range(3))
+        ratio = bgr[..., 2] / (bgr[..., 0].astype(np.float64) + 1e-6)
+        return self.classify(h, s, v, ratio)[0]
+
+def _bands_at(h: np.ndarray, intervals) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hue band [lo, hi) used for the confidence of one color at every hue.
+
+    An interval ending at 180 joins one starting at 0 into a band across
+    the wrap, listed once per side (red: [-5, 5) and [175, 185)). Hues
+    outside every band (e.g. after the tie-break) use the nearest one.
+    """
+    bands = list(intervals)
+    tail = [b for b in bands if b[1] >= 180.0]
+    head = [b for b in bands if b[0] <= 0.0]
+    if tail and head:
+        (t_lo, _), (_, h_hi) = tail[0], head[0]
+        bands = [b for b in bands if b not in (tail[0], head[0])]
+        bands += [(t_lo - 180.0, h_hi), (t_lo, h_hi + 180.0)]
+
+    lo = np.empty_like(h)
+    hi = np.empty_like(h)
+    best = np.full(h.shape, np.inf)
+    for b_lo, b_hi in bands:
+        # distance from h to the band (0 inside it)
+        d = np.maximum(0.0, np.maximum(b_lo - h, h - b_hi + 1e-9))
+        closer = d < best
+        best[closer] = d[closer]
+        lo[closer], hi[closer] = b_lo, b_hi
+    return lo, hi
+
+_LUT_CACHE: Dict[tuple, ColorLUT] = {}
+
+def compile_color_lut(hsv_cfg=None) -> ColorLUT:
+    """ColorLUT for a colors_hsv config; compiled once per distinct config."""
+    key = _ranges_key(hsv_cfg)
+    lut = _LUT_CACHE.get(key)
+    if lut is None:
+        lut = _LUT_CACHE[key] = ColorLUT(key)
+    return lut
+
+# ───────────────────────── per-ROI classification ─────────────────────────
 
 def classify_color(
     bgr_roi: np.ndarray,
-    hsv_cfg: Dict[str, list],          # kept for API compatibility
+    hsv_cfg: Dict[str, list],
     pastel_s_thresh: int = 0,          # unused
     roi_mask: Optional[np.ndarray] = None
 ) -> Tuple[str, float]:
     """
     Robust color classification:
       - masked pixels only, median HSV
+      - hue ranges from `hsv_cfg` (colors_hsv), compiled into a ColorLUT
       - 'distance to red' for wrap-around
       - orange -> Unknown, hot-pink/magenta -> Unknown
       - blue/violet boundary nudged with a tie-breaker near the edge
@@ -57,6 +261,44 @@ def classify_color(
         return ("unknown", 0.0)
 
     px = _masked_hsv_pixels(bgr_roi, roi_mask)
+    return _classify_hsv_pixels(px, lambda: _masked_bgr_means(bgr_roi, roi_mask), compile_color_lut(hsv_cfg))
+
+def classify_color_in_frame(
+    ctx: FrameContext,
+    bbox: Tuple[int, int, int, int],
+    roi_mask: Optional[np.ndarray] = None,
+    lut: Optional[ColorLUT] = None,
+) -> Tuple[str, float]:
+    """
+    Same rules as classify_color, but samples the shared full-frame HSV and
+    validity mask in `ctx` instead of converting the ROI again.
+
+    `bbox` is (x, y, w, h) in frame coordinates; `roi_mask` (if given) has
+    shape (h, w) like the mask passed to classify_color.
+    """
+    x, y, w, h = bbox
+    if w <= 0 or h <= 0:
+        return ("unknown", 0.0)
+
+    # slices are views — nothing is copied until the boolean gather below
+    hsv_roi = ctx.hsv[y:y + h, x:x + w]
+    m = ctx.valid[y:y + h, x:x + w] > 0
+    if roi_mask is not None:
+        m &= roi_mask > 0
+    px = hsv_roi[m]
+
+    bgr_roi = ctx.bgr[y:y + h, x:x + w]
+    return _classify_hsv_pixels(px, lambda: _masked_bgr_means(bgr_roi, roi_mask), lut or compile_color_lut())
+
+def _classify_hsv_pixels(
+    px: np.ndarray,
+    bgr_means: Callable[[], Tuple[float, float, float]],
+    lut: ColorLUT,
+) -> Tuple[str, float]:
+    """Classify an (N, 3) array of valid HSV pixels by their medians.
+
+    `bgr_means` is only called for the blue/violet tie-breaker.
+    """
     if px.size == 0:
         return ("unknown", 0.0)
 
@@ -64,60 +306,89 @@ def classify_color(
     s = float(np.median(px[:, 1]))
     v = float(np.median(px[:, 2]))
 
-    # Low-saturation overall -> unknown
-    if s < 60:
-        return ("unknown", 0.0)
+    # the tie-breaker needs mean B/R; only compute it inside the ambiguous zone
+    ratio = float("nan")
+    if TIE_ZONE[0] <= h < TIE_ZONE[1]:
+        b, g, r = bgr_means()
+        ratio = r / (b + 1e-6)
 
-    # --- vetoes -------------------------------------------------------------
-    # Hot pink / magenta: don't call it violet
-    if 155 <= h < 175:
-        return ("unknown", 0.0)
+    ids, conf = lut.classify([h], [s], [v], [ratio])
+    return (COLOR_NAMES[int(ids[0])], float(conf[0]))
 
-    # Light-pink guard (less saturated magenta near violet)
-    if 150 <= h < 175 and s < 120:
-        return ("unknown", 0.0)
+# ───────────────────────── batch engine ─────────────────────────
 
-    # Distance to the red axis (handles wrap-around near 0/179)
-    red_dist = min(h, 180.0 - h)  # e.g., h=178 → 2; h=7 → 7
+_ERODE_K = np.ones((3, 3), np.uint8)
 
-    # Orange region around red (but not true red) -> Unknown
-    if 5.0 <= red_dist < 22.0:
-        return ("unknown", 0.0)
+def _roi_buffer(ws, name: str, frame_shape: Tuple[int, int], h: int, w: int) -> np.ndarray:
+    """(h, w) uint8 scratch array; with a workspace, a view into one frame-sized buffer."""
+    if ws is None:
+        return np.empty((h, w), dtype=np.uint8)
+    return ws.get(name, frame_shape).reshape(-1)[: h * w].reshape(h, w)
 
-    # --- hue bands ----------------------------------------------------------
-    color = "unknown"
-    band_lo, band_hi = h, h
+def _hist_medians(hist: np.ndarray) -> np.ndarray:
+    """Row-wise median of the values counted in 256-bin histograms (same result as np.median)."""
+    cum = np.cumsum(hist, axis=1)
+    count = cum[:, -1]
+    lo = (cum <= ((count - 1) // 2)[:, None]).sum(axis=1)
+    hi = (cum <= (count // 2)[:, None]).sum(axis=1)
+    return (lo + hi) / 2.0
 
-    # RED exactly (very close to the red axis)
-    if red_dist < 5.0:
-        color = "red" if s >= 110 else "unknown"
-        if h < 90:
-            band_lo, band_hi = -5.0, 5.0
-        else:
-            band_lo, band_hi = 175.0, 185.0
-
-    elif 22 <= h < 40:
-        color, band_lo, band_hi = "yellow", 22, 40
-    elif 40 <= h < 95:
-        color, band_lo, band_hi = "green", 40, 95
-    elif 95 <= h < 132:
-        color, band_lo, band_hi = "blue", 95, 132
-    elif 132 <= h < 155:
-        color, band_lo, band_hi = "violet", 132, 155
-
-    # Ambiguous zone tie-breaker (purple vs blue)
-    if 125 <= h < 140:
-        b, g, r = _masked_bgr_means(bgr_roi, roi_mask)
-        if (r / (b + 1e-6)) >= 0.55:
-            color = "violet"; band_lo, band_hi = 132, 155
-        else:
-            color = "blue";   band_lo, band_hi = 95, 132
+def classify_colors_batch(
+    ctx: FrameContext,
+    contours,
+    bboxes,
+    lut: Optional[ColorLUT] = None,
+    ws=None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Classify all contours of a frame, then look their colors up in one call.
 
-    if color == "unknown":
-        return ("unknown", 0.0)
+    Produces the same (color, confidence) as calling classify_color_in_frame
+    with pipeline._filled_roi_mask for every contour. Each object is only
+    touched inside its own bounding box: its mask is filled and eroded
+    there, and cv2.calcHist / cv2.mean read H, S, V histograms and mean B/R
+    under it without gathering pixels. Medians come from the cumulative
+    histograms of all objects at once, and the LUT classifies every object
+    in a single vectorized call.
+
+    Returns (color ids into COLOR_NAMES, confidences), one per contour.
+    `ws` (a workspace.Workspace) supplies the ROI mask buffers.
+    """
+    n = len(contours)
+    ids = np.full(n, UNKNOWN, dtype=np.int8)
+    conf = np.zeros(n, dtype=np.float64)
+    if n == 0:
+        return ids, conf
+
+    frame_shape = ctx.hsv.shape[:2]
+    hist = np.zeros((3, n, 256), dtype=np.float32)
+    b_mean = np.zeros(n)
+    r_mean = np.zeros(n)
+    for k, (c, (x, y, w, h)) in enumerate(zip(contours, bboxes)):
+        x, y, w, h = int(x), int(y), int(w), int(h)
+        if w <= 0 or h <= 0:
+            continue
+        fill = _roi_buffer(ws, "color_fill", frame_shape, h, w)
+        fill.fill(0)
+        cv2.drawContours(fill, [c], -1, 255, thickness=-1, offset=(-x, -y))
+        mask = cv2.erode(fill, _ERODE_K, dst=_roi_buffer(ws, "color_mask", frame_shape, h, w), iterations=1)
+
+        # Mean B and R over the eroded mask (tie-breaker)
+        b, _, r, _ = cv2.mean(ctx.bgr[y:y + h, x:x + w], mask=mask)
+        b_mean[k], r_mean[k] = b, r
+
+        # H, S and V histograms over valid (S/V above floor) pixels
+        sel = cv2.bitwise_and(mask, ctx.valid[y:y + h, x:x + w], dst=fill)
+        hsv = ctx.hsv[y:y + h, x:x + w]
+        for ch in range(3):
+            hist[ch, k] = cv2.calcHist([hsv], [ch], sel, [256], [0, 256]).ravel()
+
+    nvalid = hist[0].sum(axis=1)
+    h, s, v = (_hist_medians(hist[ch]) for ch in range(3))
+    ratio = r_mean / (b_mean + 1e-6)
+    ids, conf = (lut or compile_color_lut()).classify(h, s, v, ratio)
 
-    # Confidence: distance from band edges normalized to [0..1]
-    edge_dist = min(abs(h - band_lo), abs(band_hi - h))
-    band_half = max(1e-6, (band_hi - band_lo) / 2.0)
-    conf = max(0.0, min(1.0, edge_dist / band_half))
-    return (color, float(conf))
+    empty = nvalid == 0
+    ids[empty] = UNKNOWN
+    conf[empty] = 0.0
+    return ids, conf
@@ -0,0 +1,146 @@
+"""
+results.py — Compact, array-backed detection results.
+
+Responsibilities:
+• Hold all detections of one frame in a few NumPy arrays
+  (bounding boxes, class ids, confidences, contour points).
+• Offer cheap per-detection accessors (names, labels, contours)
+  for consumers such as drawing and logging.
+
+Does NOT:
+• Detect, classify, draw or log anything itself.
+"""
+
+
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .colors import COLOR_NAMES
+
+SHAPE_NAMES = ("Unknown", "Circle", "Triangle", "Square", "Rectangle")
+SHAPE_IDS = {name: i for i, name in enumerate(SHAPE_NAMES)}
+
+
+class DetectionResult:
+    """
+    Detections of one frame, stored column-wise.
+
+    Arrays (N = number of detections):
+    • bboxes      (N, 4) int32    x, y, w, h
+    • shape_ids   (N,)   int8     index into SHAPE_NAMES
+    • color_ids   (N,)   int8     index into COLOR_NAMES
+    • shape_conf  (N,)   float64
+    • color_conf  (N,)   float64
+    • offsets     (N+1,) int64    contour i is points[offsets[i]:offsets[i+1]]
+    • points      (M, 2) int32    all contour points, concatenated
+    • track_ids   (N,)   int32    tracker id, -1 when not tracked
+    """
+
+    __slots__ = ("bboxes", "shape_ids", "color_ids", "shape_conf", "color_conf", "offsets", "points", "track_ids")
+
+    def __init__(self, bboxes, shape_ids, color_ids, shape_conf, color_conf, offsets, points, track_ids=None):
+        self.bboxes = bboxes
+        self.shape_ids = shape_ids
+        self.color_ids = color_ids
+        self.shape_conf = shape_conf
+        self.color_conf = color_conf
+        self.offsets = offsets
+        self.points = points
+        if track_ids is None:
+            track_ids = np.full(len(shape_ids), -1, dtype=np.int32)
+        self.track_ids = track_ids
+
+    @classmethod
+    def empty(cls) -> "DetectionResult":
+        return cls.from_parts([], [], [], [], [], [])
+
+    @classmethod
+    def from_parts(
+        cls,
+        contours: Sequence[np.ndarray],
+        bboxes: Sequence[Tuple[int, int, int, int]],
+        shape_ids: Sequence[int],
+        color_ids: Sequence[int],
+        shape_conf: Sequence[float],
+        color_conf: Sequence[float],
+        track_ids: Optional[Sequence[int]] = None,
+    ) -> "DetectionResult":
+        n = len(contours)
+        lengths = np.fromiter((len(c) for c in contours), dtype=np.int64, count=n)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        if n:
+            points = np.concatenate([np.asarray(c).reshape(-1, 2) for c in contours]).astype(np.int32, copy=False)
+        else:
+            points = np.zeros((0, 2), dtype=np.int32)
+        return cls(
+            bboxes=np.asarray(bboxes, dtype=np.int32).reshape(n, 4),
+            shape_ids=np.asarray(shape_ids, dtype=np.int8).reshape(n),
+            color_ids=np.asarray(color_ids, dtype=np.int8).reshape(n),
+            shape_conf=np.asarray(shape_conf, dtype=np.float64).reshape(n),
+            color_conf=np.asarray(color_conf, dtype=np.float64).reshape(n),
+            offsets=offsets,
+            points=points,
+            track_ids=None if track_ids is None else np.asarray(track_ids, dtype=np.int32).reshape(n),
+        )
+
+    def arrays(self) -> dict:
+        """All columns by name (for np.savez and the like)."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "DetectionResult":
+        """Inverse of arrays(); `arrays` may be any mapping, e.g. an np.load result."""
+        return cls(**{name: np.asarray(arrays[name]) for name in cls.__slots__})
+
+    def __len__(self) -> int:
+        return int(self.shape_ids.shape[0])
+
+    # ---------- per-detection accessors ----------
+
+    def contour(self, i: int) -> np.ndarray:
+        """Contour i in OpenCV layout (K, 1, 2), as a view into `points`."""
+        return self.points[self.offsets[i]:self.offsets[i + 1]].reshape(-1, 1, 2)
+
+    def contours(self) -> List[np.ndarray]:
+        return [self.contour(i) for i in range(len(self))]
+
+    def shape(self, i: int) -> str:
+        return SHAPE_NAMES[self.shape_ids[i]]
+
+    def color(self, i: int) -> str:
+        return COLOR_NAMES[self.color_ids[i]]
+
+    def confidence(self, i: int) -> float:
+        """Combined confidence, as logged: max(color, shape)."""
+        return float(max(self.color_conf[i], self.shape_conf[i]))
+
+    def label(self, i: int) -> str:
+        shape, color = self.shape(i), self.color(i)
+        return "UNKNOWN Unknown" if (shape == "Unknown" and color == "unknown") else f"{color.upper()} {shape}"
+
+    def track_id(self, i: int) -> Optional[int]:
+        tid = int(self.track_ids[i])
+        return tid if tid >= 0 else None
+
+    def records(self, contours: bool = False) -> List[dict]:
+        """One JSON-ready dict per detection; `contours` adds the outline points."""
+        out = []
+        for i in range(len(self)):
+            rec = {
+                "shape": self.shape(i),
+                "color": self.color(i),
+                "confidence": round(self.confidence(i), 4),
+                "bbox": [int(v) for v in self.bboxes[i]],
+                "track_id": self.track_id(i),
+            }
+            if contours:
+                rec["contour"] = self.contour(i).reshape(-1, 2).tolist()
+            out.append(rec)
+        return out
+
+    def __iter__(self) -> Iterator[Tuple[str, str, float]]:
+        """Yield (shape, color, confidence) per detection."""
+        for i in range(len(self)):
+            yield self.shape(i), self.color(i), self.confidence(i)
@@ -17,17 +17,109 @@ import cv2
 import numpy as np
 from typing import Tuple
 
+# ---------- shared per-contour features ----------
+
+class ContourFeatures:
+    """
+    Lazily computed geometry of one contour.
+
+    Every OpenCV measurement (area, bounding box, hull, perimeter, ...) is
+    computed on first access and cached, so the filter, the classifier and
+    the pipeline can share one record without repeating any call.
+    """
+
+    __slots__ = (
+        "contour", "_area", "_bbox", "_hull_area", "_perimeter",
+        "_approx", "_circle", "_axis_ratio", "_rot_rect",
+    )
+
+    def __init__(self, contour: np.ndarray):
+        self.contour = contour
+        self._area = None
+        self._bbox = None
+        self._hull_area = None
+        self._perimeter = None
+        self._approx = None
+        self._circle = None
+        self._axis_ratio = None
+        self._rot_rect = None
+
+    @classmethod
+    def from_stats(cls, contour: np.ndarray, area: float, bbox) -> "ContourFeatures":
+        """Record with area and bbox already known (e.g. from contour_stats)."""
+        f = cls(contour)
+        f._area = float(area)
+        f._bbox = tuple(int(v) for v in bbox)
+        return f
+
+    @property
+    def area(self) -> float:
+        if self._area is None:
+            self._area = float(cv2.contourArea(self.contour))
+        return self._area
+
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        """(x, y, w, h) as returned by cv2.boundingRect."""
+        if self._bbox is None:
+            self._bbox = tuple(int(v) for v in cv2.boundingRect(self.contour))
+        return self._bbox
+
+    @property
+    def hull_area(self) -> float:
+        if self._hull_area is None:
+            self._hull_area = float(cv2.contourArea(cv2.convexHull(self.contour)))
+        return self._hull_area
+
+    @property
+    def perimeter(self) -> float:
+        if self._perimeter is None:
+            self._perimeter = float(cv2.arcLength(self.contour, True))
+        return self._perimeter
+
+    @property
+    def approx(self) -> np.ndarray:
+        """approxPolyDP with epsilon = 2% of the perimeter."""
+        if self._approx is None:
+            self._approx = cv2.approxPolyDP(self.contour, 0.02 * self.perimeter, True)
+        return self._approx
+
+    @property
+    def enclosing_circle(self) -> Tuple[Tuple[float, float], float]:
+        """((cx, cy), r) from cv2.minEnclosingCircle."""
+        if self._circle is None:
+            self._circle = cv2.minEnclosingCircle(self.contour)
+        return self._circle
+
+    @property
+    def axis_ratio(self) -> float:
+        if self._axis_ratio is None:
+            self._axis_ratio = _ellipse_axis_ratio(self.contour)
+        return self._axis_ratio
+
+    @property
+    def rot_rect(self) -> Tuple[float, float]:
+        if self._rot_rect is None:
+            self._rot_rect = _rot_rect_aspect_angle(self.contour)
+        return self._rot_rect
+
+def _features(cnt) -> ContourFeatures:
+    return cnt if isinstance(cnt, ContourFeatures) else ContourFeatures(cnt)
+
 # ---------- filters (used by pipeline) ----------
 
+MAX_ASPECT = 6.0  # bbox aspect ratio above which contour_is_valid rejects
+
 def _radial_uniformity(cnt) -> float:
     """
     Return std(radius)/mean(radius) for all contour points measured
     from the minEnclosingCircle center. Circles ~ 0.000.06, polygons higher.
     """
-    if len(cnt) < 5:
+    f = _features(cnt)
+    if len(f.contour) < 5:
         return 1.0
-    (cx, cy), _ = cv2.minEnclosingCircle(cnt)
-    pts = cnt.reshape(-1, 2).astype(np.float32)
+    (cx, cy), _ = f.enclosing_circle
+    pts = f.contour.reshape(-1, 2).astype(np.float32)
     r = np.hypot(pts[:, 0] - cx, pts[:, 1] - cy)
     m = float(np.mean(r) + 1e-9)
     s = float(np.std(r))
@@ -35,12 +127,10 @@ def _radial_uniformity(cnt) -> float:
 
 
 def _solidity(cnt) -> float:
-    area = cv2.contourArea(cnt)
-    hull = cv2.convexHull(cnt)
-    harea = cv2.contourArea(hull)
-    if harea <= 0:
+    f = _features(cnt)
+    if f.hull_area <= 0:
         return 0.0
-    return float(area / harea)
+    return float(f.area / f.hull_area)
 
 def contour_is_valid(
     cnt,
@@ -53,12 +143,16 @@ def contour_is_valid(
     min_height: int = 18,
     **_ignored
 ) -> bool:
-    """Reject contours that are too small, thin, or likely to be text/noise."""
-    area = cv2.contourArea(cnt)
+    """Reject contours that are too small, thin, or likely to be text/noise.
+
+    `cnt` may be a raw contour or a ContourFeatures record.
+    """
+    f = _features(cnt)
+    area = f.area
     if area < float(min_area):
         return False
 
-    x, y, w, h = cv2.boundingRect(cnt)
+    x, y, w, h = f.bbox
     if w < min_width or h < min_height:
         return False
 
@@ -66,8 +160,7 @@ def contour_is_valid(
         if (w * h) / float(image_area) < float(min_bbox_area_ratio):
             return False
 
-    hull = cv2.convexHull(cnt)
-    hull_area = cv2.contourArea(hull)
+    hull_area = f.hull_area
     if hull_area <= 0:
         return False
     solidity = area / float(hull_area)
@@ -79,17 +172,125 @@ def contour_is_valid(
         return False
 
     aspect_ratio = max(w, h) / (min(w, h) + 1e-6)
-    if aspect_ratio > 6.0:
+    if aspect_ratio > MAX_ASPECT:
         return False
 
     return True
 
+# ---------- batch filter ----------
+
+def contour_stats(contours) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Areas and bounding boxes of all contours in a few NumPy passes.
+
+    Returns (areas (N,) float64, bboxes (N, 4) int64 as x, y, w, h); the
+    values equal cv2.contourArea / cv2.boundingRect per contour (shoelace
+    sums and min/max over the concatenated points, split with reduceat).
+    """
+    n = len(contours)
+    if n == 0:
+        return np.zeros(0, np.float64), np.zeros((0, 4), np.int64)
+    lengths = np.fromiter(map(len, contours), dtype=np.int64, count=n)
+    starts = np.zeros(n, dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    pts = _concat_points(contours, int(lengths.sum()))
+    x, y = pts[:, 0], pts[:, 1]
+
+    nxt = np.arange(1, len(pts) + 1)
+    nxt[starts + lengths - 1] = starts          # close each polygon
+    cross = x * y[nxt] - x[nxt] * y
+    areas = np.abs(np.add.reduceat(cross, starts)) / 2.0
+
+    x0, y0 = np.minimum.reduceat(x, starts), np.minimum.reduceat(y, starts)
+    x1, y1 = np.maximum.reduceat(x, starts), np.maximum.reduceat(y, starts)
+    return areas, np.stack([x0, y0, x1 - x0 + 1, y1 - y0 + 1], axis=1)
+
+def _concat_points(contours, total: int) -> np.ndarray:
+    """All points as an (M, 2) int64 array."""
+    if contours[0].dtype == np.int32:
+        # joining the raw buffers is several times faster than np.concatenate
+        # for thousands of tiny arrays (findContours output is int32, contiguous)
+        try:
+            flat = np.frombuffer(b"".join(contours), dtype=np.int32)
+        except (BufferError, TypeError):
+            flat = None
+        if flat is not None and flat.size == 2 * total:
+            return flat.reshape(-1, 2).astype(np.int64)
+    return np.concatenate([np.asarray(c).reshape(-1, 2) for c in contours]).astype(np.int64)
+
+def filter_contours(
+    contours,
+    min_area: int = 800,
+    min_solidity: float = 0.65,
+    min_bbox_area_ratio: float = 0.0015,
+    min_extent: float = 0.58,
+    image_area: int | None = None,
+    min_width: int = 18,
+    min_height: int = 18,
+    max_candidates: int = 0,
+    stats: Tuple[np.ndarray, np.ndarray] | None = None,
+    **_ignored
+) -> Tuple[np.ndarray, list]:
+    """
+    contour_is_valid for a whole frame's contours at once.
+
+    Area, size, bbox ratio, extent and aspect are tested on contour_stats
+    arrays in one vectorized step; only the survivors get a ContourFeatures
+    record and the hull-based solidity test. With `max_candidates` > 0 at
+    most that many survivors (the largest by area) reach the hull test,
+    which bounds the per-frame cost on noisy frames. `stats` may pass
+    precomputed contour_stats.
+
+    Returns (indices into `contours`, their ContourFeatures), in input order.
+    """
+    areas, bboxes = contour_stats(contours) if stats is None else stats
+    idx = prefilter_contours(
+        areas, bboxes, min_area, min_bbox_area_ratio, min_extent, image_area, min_width, min_height, max_candidates,
+    )
+    keep, feats = [], []
+    for i in idx:
+        f = ContourFeatures.from_stats(contours[i], areas[i], bboxes[i])
+        if _is_solid(f, min_solidity):
+            keep.append(i)
+            feats.append(f)
+    return np.asarray(keep, dtype=np.int64), feats
+
+def prefilter_contours(
+    areas: np.ndarray,
+    bboxes: np.ndarray,
+    min_area: int = 800,
+    min_bbox_area_ratio: float = 0.0015,
+    min_extent: float = 0.58,
+    image_area: int | None = None,
+    min_width: int = 18,
+    min_height: int = 18,
+    max_candidates: int = 0,
+) -> np.ndarray:
+    """Indices passing every contour_is_valid test except solidity, capped to the largest `max_candidates`."""
+    w, h = bboxes[:, 2], bboxes[:, 3]
+    wh = (w * h).astype(np.float64)
+    ok = (areas >= float(min_area)) & (w >= min_width) & (h >= min_height)
+    if image_area is not None and image_area > 0:
+        ok &= wh / float(image_area) >= float(min_bbox_area_ratio)
+    ok &= areas / np.maximum(wh, 1.0) >= float(min_extent)
+    ok &= np.maximum(w, h) / (np.minimum(w, h) + 1e-6) <= MAX_ASPECT
+    idx = np.flatnonzero(ok)
+    if max_candidates and len(idx) > max_candidates:
+        top = np.argpartition(-areas[idx], max_candidates - 1)[:max_candidates]
+        idx = np.sort(idx[top])
+    return idx
+
+def _is_solid(f: ContourFeatures, min_solidity: float) -> bool:
+    hull_area = f.hull_area
+    return hull_area > 0 and f.area / float(hull_area) >= float(min_solidity)
+
 # ---------- geometry helpers ----------
 
 def _circularity(cnt) -> float:
     """4πA/P² ; 1.0 for a perfect circle."""
-    a = cv2.contourArea(cnt)
-    p = cv2.arcLength(cnt, True)
+    f = _features(cnt)
+    a = f.area
+    p = f.perimeter
     if a <= 0 or p <= 0:
         return 0.0
     return float(4.0 * np.pi * a / (p * p))
@@ -117,6 +318,7 @@ def _rot_rect_aspect_angle(cnt) -> Tuple[float, float]:
 def classify_shape(contour) -> Tuple[str, float]:
     """
     Classify as one of: Circle, Triangle, Square, Rectangle, Unknown.
+    Accepts a raw contour or a ContourFeatures record (features are reused).
     Rules:
       * Circle: very high circularity, near-isotropic ellipse, and good fit to enclosing circle
       * Triangle: polygon approx has 3 vertices
@@ -124,23 +326,22 @@ def classify_shape(contour) -> Tuple[str, float]:
         - near-square but rotated (diamond) -> Unknown
       * Everything else -> Unknown
     """
-    area = cv2.contourArea(contour)
-    if area <= 0:
+    f = _features(contour)
+    if f.area <= 0:
         return ("Unknown", 0.0)
 
-    peri = cv2.arcLength(contour, True)
-    approx = cv2.approxPolyDP(contour, 0.02 * peri, True)
+    approx = f.approx
     v = len(approx)
 
     # Circle metrics
-    circ = _circularity(contour)            # 4πA/P²
-    axis_ratio = _ellipse_axis_ratio(contour)
-    r_u = _radial_uniformity(contour)       # std(radius)/mean(radius)
+    circ = _circularity(f)            # 4πA/P²
+    axis_ratio = f.axis_ratio
+    r_u = _radial_uniformity(f)       # std(radius)/mean(radius)
 
     # Fit to enclosing circle
-    (cx, cy), r = cv2.minEnclosingCircle(contour)
+    (cx, cy), r = f.enclosing_circle
     circle_area = np.pi * (r * r)
-    a = float(cv2.contourArea(contour))
+    a = f.area
     fit_ratio = a / (circle_area + 1e-6)
 
     # ── Guard: regular 5–7-gons should NOT be circles ─────────────────────
@@ -160,7 +361,7 @@ def classify_shape(contour) -> Tuple[str, float]:
         return ("Triangle", 1.0)
 
     if v == 4:
-        ar, ang = _rot_rect_aspect_angle(contour)  # ar>=1, ang in [0,90)
+        ar, ang = f.rot_rect  # ar>=1, ang in [0,90)
         near_square = 0.90 <= ar <= 1.10
         axis_aligned = (ang < 10) or (ang > 80)
 
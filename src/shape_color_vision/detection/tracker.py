@@ -0,0 +1,161 @@
+"""
+tracker.py — Lightweight frame-to-frame object tracking.
+
+Responsibilities:
+• Match detections to existing tracks by bounding-box IoU and give each
+  object a stable track id.
+• Decide which objects need (re)classification: new tracks, tracks whose
+  geometry changed significantly since their last classification, and
+  tracks whose cached classification is older than a refresh interval.
+• Cache the last classification of every live track.
+
+Does NOT:
+• Classify, draw or log anything itself.
+"""
+
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU of every (x, y, w, h) box in `a` (N, 4) against every box in `b` (M, 4)."""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    ax0, ay0 = a[:, 0:1], a[:, 1:2]
+    ax1, ay1 = ax0 + a[:, 2:3], ay0 + a[:, 3:4]
+    bx0, by0 = b[:, 0], b[:, 1]
+    bx1, by1 = bx0 + b[:, 2], by0 + b[:, 3]
+    iw = np.clip(np.minimum(ax1, bx1) - np.maximum(ax0, bx0), 0, None)
+    ih = np.clip(np.minimum(ay1, by1) - np.maximum(ay0, by0), 0, None)
+    inter = iw * ih
+    union = (a[:, 2:3] * a[:, 3:4]) + (b[:, 2] * b[:, 3]) - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+class _Track:
+    __slots__ = (
+        "track_id", "bbox", "last_seen", "misses",
+        "ref_bbox", "ref_area", "classified_at",
+        "shape_id", "color_id", "shape_conf", "color_conf",
+    )
+
+    def __init__(self, track_id: int, bbox: np.ndarray, frame: int):
+        self.track_id = track_id
+        self.bbox = bbox
+        self.last_seen = frame
+        self.misses = 0
+        # geometry and frame of the last classification
+        self.ref_bbox = bbox
+        self.ref_area = 0.0
+        self.classified_at = -1
+        self.shape_id = self.color_id = 0
+        self.shape_conf = self.color_conf = 0.0
+
+
+class ObjectTracker:
+    """
+    Greedy IoU tracker that lets the pipeline reuse classifications.
+
+    A matched detection reuses its track's cached classification while
+      • IoU(current bbox, bbox at last classification) >= stable_iou,
+      • |area change| since last classification <= max_area_change, and
+      • the classification is younger than refresh_frames frames.
+    Tracks not seen for more than max_misses frames are dropped.
+    """
+
+    def __init__(
+        self,
+        iou_match: float = 0.3,
+        stable_iou: float = 0.85,
+        max_area_change: float = 0.15,
+        refresh_frames: int = 30,
+        max_misses: int = 5,
+    ):
+        self.iou_match = float(iou_match)
+        self.stable_iou = float(stable_iou)
+        self.max_area_change = float(max_area_change)
+        self.refresh_frames = int(refresh_frames)
+        self.max_misses = int(max_misses)
+        self._tracks: Dict[int, _Track] = {}
+        self._next_id = 1
+        self.frame = 0
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def match(self, bboxes, areas) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Assign a track id to every detection of the next frame.
+
+        Returns (track_ids (N,) int32, reuse (N,) bool); reuse[i] means the
+        cached classification of track_ids[i] is still valid.
+        """
+        self.frame += 1
+        boxes = np.asarray(bboxes, dtype=np.int32).reshape(-1, 4)
+        areas = np.asarray(areas, dtype=np.float64).reshape(-1)
+        n = len(boxes)
+        track_ids = np.zeros(n, dtype=np.int32)
+        reuse = np.zeros(n, dtype=bool)
+
+        tracks = list(self._tracks.values())
+        assigned = np.zeros(n, dtype=bool)
+        if tracks and n:
+            iou = iou_matrix(boxes, np.stack([t.bbox for t in tracks]))
+            order = np.argsort(iou, axis=None)[::-1]
+            used = set()
+            for flat in order:
+                di, ti = divmod(int(flat), len(tracks))
+                if iou[di, ti] < self.iou_match:
+                    break
+                if assigned[di] or ti in used:
+                    continue
+                assigned[di] = True
+                used.add(ti)
+                t = tracks[ti]
+                t.bbox, t.last_seen, t.misses = boxes[di], self.frame, 0
+                track_ids[di] = t.track_id
+                reuse[di] = self._still_valid(t, boxes[di], areas[di])
+
+        for di in np.flatnonzero(~assigned):
+            t = _Track(self._next_id, boxes[di], self.frame)
+            self._tracks[t.track_id] = t
+            self._next_id += 1
+            track_ids[di] = t.track_id
+
+        for tid in [tid for tid, t in self._tracks.items() if t.last_seen != self.frame]:
+            t = self._tracks[tid]
+            t.misses += 1
+            if t.misses > self.max_misses:
+                del self._tracks[tid]
+
+        return track_ids, reuse
+
+    def _still_valid(self, t: _Track, bbox: np.ndarray, area: float) -> bool:
+        if t.classified_at < 0 or self.frame - t.classified_at >= self.refresh_frames:
+            return False
+        if iou_matrix(bbox, t.ref_bbox)[0, 0] < self.stable_iou:
+            return False
+        ref = max(t.ref_area, 1e-9)
+        return abs(area - t.ref_area) / ref <= self.max_area_change
+
+    def cached(self, track_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(shape_ids, color_ids, shape_conf, color_conf) cached for `track_ids`."""
+        tracks = [self._tracks[int(tid)] for tid in track_ids]
+        return (
+            np.array([t.shape_id for t in tracks], dtype=np.int8),
+            np.array([t.color_id for t in tracks], dtype=np.int8),
+            np.array([t.shape_conf for t in tracks], dtype=np.float64),
+            np.array([t.color_conf for t in tracks], dtype=np.float64),
+        )
+
+    def record(self, track_ids, bboxes, areas, shape_ids, color_ids, shape_conf, color_conf) -> None:
+        """Store fresh classifications (and their geometry) for `track_ids`."""
+        for i, tid in enumerate(track_ids):
+            t = self._tracks[int(tid)]
+            t.ref_bbox = np.asarray(bboxes[i], dtype=np.int32)
+            t.ref_area = float(areas[i])
+            t.classified_at = self.frame
+            t.shape_id, t.color_id = int(shape_ids[i]), int(color_ids[i])
+            t.shape_conf, t.color_conf = float(shape_conf[i]), float(color_conf[i])
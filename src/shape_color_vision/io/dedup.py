@@ -0,0 +1,73 @@
+"""
+dedup.py — Bounded, time-windowed duplicate suppression for detection logs.
+
+Responsibilities:
+• Decide whether a detection key (e.g. shape, color, source, name) should
+  be logged now or suppressed as a repeat.
+• Forget keys after a TTL window so repeated sightings are logged again.
+• Cap memory with a capacity limit (oldest entries are evicted first).
+
+Notes:
+• Entries live in an OrderedDict; expiry and eviction pop from its head,
+  so every operation is O(1) amortized.
+• With a TTL, entries stay in the order they were logged, so the head is
+  always the next to expire. Without a TTL, a suppressed repeat refreshes
+  its entry (plain LRU).
+"""
+
+
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+
+class DedupCache:
+    """
+    ttl=None, capacity=None  → suppress a key forever (unbounded set).
+    ttl=T                    → suppress a key for T seconds after it was logged.
+    capacity=N               → remember at most N keys; the oldest is forgotten first.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        capacity: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive or None")
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be >= 1 or None")
+        self.ttl = ttl
+        self.capacity = capacity
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expire(self, now: float) -> None:
+        if self.ttl is None:
+            return
+        entries = self._entries
+        while entries:
+            key, logged_at = next(iter(entries.items()))
+            if now - logged_at < self.ttl:
+                break
+            entries.popitem(last=False)
+
+    def should_log(self, key: Hashable) -> bool:
+        """True if `key` is new (or its window expired); records it as logged."""
+        now = self._clock()
+        self._expire(now)
+
+        entries = self._entries
+        if key in entries:
+            if self.ttl is None:
+                entries.move_to_end(key)
+            return False
+
+        entries[key] = now
+        if self.capacity is not None and len(entries) > self.capacity:
+            entries.popitem(last=False)
+        return True
@@ -1,10 +1,14 @@
 from pathlib import Path
 import csv
+import threading
 from datetime import datetime
-from typing import Set, Tuple
+from typing import List, Optional
+
+from .dedup import DedupCache
 
 
 HEADER = ["timestamp", "shape", "color", "confidence", "source", "name"]
+TRACKED_HEADER = HEADER + ["track_id"]
 
 
 class CSVLogger:
@@ -17,44 +21,162 @@ class CSVLogger:
     • Optionally suppress duplicate events to avoid spamming the log.
 
     Duplicate suppression:
-    • Each unique (shape, color, source, name) is only written ONCE per logger
-      instance. If the same combination is detected again (e.g. same object
-      in front of the camera for many frames), it will NOT be logged again.
+    • By default each unique (shape, color, source, name) is only written ONCE
+      per logger instance. If the same combination is detected again (e.g. same
+      object in front of the camera for many frames), it will NOT be logged again.
+    • dedup_ttl (seconds) suppresses a combination only for that window after
+      it was logged; later sightings are logged again.
+    • dedup_capacity caps how many combinations are remembered (oldest are
+      forgotten first), keeping memory flat for long-running streams.
+
+    Tracking (track_ids=True):
+    • New files get an extra trailing "track_id" column, and the duplicate key
+      includes the track id, so each tracked object is logged once (per
+      dedup window) instead of once per combination.
+    • An existing file keeps its header; a track id is only written if that
+      header already has the column. Without the column, rows could not tell
+      tracks apart, so the duplicate key falls back to (shape, color, source,
+      name) as well.
+
+    Buffered mode (buffered=True):
+    • The file stays open; rows are collected in memory and written by a
+      background thread once `flush_rows` rows are pending or every
+      `flush_interval` seconds, whichever comes first.
+    • Call close() (or use the logger as a context manager) to write the
+      remaining rows and release the file.
+    • log() only appends to the pending list; disk writes happen outside
+      that lock, so detection threads never wait on I/O.
     """
 
-    def __init__(self, csv_path: str):
+    def __init__(
+        self,
+        csv_path: str,
+        buffered: bool = False,
+        flush_rows: int = 256,
+        flush_interval: float = 1.0,
+        dedup_ttl: Optional[float] = None,
+        dedup_capacity: Optional[int] = None,
+        track_ids: bool = False,
+    ):
         self.path = Path(csv_path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
 
         # Track which detections we've already written
-        self._seen: Set[Tuple[str, str, str, str]] = set()
+        self._seen = DedupCache(ttl=dedup_ttl, capacity=dedup_capacity)
 
         # Create file with header if it does not exist yet
         if not self.path.exists():
             with self.path.open("w", newline="") as f:
-                csv.writer(f).writerow(HEADER)
+                csv.writer(f).writerow(TRACKED_HEADER if track_ids else HEADER)
+            self._tracked = track_ids
+        else:
+            with self.path.open(newline="") as f:
+                header = next(csv.reader(f), [])
+            self._tracked = header == TRACKED_HEADER
+
+        self.buffered = buffered
+        self._file = None
+        self._thread: Optional[threading.Thread] = None
+        if buffered:
+            self._flush_rows = max(1, int(flush_rows))
+            self._flush_interval = float(flush_interval)
+            self._pending: List[list] = []
+            self._lock = threading.Lock()        # guards _pending / _file
+            self._io_lock = threading.Lock()     # one writer at a time, rows stay in order
+            self._wake = threading.Event()
+            self._closed = threading.Event()
+            self._file = self.path.open("a", newline="")
+            self._writer = csv.writer(self._file)
+            self._thread = threading.Thread(target=self._flush_loop, name="csvlogger-flush", daemon=True)
+            self._thread.start()
 
-    def log(self, shape: str, color: str, confidence: float, source: str, name: str):
+    def log(
+        self,
+        shape: str,
+        color: str,
+        confidence: float,
+        source: str,
+        name: str,
+        track_id: Optional[int] = None,
+    ):
         """
         Append a detection entry to the CSV log file.
 
         Duplicate policy:
-        • If (shape, color, source, name) has already been logged by this
-          logger instance, the event is ignored.
+        • If (shape, color, source, name[, track_id]) has already been logged by
+          this logger instance (within the dedup window, if any), the event is ignored.
         """
-        key = (shape, color, source, name)
-        if key in self._seen:
-            # Already logged this combination once → skip
+        tracked = track_id is not None and self._tracked
+        key = (shape, color, source, name, track_id) if tracked else (shape, color, source, name)
+        if not self._seen.should_log(key):
+            # Already logged this combination → skip
             return
 
-        self._seen.add(key)
-
-        with self.path.open("a", newline="") as f:
-            csv.writer(f).writerow([
-                datetime.now().isoformat(timespec="seconds"),
-                shape,
-                color,
-                f"{confidence:.2f}",
-                source,
-                name,
-            ])
+        row = [
+            datetime.now().isoformat(timespec="seconds"),
+            shape,
+            color,
+            f"{confidence:.2f}",
+            source,
+            name,
+        ]
+        if self._tracked:
+            row.append("" if track_id is None else int(track_id))
+
+        if not self.buffered:
+            with self.path.open("a", newline="") as f:
+                csv.writer(f).writerow(row)
+            return
+
+        with self._lock:
+            if self._file is None:
+                raise ValueError("log() on a closed CSVLogger")
+            self._pending.append(row)
+            if len(self._pending) >= self._flush_rows:
+                self._wake.set()
+
+    # ---------- buffered mode ----------
+
+    def _flush_loop(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending rows to disk (no-op for unbuffered loggers)."""
+        if not self.buffered:
+            return
+        with self._io_lock:
+            with self._lock:
+                if self._file is None:
+                    return
+                rows, self._pending = self._pending, []
+            if rows:
+                self._writer.writerows(rows)
+                self._file.flush()
+
+    def close(self) -> None:
+        """Flush remaining rows and release the file; safe to call twice."""
+        if not self.buffered or self._file is None:
+            return
+        self._closed.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._io_lock:
+            with self._lock:
+                f, self._file = self._file, None
+                rows, self._pending = self._pending, []
+            if f is None:
+                return
+            if rows:
+                self._writer.writerows(rows)
+            f.close()
+
+    def __enter__(self) -> "CSVLogger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
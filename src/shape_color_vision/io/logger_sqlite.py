@@ -0,0 +1,243 @@
+"""
+logger_sqlite.py — SQLite detection store, a drop-in alternative to CSVLogger.
+
+Responsibilities:
+• Store detection events in an indexed SQLite table (WAL mode) so they can
+  be queried by time range, shape, color and source without a full scan.
+• Insert rows in batched transactions.
+• Optionally enforce duplicate suppression in the store itself through a
+  unique key on (shape, color, source, name, track_id), across processes
+  and restarts (track_id is -1 for untracked detections).
+• Provide a small query helper.
+
+Does NOT:
+• Detect or draw anything.
+"""
+
+
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .dedup import DedupCache
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS detections (
+    id          INTEGER PRIMARY KEY,
+    timestamp   TEXT    NOT NULL,
+    shape       TEXT    NOT NULL,
+    color       TEXT    NOT NULL,
+    confidence  REAL    NOT NULL,
+    source      TEXT    NOT NULL,
+    name        TEXT    NOT NULL,
+    track_id    INTEGER NOT NULL DEFAULT -1
+);
+CREATE INDEX IF NOT EXISTS ix_detections_timestamp ON detections(timestamp);
+CREATE INDEX IF NOT EXISTS ix_detections_shape     ON detections(shape, timestamp);
+CREATE INDEX IF NOT EXISTS ix_detections_color     ON detections(color, timestamp);
+CREATE INDEX IF NOT EXISTS ix_detections_source    ON detections(source, timestamp);
+"""
+
+_KEY = ("shape", "color", "source", "name", "track_id")
+_UNIQUE = f"CREATE UNIQUE INDEX IF NOT EXISTS ux_detections_key ON detections({', '.join(_KEY)});"
+
+_COLUMNS = ("timestamp", "shape", "color", "confidence", "source", "name", "track_id")
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Bring stores created by older versions up to the current schema."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(detections)")]
+    with conn:
+        if "track_id" not in columns:
+            conn.execute("ALTER TABLE detections ADD COLUMN track_id INTEGER NOT NULL DEFAULT -1")
+        key = tuple(row[2] for row in conn.execute("PRAGMA index_info(ux_detections_key)"))
+        if key and key != _KEY:
+            conn.execute("DROP INDEX ux_detections_key")
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30.0, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SQLiteLogger:
+    """
+    SQLiteLogger — same interface as CSVLogger, backed by a SQLite table.
+
+    • log() applies the CSVLogger duplicate policy (incl. dedup_ttl /
+      dedup_capacity) in memory and queues rows; it never touches the
+      database, so detection threads do not wait on disk I/O.
+    • A background thread inserts the queued rows in one transaction once
+      `batch_rows` are pending or every `flush_interval` seconds, so the
+      last rows of a burst are committed even when no further detections
+      arrive.
+    • unique=True adds a unique index on (shape, color, source, name, track_id) and
+      inserts with OR IGNORE, so the store itself rejects duplicates
+      (permanently — a dedup_ttl cannot re-log a key the store already has).
+    • close() (or leaving a with-block) inserts the remaining rows.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        unique: bool = False,
+        batch_rows: int = 256,
+        flush_interval: float = 1.0,
+        dedup_ttl: Optional[float] = None,
+        dedup_capacity: Optional[int] = None,
+    ):
+        self.path = Path(db_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.unique = unique
+        self._batch_rows = max(1, int(batch_rows))
+        self._flush_interval = float(flush_interval)
+
+        self._seen = DedupCache(ttl=dedup_ttl, capacity=dedup_capacity)
+        self._pending: List[tuple] = []
+        self._lock = threading.Lock()         # guards _pending / _conn
+        self._io_lock = threading.Lock()      # one writer at a time, rows stay in order
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+
+        self._conn: Optional[sqlite3.Connection] = _connect(str(self.path))
+        self._conn.executescript(_SCHEMA)
+        _migrate(self._conn)
+        if unique:
+            try:
+                with self._conn:
+                    self._conn.execute(_UNIQUE)
+            except sqlite3.IntegrityError as e:
+                self._conn.close()
+                raise ValueError(f"{db_path} already holds duplicate rows; cannot enforce unique=True") from e
+        verb = "INSERT OR IGNORE" if unique else "INSERT"
+        self._insert = f"{verb} INTO detections ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+
+        self._thread: Optional[threading.Thread] = threading.Thread(
+            target=self._flush_loop, name="sqlitelogger-flush", daemon=True,
+        )
+        self._thread.start()
+
+    def log(
+        self,
+        shape: str,
+        color: str,
+        confidence: float,
+        source: str,
+        name: str,
+        track_id: Optional[int] = None,
+    ):
+        """Queue a detection; duplicates of (shape, color, source, name[, track_id]) are ignored."""
+        key = (shape, color, source, name) if track_id is None else (shape, color, source, name, track_id)
+        if not self._seen.should_log(key):
+            return
+
+        row = (
+            datetime.now().isoformat(timespec="seconds"),
+            shape,
+            color,
+            round(float(confidence), 2),
+            source,
+            name,
+            -1 if track_id is None else int(track_id),
+        )
+        with self._lock:
+            if self._conn is None:
+                raise ValueError("log() on a closed SQLiteLogger")
+            self._pending.append(row)
+            if len(self._pending) >= self._batch_rows:
+                self._wake.set()
+
+    def _flush_loop(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _insert_rows(self, conn: sqlite3.Connection, rows: List[tuple]) -> None:
+        with conn:  # one transaction per batch
+            conn.executemany(self._insert, rows)
+
+    def flush(self) -> None:
+        """Insert pending rows now."""
+        with self._io_lock:
+            with self._lock:
+                conn = self._conn
+                rows, self._pending = self._pending, []
+            if conn is not None and rows:
+                self._insert_rows(conn, rows)
+
+    def close(self) -> None:
+        """Insert remaining rows and close the connection; safe to call twice."""
+        self._closed.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._io_lock:
+            with self._lock:
+                conn, self._conn = self._conn, None
+                rows, self._pending = self._pending, []
+            if conn is None:
+                return
+            if rows:
+                self._insert_rows(conn, rows)
+            conn.close()
+
+    def __enter__(self) -> "SQLiteLogger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def query_detections(
+    db_path: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    shape: Optional[str] = None,
+    color: Optional[str] = None,
+    source: Optional[str] = None,
+    name: Optional[str] = None,
+    track_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, object]]:
+    """
+    Return detections matching all given filters, oldest first.
+
+    `since` / `until` are ISO timestamps (inclusive / exclusive), compared
+    as text like the stored timestamps, e.g. "2025-10-24T14:00".
+    """
+    clauses, params = [], []
+    for column, op, value in (
+        ("timestamp", ">=", since),
+        ("timestamp", "<", until),
+        ("shape", "=", shape),
+        ("color", "=", color),
+        ("source", "=", source),
+        ("name", "=", name),
+        ("track_id", "=", track_id),
+    ):
+        if value is not None:
+            clauses.append(f"{column} {op} ?")
+            params.append(value)
+
+    sql = f"SELECT {', '.join(_COLUMNS)} FROM detections"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY timestamp, id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+
+    if not Path(db_path).exists():
+        raise FileNotFoundError(db_path)
+    conn = _connect(db_path)
+    try:
+        return [dict(zip(_COLUMNS, row)) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
@@ -0,0 +1,114 @@
+"""
+result_cache.py — On-disk cache of detection results keyed by content.
+
+Responsibilities:
+• Store one DetectionResult per (image content hash, detection config hash)
+  as an .npz file, so re-runs skip images that did not change.
+• Keep the cache under a size budget by evicting least recently used
+  entries (file mtime is refreshed on every hit).
+• Clear the whole cache on request.
+
+Does NOT:
+• Decide what goes into the config hash (see pipeline.detection_config_hash)
+  or run detection itself.
+
+Notes:
+• Writes go to a temporary file first and are renamed into place, so
+  several worker processes may share one cache directory.
+• put() never evicts; call evict() once a run is done.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+from ..detection.results import DetectionResult
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(content_digest: str, config_digest: str) -> str:
+        return hashlib.sha256(f"{content_digest}:{config_digest}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".npz")
+
+    def get(self, key: str) -> Optional[DetectionResult]:
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                result = DetectionResult.from_arrays(data)
+        except (FileNotFoundError, OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # LRU: hits refresh the entry
+        except OSError:
+            pass
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: DetectionResult) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **result.arrays())
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def size_bytes(self) -> int:
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".npz"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, st.st_mtime, st.st_size
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits max_bytes; returns the count."""
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for path, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
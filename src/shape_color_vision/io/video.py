@@ -0,0 +1,152 @@
+"""
+video.py — Video file input and threaded annotated-video output.
+
+Responsibilities:
+• VideoSource: read a file frame by frame with a frame stride and an
+  optional [start, end) time range; plugs into StagedPipeline as `read`,
+  whose capture thread then decodes ahead of detection.
+• VideoWriterThread: encode frames through cv2.VideoWriter on its own
+  thread behind a bounded queue, so encoding overlaps detection.
+
+Does NOT:
+• Detect, draw or log anything.
+
+Notes:
+• Skipped frames are grabbed but not decoded (VideoCapture.grab), which is
+  what makes a stride cheaper than reading every frame.
+• Times are derived from frame indices and the container FPS.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+_END = object()
+
+
+class VideoSource:
+    """Frames [start_s, end_s) of a video file, every `stride`-th one."""
+
+    def __init__(self, path: str, stride: int = 1, start_s: float | None = None, end_s: float | None = None):
+        if stride < 1:
+            raise ValueError(f"stride must be >= 1, got {stride}")
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise FileNotFoundError(f"could not open video {path}")
+        self.stride = int(stride)
+        self.fps = float(self.cap.get(cv2.CAP_PROP_FPS) or 0.0)
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+
+        self.index = 0                      # index of the next frame in the file
+        if start_s:
+            start = int(round(start_s * self.fps)) if self.fps > 0 else 0
+            if start > 0:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+                self.index = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES) or start)
+        self.end_index: Optional[int] = None
+        if end_s is not None and self.fps > 0:
+            self.end_index = int(round(end_s * self.fps))
+        self.last_index = -1                # file index of the frame last returned
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    @property
+    def output_fps(self) -> float:
+        """Frame rate that keeps the selected frames at real-time speed."""
+        return (self.fps or 30.0) / self.stride
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.end_index is not None and self.index >= self.end_index:
+            return False, None
+        ok, frame = self.cap.read()
+        if not ok:
+            return False, None
+        self.last_index = self.index
+        self.index += 1
+        for _ in range(self.stride - 1):
+            if self.end_index is not None and self.index >= self.end_index:
+                break
+            if not self.cap.grab():
+                break
+            self.index += 1
+        return True, frame
+
+    def release(self) -> None:
+        self.cap.release()
+
+    def __enter__(self) -> "VideoSource":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class VideoWriterThread:
+    """
+    cv2.VideoWriter fed from a bounded queue by a background thread.
+
+    The writer opens on the first frame (its size decides the video size).
+    write() blocks while the queue is full, so no frame is ever dropped;
+    frames must not be modified after they are handed over.
+    """
+
+    def __init__(self, path: str, fps: float, fourcc: str = "mp4v", queue_size: int = 8):
+        self.path = path
+        self.fps = float(fps) if fps and fps > 0 else 30.0
+        self.fourcc = fourcc
+        self.frames_written = 0
+        self._q: queue.Queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._loop, name="scv-encode", daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        writer = None
+        try:
+            while True:
+                frame = self._q.get()
+                if frame is _END:
+                    break
+                if writer is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    h, w = frame.shape[:2]
+                    writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (w, h))
+                    if not writer.isOpened():
+                        raise IOError(f"could not open video writer for {self.path} ({self.fourcc})")
+                writer.write(frame)
+                self.frames_written += 1
+        except BaseException as e:  # surfaced by write()/close()
+            self._error = e
+            # keep draining so producers never block on a dead writer
+            while self._q.get() is not _END:
+                pass
+        finally:
+            if writer is not None:
+                writer.release()
+
+    def write(self, frame: np.ndarray) -> None:
+        if self._error is not None:
+            raise self._error
+        self._q.put(frame)
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._q.put(_END)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self) -> "VideoWriterThread":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -6,10 +6,15 @@ Responsibilities:
 • Display intermediate stages (mask, contours, annotated frame).
 • Provide optional UI elements that can be swapped out without changing
   detector logic (Open/Closed Principle).
+• Be the only place that renders detections: the pipeline, the CLI and the
+  streaming stages all annotate through draw_detections / render.
 
 Notes:
 • No detection or classification should happen here.
 • Keep it purely presentation-related.
+• render() annotates a copy; only draw_detections() writes into the image
+  it is given. Detection never depends on either, so headless runs skip
+  this module entirely.
 """
 
 
@@ -18,9 +23,31 @@ import cv2
 import numpy as np
 from typing import Tuple
 
-def draw_label(img, text: str, org: Tuple[int, int]):
-    cv2.putText(img, text, org, cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 3, cv2.LINE_AA)
-    cv2.putText(img, text, org, cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
+from .. import profiling
+
+CONTOUR_COLOR = (0, 255, 0)  # neon green outlines (colors.py erodes masks to skip them)
+
+
+def draw_label(img, text: str, org: Tuple[int, int], scale: float = 0.6, thickness: int = 1, outline: int | None = None):
+    """White text with a black outline (`outline` defaults to thickness + 2)."""
+    outline = thickness + 2 if outline is None else outline
+    cv2.putText(img, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, (0, 0, 0), outline, cv2.LINE_AA)
+    cv2.putText(img, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, (255, 255, 255), thickness, cv2.LINE_AA)
 
 def draw_contour(img, contour: np.ndarray):
-    cv2.drawContours(img, [contour], -1, (0, 255, 0), 2)
+    cv2.drawContours(img, [contour], -1, CONTOUR_COLOR, 2)
+
+def draw_detections(img: np.ndarray, result) -> np.ndarray:
+    """Draw contours and labels of a DetectionResult onto `img` (in place) and return it."""
+    with profiling.stage("draw"):
+        for i in range(len(result)):
+            x, y = int(result.bboxes[i, 0]), int(result.bboxes[i, 1])
+            draw_contour(img, result.contour(i))
+            draw_label(img, result.label(i), (x, max(20, y - 6)), scale=0.7, thickness=2, outline=5)
+    return img
+
+def render(img: np.ndarray, result) -> np.ndarray:
+    """Annotated copy of `img`; the input frame is left untouched."""
+    with profiling.stage("render_copy"):
+        out = img.copy()
+    return draw_detections(out, result)
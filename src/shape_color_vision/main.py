@@ -15,17 +15,50 @@ Notes:
 
 
 
+import csv
+import sys
+import time
 import cv2
 from pathlib import Path
 import typer
-from typing import Optional
-from .utils.config import load_config, AppConfig
-from .pipeline import analyze_image, analyze_dir, analyze_frame
-from .io.logger_csv import CSVLogger
+from typing import List, Optional
+from .utils.config import load_config, AppConfig, ConfigWatcher
+from .workspace import Workspace
+from .pipeline import analyze_dir, process_frame, open_logger, make_tracker, make_incremental, make_result_cache
+from .io.logger_csv import TRACKED_HEADER
+from .io.logger_sqlite import query_detections
+from .io.viz import draw_label, render
+from .io.video import VideoSource, VideoWriterThread
+from .streaming import DROP_POLICIES, StagedPipeline
+from . import profiling
 
 
 app = typer.Typer(help="Shape & Color Vision")
 
+def start_profile(profile: bool, trace: Optional[str]) -> Optional[profiling.Profiler]:
+    return profiling.enable() if (profile or trace) else None
+
+def finish_profile(profiler: Optional[profiling.Profiler], trace: Optional[str]) -> None:
+    if profiler is None:
+        return
+    profiling.disable()
+    typer.echo(profiler.summary())
+    if trace:
+        profiler.dump_trace(trace)
+        typer.echo(f"Per-frame trace written to {trace}")
+
+def frame_params(cfg: AppConfig, config_path: str, mode: str, watch: bool):
+    """Per-frame source of RuntimeParams: fixed, or hot-reloaded from `config_path`."""
+    if not watch:
+        params = cfg.runtime(mode)
+        return lambda: params, None
+    watcher = ConfigWatcher(config_path, mode)
+    return watcher.poll, watcher
+
+def report_reloads(watcher: Optional[ConfigWatcher]) -> None:
+    if watcher is not None and (watcher.reloads or watcher.error):
+        typer.echo(f"Config reloaded {watcher.reloads} time(s)" + (f"; last error: {watcher.error}" if watcher.error else ""))
+
 def load(cfg_path: str) -> AppConfig:
     cfg = load_config(cfg_path)
     Path(cfg.paths.output_dir).mkdir(parents=True, exist_ok=True)
@@ -38,34 +71,54 @@ def image(
     image_dir: Optional[str] = typer.Option(None),
     save_output: bool = typer.Option(False),
     log_file: Optional[str] = typer.Option(None),
+    workers: int = typer.Option(1, "--workers", "-w", min=1, help="Worker processes for the image directory"),
+    prefetch: int = typer.Option(2, min=0, help="Images decoded ahead while one is processed (single worker)"),
+    cache: Optional[bool] = typer.Option(None, "--cache/--no-cache", help="Reuse results of unchanged images (default: cache.enabled)"),
+    clear_cache: bool = typer.Option(False, help="Empty the result cache before running"),
+    profile: bool = typer.Option(False, help="Print per-stage timing percentiles"),
+    profile_trace: Optional[str] = typer.Option(None, help="Also write per-frame stage timings (JSON lines)"),
 ):
     cfg = load(config)
     if image_dir: cfg.paths.image_dir = image_dir
     if log_file:  cfg.paths.log_csv = log_file
     if save_output: cfg.video.save_output = True
 
-    paths = analyze_dir(cfg.paths.image_dir, cfg)
-    if not paths:
-        typer.echo(f"No images found in {cfg.paths.image_dir}")
-        raise typer.Exit(code=1)
+    profiler = start_profile(profile, profile_trace)
+    if profiler is not None and workers > 1:
+        typer.echo("--profile times this process only; running with --workers 1")
+        workers = 1
 
-    for p in paths:
-        out = analyze_image(p, cfg)
-        if cfg.video.show_window:
-            cv2.imshow("Result", out); cv2.waitKey(500)
-        if cfg.video.save_output:
-            out_path = Path(cfg.paths.output_dir) / f"annotated_{Path(p).name}"
-            cv2.imwrite(str(out_path), out)
-    if cfg.video.show_window:
-        cv2.destroyAllWindows()
-    typer.echo(f"Processed {len(paths)} image(s). Results logged to {cfg.paths.log_csv}")
+    if cache is not None:
+        cfg.cache.enabled = cache
+    result_cache = make_result_cache(cfg)
+    if clear_cache and result_cache is not None:
+        result_cache.clear()
+
+    try:
+        # analyze_dir logs, shows and saves every image; nothing is processed twice
+        paths = analyze_dir(cfg.paths.image_dir, cfg, workers=workers, prefetch=prefetch, cache=result_cache)
+        if not paths:
+            typer.echo(f"No images found in {cfg.paths.image_dir}")
+            raise typer.Exit(code=1)
+        typer.echo(f"Processed {len(paths)} image(s). Results logged to {cfg.paths.log_csv}")
+    finally:
+        finish_profile(profiler, profile_trace)
 
 @app.command()
 def camera(
     config: str = typer.Option("configs/default.yaml"),
     index: int = typer.Option(0, help="Webcam index"),
     save_output: bool = typer.Option(False, help="Save annotated video frames"),
+    show: Optional[bool] = typer.Option(None, "--show/--no-show", help="Display frames (default: video.show_window); with --no-show and no --save-output nothing is rendered"),
+    queue_size: int = typer.Option(2, min=1, help="Frames buffered between pipeline stages"),
+    drop_policy: str = typer.Option("latest", help="When a stage falls behind: 'latest' (drop stale frames) or 'block'"),
+    watch_config: bool = typer.Option(False, help="Apply edits to the config's detection settings while running"),
+    profile: bool = typer.Option(False, help="Print per-stage timing percentiles on exit"),
+    profile_trace: Optional[str] = typer.Option(None, help="Also write per-frame stage timings (JSON lines)"),
 ):
+    if drop_policy not in DROP_POLICIES:
+        raise typer.BadParameter(f"must be one of {', '.join(DROP_POLICIES)}", param_hint="--drop-policy")
+
     cfg = load_config(config)
     if save_output:
         cfg.video.save_output = True
@@ -76,24 +129,317 @@ def camera(
         typer.secho("Could not open camera", fg=typer.colors.RED)
         raise typer.Exit(code=1)
 
-    logger = CSVLogger(cfg.paths.log_csv)
+    tracker = make_tracker(cfg)
+    incremental = make_incremental(cfg, tracker)
+    logger = open_logger(cfg, track_ids=tracker is not None)
+    profiler = start_profile(profile, profile_trace)
+
+    writer = None
+    if save_output:
+        out_path = Path(cfg.paths.output_dir) / f"camera_{time.strftime('%Y%m%d_%H%M%S')}.mp4"
+        writer = VideoWriterThread(str(out_path), cap.get(cv2.CAP_PROP_FPS))
+
+    params, watcher = frame_params(cfg, config, "camera", watch_config)
+    workspace = Workspace()
+
+    def process(frame):
+        p = params()
+        if incremental is not None:
+            incremental.set_params(p)
+        return process_frame(frame, p, logger, tracker=tracker, incremental=incremental, workspace=workspace), None
+
+    show = cfg.video.show_window if show is None else show
+    headless = not show and writer is None
+    if headless:
+        typer.echo("Headless: detecting and logging only (Ctrl+C to stop)")
+
+    # annotation runs on a copy in its own stage, never on the detection thread
+    pipe = StagedPipeline(
+        cap.read, process, queue_size=queue_size, drop_policy=drop_policy, render=None if headless else render,
+    )
     try:
-        while True:
-            ok, frame = cap.read()
-            if not ok:
-                break
-            out = analyze_frame(frame, cfg, logger)
-            cv2.imshow("Shape & Color Vision (press q to quit)", out)
-
-            if save_output:
-                # optional: write individual PNGs, or wire a VideoWriter if you prefer
-                pass
-
-            if (cv2.waitKey(1) & 0xFF) == ord('q'):
-                break
+        with pipe:
+            for item in pipe.frames():
+                if headless:
+                    continue
+                out = item.output
+                draw_label(out, f"{item.latency_ms:.0f} ms", (10, out.shape[0] - 10))
+                if writer is not None:
+                    writer.write(out)
+                if show:
+                    cv2.imshow("Shape & Color Vision (press q to quit)", out)
+                    if (cv2.waitKey(1) & 0xFF) == ord('q'):
+                        break
+    except KeyboardInterrupt:
+        pass
     finally:
         cap.release()
-        cv2.destroyAllWindows()
+        if show:
+            cv2.destroyAllWindows()
+        logger.close()
+        if writer is not None:
+            writer.close()
+            typer.echo(f"Saved {writer.frames_written} frame(s) to {writer.path}")
+    typer.echo(pipe.stats.summary())
+    report_reloads(watcher)
+    finish_profile(profiler, profile_trace)
+
+@app.command()
+def video(
+    path: str = typer.Argument(..., help="Video file to process"),
+    config: str = typer.Option("configs/default.yaml", "--config", "-c"),
+    output: Optional[str] = typer.Option(None, help="Annotated video path (default: output_dir/annotated_<name>.mp4 when video.save_output is on)"),
+    stride: int = typer.Option(1, min=1, help="Process every N-th frame"),
+    start: Optional[float] = typer.Option(None, min=0.0, help="Start time in seconds"),
+    end: Optional[float] = typer.Option(None, min=0.0, help="End time in seconds (exclusive)"),
+    queue_size: int = typer.Option(4, min=1, help="Frames decoded ahead / queued for encoding"),
+    fourcc: str = typer.Option("mp4v", help="Output codec (FourCC)"),
+    show: Optional[bool] = typer.Option(None, "--show/--no-show", help="Display frames (default: video.show_window)"),
+    watch_config: bool = typer.Option(False, help="Apply edits to the config's detection settings while running"),
+    profile: bool = typer.Option(False, help="Print per-stage timing percentiles"),
+    profile_trace: Optional[str] = typer.Option(None, help="Also write per-frame stage timings (JSON lines)"),
+):
+    """Run detection on a video file; every selected frame is processed (no drops)."""
+    cfg = load_config(config)
+    try:
+        source = VideoSource(path, stride=stride, start_s=start, end_s=end)
+    except FileNotFoundError:
+        typer.secho(f"Could not open video {path}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    show = cfg.video.show_window if show is None else show
+    if output is None and cfg.video.save_output:
+        output = str(Path(cfg.paths.output_dir) / f"annotated_{Path(path).stem}.mp4")
+
+    tracker = make_tracker(cfg)
+    incremental = make_incremental(cfg, tracker)
+    logger = open_logger(cfg, track_ids=tracker is not None)
+    writer = VideoWriterThread(output, source.output_fps, fourcc=fourcc, queue_size=queue_size) if output else None
+    profiler = start_profile(profile, profile_trace)
+    name = Path(path).name
+
+    params, watcher = frame_params(cfg, config, "camera", watch_config)
+    workspace = Workspace()
+
+    def process(frame):
+        p = params()
+        if incremental is not None:
+            incremental.set_params(p)
+        result = process_frame(
+            frame, p, logger, tracker=tracker, incremental=incremental, source="VIDEO", name=name, workspace=workspace,
+        )
+        return result, None
+
+    headless = not show and writer is None
+    pipe = StagedPipeline(
+        source.read, process, queue_size=queue_size, drop_policy="block", render=None if headless else render,
+    )
+    try:
+        with pipe:
+            for item in pipe.frames():
+                if writer is not None:
+                    writer.write(item.output)
+                if show:
+                    cv2.imshow("Shape & Color Vision (press q to stop)", item.output)
+                    if (cv2.waitKey(1) & 0xFF) == ord('q'):
+                        break
+    finally:
+        source.release()
+        if show:
+            cv2.destroyAllWindows()
+        logger.close()
+        if writer is not None:
+            writer.close()
+    typer.echo(pipe.stats.summary())
+    if writer is not None:
+        typer.echo(f"Saved {writer.frames_written} frame(s) to {writer.path}")
+    report_reloads(watcher)
+    finish_profile(profiler, profile_trace)
+
+@app.command()
+def streams(
+    sources: List[str] = typer.Argument(..., help="Webcam index, video file or image directory; 'name=source' sets the logged name"),
+    config: str = typer.Option("configs/default.yaml", "--config", "-c"),
+    workers: int = typer.Option(4, "--workers", "-w", min=1, help="Detection threads shared by all streams"),
+    queue_size: int = typer.Option(2, min=1, help="Frames buffered per stream"),
+    drop_policy: Optional[str] = typer.Option(None, help="'latest' or 'block' for every stream (default: latest for cameras, block for files)"),
+    report_every: float = typer.Option(5.0, min=0.0, help="Print per-stream FPS every N seconds (0: only at the end)"),
+):
+    """Run detection on several sources at once in one process (headless)."""
+    from .multistream import MultiStreamScheduler, open_stream
+
+    if drop_policy is not None and drop_policy not in DROP_POLICIES:
+        raise typer.BadParameter(f"must be one of {', '.join(DROP_POLICIES)}", param_hint="--drop-policy")
+
+    cfg = load_config(config)
+    opened = []
+    try:
+        for spec in sources:
+            opened.append(open_stream(spec, cfg, policy=drop_policy, queue_size=queue_size))
+    except (FileNotFoundError, ValueError) as e:
+        for st in opened:
+            st.release()
+        typer.secho(str(e), fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    cv2.setNumThreads(1)  # one OpenCV thread per worker; the pool provides the parallelism
+    with open_logger(cfg, track_ids=make_tracker(cfg) is not None) as logger:
+        scheduler = MultiStreamScheduler(opened, cfg, logger, workers=workers)
+        scheduler.run(
+            progress=(lambda sch: typer.echo(sch.summary() + "\n")) if report_every > 0 else None,
+            interval=report_every or 5.0,
+        )
+    typer.echo(scheduler.summary())
+
+@app.command()
+def query(
+    db: str = typer.Option("logs/detections.db", help="SQLite detection store"),
+    since: Optional[str] = typer.Option(None, help="ISO timestamp, inclusive"),
+    until: Optional[str] = typer.Option(None, help="ISO timestamp, exclusive"),
+    shape: Optional[str] = typer.Option(None),
+    color: Optional[str] = typer.Option(None),
+    source: Optional[str] = typer.Option(None),
+    limit: Optional[int] = typer.Option(None),
+):
+    """Print detections from a SQLite store as CSV."""
+    try:
+        rows = query_detections(db, since=since, until=until, shape=shape, color=color, source=source, limit=limit)
+    except FileNotFoundError:
+        typer.secho(f"No detection store at {db}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(TRACKED_HEADER)
+    for r in rows:
+        writer.writerow([r[k] for k in TRACKED_HEADER])
+
+@app.command()
+def sweep(
+    config: str = typer.Option("configs/default.yaml", "--config", "-c"),
+    labels: str = typer.Option("data/sample_labels.yaml", help="YAML of image path → [shape, color] pairs"),
+    param: list[str] = typer.Option([], "--param", "-p", help="Grid axis, e.g. image_mask.s_min=30,40,50 (repeatable)"),
+    grid: Optional[str] = typer.Option(None, help="YAML mapping of dotted config keys to value lists"),
+    mode: str = typer.Option("image", help="Settings to sweep: 'image' or 'camera'"),
+    out: Optional[str] = typer.Option(None, help="Also write the table as CSV"),
+):
+    """Score a grid of config values on a labeled image set (accuracy vs throughput)."""
+    from .sweep import expand_grid, format_table, load_grid, load_labeled_set, parse_params, run_sweep
+
+    if mode not in ("image", "camera"):
+        raise typer.BadParameter("must be 'image' or 'camera'", param_hint="--mode")
+    try:
+        axes = {**(load_grid(grid) if grid else {}), **parse_params(param)}
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--param")
+    if not axes:
+        raise typer.BadParameter("give at least one --param or a --grid file")
+
+    images = load_labeled_set(labels)
+    try:
+        rows, stats = run_sweep(images, load_config(config), axes, for_camera=mode == "camera")
+    except KeyError as e:
+        raise typer.BadParameter(str(e.args[0]), param_hint="--param")
+
+    typer.echo(format_table(rows))
+    typer.echo(
+        f"{len(expand_grid(axes))} parameter set(s) on {len(images)} image(s); "
+        f"masks computed {stats.mask_misses}, reused {stats.mask_hits}; "
+        f"labels computed {stats.label_misses}, reused {stats.label_hits}"
+    )
+    if out:
+        keys = list(axes)
+        with open(out, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(keys + ["precision", "recall", "f1", "exact", "images", "ms_per_image"])
+            for r in rows:
+                writer.writerow([r.params[k] for k in keys] + [r.precision, r.recall, r.f1, r.exact, r.images, r.ms_per_image])
+        typer.echo(f"Table written to {out}")
+
+@app.command()
+def bench(
+    config: str = typer.Option("configs/default.yaml", "--config", "-c"),
+    preset: str = typer.Option("quick", help="Scene set: 'quick' or 'full' (VGA … 8K, up to 2000 objects)"),
+    resolution: Optional[str] = typer.Option(None, help="Single scene instead of a preset: vga/hd/fhd/4k/8k or WxH"),
+    objects: int = typer.Option(10, min=0, help="Objects in the single scene"),
+    noise: float = typer.Option(0.0, min=0.0, help="Gaussian noise std-dev in the single scene"),
+    outline: int = typer.Option(0, min=0, help="Outline thickness in the single scene"),
+    seed: int = typer.Option(0),
+    repeat: int = typer.Option(5, min=1, help="Timed runs per metric (median is reported)"),
+    out: Optional[str] = typer.Option(None, help="Write results as JSON"),
+    baseline: Optional[str] = typer.Option(None, help="Compare against a stored JSON result"),
+    tolerance: float = typer.Option(0.25, min=0.0, help="Allowed slowdown vs baseline (fraction)"),
+):
+    """Benchmark detection throughput on seeded synthetic scenes."""
+    from .bench import PRESETS, compare, load_results, run_suite, save_results, scene_spec
+
+    if resolution:
+        specs = [scene_spec(resolution, seed=seed, objects=objects, noise=noise, outline=outline)]
+    elif preset in PRESETS:
+        specs = [scene_spec(seed=seed, **p) for p in PRESETS[preset]]
+    else:
+        raise typer.BadParameter(f"must be one of {', '.join(PRESETS)}", param_hint="--preset")
+
+    def report(rec):
+        ms, fps = rec["ms"], rec["fps"]
+        stages = " ".join(f"{k}={ms[k]:.1f}" for k in ("mask", "contours", "filter", "color", "color_loop", "classify"))
+        typer.echo(
+            f"{rec['name']:<34} detect {ms['detect']:8.1f} ms ({fps['detect']:.1f} fps, {rec['objects_per_s']:.0f} obj/s) "
+            f"frame {ms['analyze_frame']:.1f} image {ms['analyze_image']:.1f} | {stages} "
+            f"| recall {rec['recall']:.2f} labels {rec['label_accuracy']:.2f}"
+        )
+
+    results = run_suite(specs, load_config(config), repeat=repeat, progress=report)
+    if out:
+        save_results(results, out)
+        typer.echo(f"Results written to {out}")
+    if baseline:
+        regressions = compare(results, load_results(baseline), tolerance)
+        for r in regressions:
+            typer.secho(r, fg=typer.colors.RED)
+        if regressions:
+            raise typer.Exit(code=1)
+        typer.echo(f"No regressions vs {baseline}")
+
+@app.command()
+def serve(
+    config: str = typer.Option("configs/default.yaml", "--config", "-c"),
+    host: Optional[str] = typer.Option(None, help="Bind address (default: serve.host)"),
+    port: Optional[int] = typer.Option(None, help="Port (default: serve.port; 0 picks a free one)"),
+    workers: Optional[int] = typer.Option(None, min=1, help="Detection threads (default: serve.workers)"),
+    max_queue: Optional[int] = typer.Option(None, min=0, help="Images queued before 503 (default: serve.max_queue)"),
+    mode: Optional[str] = typer.Option(None, help="Detection settings: image or camera (default: serve.mode)"),
+    verbose: bool = typer.Option(False, help="Log every request"),
+):
+    """Serve detection over HTTP: POST images to /detect or /detect/batch, get JSON back."""
+    from .server import DetectionService, make_server
+
+    cfg = load_config(config)
+    s = cfg.serve
+    mode = mode or s.mode
+    try:
+        params = cfg.runtime(mode)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--mode")
+
+    cv2.setNumThreads(1)  # one OpenCV thread per worker; the pool provides the parallelism
+    service = DetectionService(params, workers=workers or s.workers, max_queue=s.max_queue if max_queue is None else max_queue)
+    server = make_server(
+        service,
+        host=host or s.host,
+        port=s.port if port is None else port,
+        max_body_bytes=int(float(s.max_body_mb) * 1024 * 1024),
+        verbose=verbose,
+    )
+    bound_host, bound_port = server.server_address[:2]
+    typer.echo(f"Serving {mode} detection on http://{bound_host}:{bound_port} ({service.workers} workers, capacity {service.capacity}); Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    h = service.health()
+    typer.echo(f"Served {h['served']} image(s), rejected {h['rejected']}")
 
 def main():
     app()
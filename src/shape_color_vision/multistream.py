@@ -0,0 +1,320 @@
+"""
+multistream.py — Several cameras, videos or image folders in one process.
+
+Responsibilities:
+• Open N sources (webcam indices, video files, image directories), each
+  read by its own capture thread into a small per-stream buffer with a drop
+  policy ("latest" for live cameras, "block" for files by default).
+• Schedule detection on a shared pool of worker threads: streams are
+  visited round-robin, so a busy stream cannot starve the others, and each
+  stream has at most one frame in flight (its tracker / incremental state
+  sees frames in order).
+• Keep per-stream state (tracker, incremental detector) and counters, and
+  report frames processed, frames dropped and FPS per stream.
+
+Does NOT:
+• Display or record video; every stream runs headless and is logged.
+
+Notes:
+• All streams share one logger (guarded by a lock); rows carry each
+  stream's own source (CAMERA / VIDEO / IMAGE) and name. Rows of an image
+  directory carry each file's own name.
+• Image directories are independent stills: they get no tracker and no
+  incremental detector.
+• Worker threads keep one Workspace each; buffers grow to the largest
+  frame size they have seen.
+"""
+
+from __future__ import annotations
+
+import glob
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .detection.results import DetectionResult
+from .detection.tracker import ObjectTracker
+from .incremental import IncrementalDetector
+from .io.video import VideoSource
+from .pipeline import make_incremental, make_tracker, process_frame
+from .streaming import DROP_POLICIES
+from .workspace import Workspace
+
+
+class ImageDirSource:
+    """The images of a directory in sorted order, read like a video."""
+
+    def __init__(self, path: str):
+        self.paths = sorted(p for p in glob.glob(os.path.join(path, "*")) if os.path.isfile(p))
+        self.current = ""              # file name of the image last read
+        self._i = 0
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        while self._i < len(self.paths):
+            path = self.paths[self._i]
+            img = cv2.imread(path)
+            self._i += 1
+            if img is not None:
+                self.current = os.path.basename(path)
+                return True, img
+        return False, None
+
+    def release(self) -> None:
+        pass
+
+
+@dataclass
+class StreamStats:
+    frames: int = 0
+    dropped: int = 0
+    busy_ms: float = 0.0           # detection time spent on this stream
+    t_first: float = 0.0           # perf_counter of the first frame captured
+    t_last: float = 0.0            # perf_counter of the last frame finished
+
+    @property
+    def fps(self) -> float:
+        elapsed = self.t_last - self.t_first
+        return self.frames / elapsed if elapsed > 0 else 0.0
+
+
+@dataclass
+class Stream:
+    name: str
+    source: str                    # log source: CAMERA / VIDEO / IMAGE
+    read: Callable[[], Tuple[bool, Optional[np.ndarray]]]
+    release: Callable[[], None] = lambda: None
+    item_name: Callable[[], str] | None = None   # name of the frame just read (default: the stream's)
+    policy: str = "latest"
+    queue_size: int = 2
+    tracker: ObjectTracker | None = None
+    incremental: IncrementalDetector | None = None
+    stats: StreamStats = field(default_factory=StreamStats)
+    # scheduler state (guarded by the scheduler's condition)
+    buffer: deque = field(default_factory=deque)   # (frame, item name)
+    busy: bool = False
+    ended: bool = False
+
+    def __post_init__(self):
+        if self.policy not in DROP_POLICIES:
+            raise ValueError(f"drop policy must be one of {DROP_POLICIES}, got {self.policy!r}")
+
+    @property
+    def done(self) -> bool:
+        return self.ended and not self.buffer and not self.busy
+
+
+def parse_source(spec: str) -> Tuple[str, str]:
+    """'name=source' or 'source' → (name, source); the name defaults to the source's base name."""
+    name, sep, src = spec.partition("=")
+    if not sep:
+        src = spec
+        name = f"cam{spec}" if spec.isdigit() else (os.path.basename(os.path.normpath(spec)) or spec)
+    return name, src
+
+def open_stream(spec: str, cfg, policy: str | None = None, queue_size: int = 2) -> Stream:
+    """
+    Stream for a webcam index ('0'), a directory of images or a video file,
+    with its own tracker / incremental detector from cfg (not for image
+    directories, whose frames are unrelated). `policy` None picks "latest"
+    for cameras and "block" for files.
+    """
+    name, src = parse_source(spec)
+    if os.path.isdir(src):
+        d = ImageDirSource(src)
+        return Stream(
+            name=name, source="IMAGE", read=d.read, release=d.release, item_name=lambda: d.current,
+            policy=policy or "block", queue_size=queue_size,
+        )
+    if src.isdigit():
+        cap = cv2.VideoCapture(int(src))
+        if not cap.isOpened():
+            raise FileNotFoundError(f"could not open camera {src}")
+        kind, read, release, default = "CAMERA", cap.read, cap.release, "latest"
+    else:
+        v = VideoSource(src)
+        kind, read, release, default = "VIDEO", v.read, v.release, "block"
+
+    tracker = make_tracker(cfg)
+    return Stream(
+        name=name, source=kind, read=read, release=release,
+        policy=policy or default, queue_size=queue_size,
+        tracker=tracker, incremental=make_incremental(cfg, tracker),
+    )
+
+
+class _LockedLogger:
+    """Serializes log() calls of several workers into one logger."""
+
+    def __init__(self, logger):
+        self._logger = logger
+        self._lock = threading.Lock()
+
+    def log(self, *args, **kwargs) -> None:
+        with self._lock:
+            self._logger.log(*args, **kwargs)
+
+
+class MultiStreamScheduler:
+    """
+    capture thread per stream → per-stream buffer → shared worker pool
+
+    `process(stream, frame, workspace, name)` runs on a worker thread, `name`
+    being the frame's item name (the stream's, or an image's file name); the
+    default detects with `cfg` (camera settings) and logs into `logger`.
+    """
+
+    def __init__(
+        self,
+        streams: List[Stream],
+        cfg=None,
+        logger=None,
+        workers: int = 4,
+        process: Callable[[Stream, np.ndarray, Workspace, str], DetectionResult] | None = None,
+    ):
+        names = [s.name for s in streams]
+        if len(set(names)) != len(names):
+            raise ValueError(f"stream names must be unique, got {names}")
+        self.streams = streams
+        self.workers = max(1, int(workers))
+        if process is None:
+            locked = _LockedLogger(logger) if logger is not None else None
+            params = cfg.runtime("camera") if hasattr(cfg, "runtime") else cfg
+
+            def process(stream, frame, ws, name):
+                return process_frame(
+                    frame, params, locked, tracker=stream.tracker, incremental=stream.incremental,
+                    source=stream.source, name=name, workspace=ws,
+                )
+        self._process = process
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._rr = 0
+        self._threads: List[threading.Thread] = []
+        self._error: Optional[BaseException] = None
+
+    # ---------- capture ----------
+
+    def _capture_loop(self, s: Stream) -> None:
+        try:
+            while not self._stop.is_set():
+                ok, frame = s.read()
+                if not ok or frame is None:
+                    break
+                name = s.item_name() if s.item_name is not None else s.name
+                with self._cond:
+                    if s.stats.t_first == 0.0:
+                        s.stats.t_first = time.perf_counter()
+                    if s.policy == "block":
+                        while len(s.buffer) >= s.queue_size and not self._stop.is_set():
+                            self._cond.wait(0.05)
+                    elif len(s.buffer) >= s.queue_size:
+                        s.buffer.popleft()
+                        s.stats.dropped += 1
+                    s.buffer.append((frame, name))
+                    self._cond.notify_all()
+        except BaseException as e:  # surfaced by run()
+            self._error = e
+        finally:
+            with self._cond:
+                s.ended = True
+                self._cond.notify_all()
+
+    # ---------- scheduling ----------
+
+    def _next(self) -> Optional[Tuple[Stream, np.ndarray, str]]:
+        """Next (stream, frame, name) in round-robin order; None once all streams are done."""
+        with self._cond:
+            while not self._stop.is_set():
+                n = len(self.streams)
+                for k in range(n):
+                    s = self.streams[(self._rr + k) % n]
+                    if s.buffer and not s.busy:
+                        self._rr = (self._rr + k + 1) % n
+                        s.busy = True
+                        frame, name = s.buffer.popleft()
+                        self._cond.notify_all()   # room for a blocked capture thread
+                        return s, frame, name
+                if all(s.done for s in self.streams):
+                    return None
+                self._cond.wait(0.05)
+            return None
+
+    def _worker_loop(self) -> None:
+        ws = Workspace()
+        try:
+            while True:
+                job = self._next()
+                if job is None:
+                    break
+                s, frame, name = job
+                t0 = time.perf_counter()
+                try:
+                    self._process(s, frame, ws, name)
+                finally:
+                    t1 = time.perf_counter()
+                    with self._cond:
+                        s.busy = False
+                        s.stats.frames += 1
+                        s.stats.busy_ms += (t1 - t0) * 1000.0
+                        s.stats.t_last = t1
+                        self._cond.notify_all()
+        except BaseException as e:
+            self._error = e
+            self._stop.set()
+
+    # ---------- control ----------
+
+    def start(self) -> "MultiStreamScheduler":
+        for s in self.streams:
+            t = threading.Thread(target=self._capture_loop, args=(s,), name=f"scv-capture-{s.name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker_loop, name=f"scv-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=2.0)
+        self._threads.clear()
+        for s in self.streams:
+            s.release()
+
+    def run(self, progress: Callable[["MultiStreamScheduler"], None] | None = None, interval: float = 5.0) -> None:
+        """Process until every stream ends (or Ctrl+C); `progress` is called every `interval` s."""
+        self.start()
+        last = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                with self._cond:
+                    if all(s.done for s in self.streams):
+                        break
+                    self._cond.wait(0.1)
+                if progress is not None and time.perf_counter() - last >= interval:
+                    last = time.perf_counter()
+                    progress(self)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+        if self._error is not None:
+            raise self._error
+
+    def summary(self) -> str:
+        lines = [f"{'stream':<16}{'source':<8}{'frames':>8}{'dropped':>9}{'fps':>8}{'ms/frame':>10}"]
+        for s in self.streams:
+            st = s.stats
+            ms = st.busy_ms / st.frames if st.frames else 0.0
+            lines.append(f"{s.name:<16}{s.source:<8}{st.frames:>8}{st.dropped:>9}{st.fps:>8.1f}{ms:>10.2f}")
+        return "\n".join(lines)
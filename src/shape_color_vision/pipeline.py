@@ -19,162 +19,555 @@ from __future__ import annotations
 
 import os
 import glob
-from typing import Iterable, Tuple
+import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice, repeat
+from typing import TYPE_CHECKING, Iterable, Iterator, Tuple
 
 import cv2
 import numpy as np
 
-from .detection.shapes import contour_is_valid, classify_shape
-from .detection.colors import classify_color
+from .detection.shapes import ContourFeatures, classify_shape, filter_contours
+from .detection.colors import ColorLUT, FrameContext, classify_colors_batch, compile_color_lut
+from .detection.results import DetectionResult, SHAPE_IDS
+from .detection.tracker import ObjectTracker
+from . import profiling
 from .io.logger_csv import CSVLogger
+from .io.logger_sqlite import SQLITE_SUFFIXES, SQLiteLogger
+from .io.result_cache import ResultCache, content_hash
+from .io.viz import draw_detections, render
+from .utils.config import RuntimeParams, compile_runtime
+from .workspace import Workspace
+
+if TYPE_CHECKING:
+    from .incremental import IncrementalDetector
 
 # ───────────────────────── helpers: read settings from cfg ─────────────────────────
 
-def _detect_obj(cfg, for_camera: bool):
-    if for_camera and getattr(cfg, "camera_detect", None):
-        return cfg.camera_detect
-    if not for_camera and getattr(cfg, "image_detect", None):
-        return cfg.image_detect
-    return cfg.detect
+def _params(cfg, for_camera: bool) -> RuntimeParams:
+    """`cfg` itself if it is already compiled, else its RuntimeParams for the mode."""
+    if isinstance(cfg, RuntimeParams):
+        return cfg
+    return compile_runtime(cfg, "camera" if for_camera else "image")
+
+def _app_config(cfg):
+    """The AppConfig behind `cfg` (for logging, tracking … settings)."""
+    return cfg.config if isinstance(cfg, RuntimeParams) else cfg
 
 def _detect_kwargs(cfg, for_camera: bool) -> dict:
-    d = _detect_obj(cfg, for_camera)
+    return dict(_params(cfg, for_camera).filter_kwargs)
+
+def _detect_scale(cfg, for_camera: bool) -> float:
+    """Resolution factor for masking/contours (1.0 = full resolution)."""
+    return _params(cfg, for_camera).scale
+
+def _scaled_kwargs(kwargs: dict, fx: float, fy: float) -> dict:
+    """Contour filter thresholds for an image resized by (fx, fy); ratios stay as they are."""
     return dict(
-        min_area=int(getattr(d, "min_area", 800)),
-        min_solidity=float(getattr(d, "min_solidity", 0.65)),
-        min_bbox_area_ratio=float(getattr(d, "min_bbox_area_ratio", 0.0015)),
-        min_extent=float(getattr(d, "min_extent", 0.50)),
-        min_width=int(getattr(d, "min_width", 16)),
-        min_height=int(getattr(d, "min_height", 16)),
+        kwargs,
+        min_area=kwargs["min_area"] * fx * fy,
+        min_width=kwargs["min_width"] * fx,
+        min_height=kwargs["min_height"] * fy,
     )
 
 def _mask_sv(cfg, for_camera: bool) -> tuple[int, int]:
-    mask = None
-    if for_camera and getattr(cfg, "camera_mask", None):
-        mask = cfg.camera_mask
-    elif not for_camera and getattr(cfg, "image_mask", None):
-        mask = cfg.image_mask
-    if mask is not None:
-        return int(getattr(mask, "s_min", 40)), int(getattr(mask, "v_min", 40))
-    return (35, 45) if for_camera else (40, 40)
-
-def _pastel_s_thresh(cfg) -> int:
-    return int(getattr(getattr(cfg, "detect", None), "pastel_s_thresh", 90))
+    p = _params(cfg, for_camera)
+    return p.s_min, p.v_min
+
+def color_lut(cfg) -> ColorLUT:
+    """Color lookup table compiled from cfg.colors_hsv (cached per distinct ranges)."""
+    if isinstance(cfg, RuntimeParams):
+        return cfg.lut
+    return compile_color_lut(getattr(cfg, "colors_hsv", None))
+
+def open_logger(cfg, track_ids: bool = False) -> CSVLogger | SQLiteLogger:
+    """Detection logger selected by cfg.logging.backend (or the log path suffix).
+
+    track_ids=True makes a new CSV log carry a track_id column.
+    """
+    cfg = _app_config(cfg)
+    log = getattr(cfg, "logging", None)
+    path = cfg.paths.log_csv
+    backend = str(getattr(log, "backend", "auto")).lower()
+    if backend == "auto":
+        backend = "sqlite" if path.lower().endswith(SQLITE_SUFFIXES) else "csv"
+    if backend not in ("csv", "sqlite"):
+        raise ValueError(f"unknown logging.backend {backend!r} (expected csv, sqlite or auto)")
+
+    ttl = getattr(log, "dedup_ttl_s", None)
+    cap = getattr(log, "dedup_capacity", None)
+    common = dict(
+        flush_interval=float(getattr(log, "flush_interval_s", 1.0)),
+        dedup_ttl=float(ttl) if ttl is not None else None,
+        dedup_capacity=int(cap) if cap is not None else None,
+    )
+    flush_rows = int(getattr(log, "flush_rows", 256))
+    if backend == "sqlite":
+        return SQLiteLogger(path, unique=bool(getattr(log, "unique", False)), batch_rows=flush_rows, **common)
+    return CSVLogger(
+        path,
+        buffered=bool(getattr(log, "buffered", False)),
+        flush_rows=flush_rows,
+        track_ids=track_ids,
+        **common,
+    )
+
+# Bump when detection output changes for identical settings (invalidates result caches)
+DETECTION_VERSION = 1
+
+def detection_config_hash(cfg, for_camera: bool = False) -> str:
+    """Digest of every setting that affects detect() output in this mode."""
+    payload = (
+        DETECTION_VERSION,
+        _mask_sv(cfg, for_camera),
+        sorted(_detect_kwargs(cfg, for_camera).items()),
+        _detect_scale(cfg, for_camera),
+        _params(cfg, for_camera).max_candidates,
+        color_lut(cfg).key,
+    )
+    return hashlib.sha256(repr(payload).encode()).hexdigest()
+
+def make_result_cache(cfg) -> ResultCache | None:
+    """ResultCache configured from cfg.cache, or None when caching is off."""
+    c = getattr(_app_config(cfg), "cache", None)
+    if c is None or not getattr(c, "enabled", False):
+        return None
+    return ResultCache(str(c.dir), max_bytes=int(float(c.max_mb) * 1024 * 1024))
+
+def make_tracker(cfg) -> ObjectTracker | None:
+    """ObjectTracker configured from cfg.tracking, or None when tracking is off."""
+    t = getattr(_app_config(cfg), "tracking", None)
+    if t is None or not getattr(t, "enabled", False):
+        return None
+    return ObjectTracker(
+        iou_match=float(t.iou_match),
+        stable_iou=float(t.stable_iou),
+        max_area_change=float(t.max_area_change),
+        refresh_frames=int(t.refresh_frames),
+        max_misses=int(t.max_misses),
+    )
+
+def make_incremental(cfg, tracker: ObjectTracker | None = None) -> IncrementalDetector | None:
+    """IncrementalDetector configured from cfg.incremental, or None when disabled."""
+    inc = getattr(_app_config(cfg), "incremental", None)
+    if inc is None or not getattr(inc, "enabled", False):
+        return None
+    from .incremental import IncrementalDetector
+    return IncrementalDetector(
+        cfg,
+        for_camera=True,
+        tile=int(inc.tile),
+        diff_thresh=int(inc.diff_thresh),
+        margin_tiles=int(inc.margin_tiles),
+        tracker=tracker,
+    )
 
 # ───────────────────────── helpers: image ops ─────────────────────────
 
-def _color_mask(img: np.ndarray, s_min: int, v_min: int) -> np.ndarray:
-    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-    mask = cv2.inRange(hsv, (0, s_min, v_min), (179, 255, 255))
-    k = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, k, iterations=1)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, k, iterations=2)
-    return mask
+_MASK_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+
+def _color_mask(
+    img: np.ndarray, s_min: int, v_min: int, hsv: np.ndarray | None = None, ws: Workspace | None = None,
+) -> np.ndarray:
+    """Saturated/bright pixels, opened and closed. With `ws` the result is a reused buffer."""
+    if ws is None:
+        if hsv is None:
+            hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        mask = cv2.inRange(hsv, (0, s_min, v_min), (179, 255, 255))
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, _MASK_KERNEL, iterations=1)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, _MASK_KERNEL, iterations=2)
+        return mask
 
-def _filled_roi_mask(contour: np.ndarray, w: int, h: int, x: int, y: int) -> np.ndarray:
+    h, w = img.shape[:2]
+    if hsv is None:
+        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV, dst=ws.get("mask_hsv", (h, w, 3)))
+    a, b = ws.get("mask_a", (h, w)), ws.get("mask_b", (h, w))
+    a = cv2.inRange(hsv, (0, s_min, v_min), (179, 255, 255), dst=a)
+    b = cv2.morphologyEx(a, cv2.MORPH_OPEN, _MASK_KERNEL, dst=b, iterations=1)
+    return cv2.morphologyEx(b, cv2.MORPH_CLOSE, _MASK_KERNEL, dst=a, iterations=2)
+
+def _upscale_contour(c: np.ndarray, fx: float, fy: float, w: int, h: int) -> np.ndarray:
+    """Map a contour found on an image resized by (fx, fy) back to full resolution (pixel centers)."""
+    pts = c.reshape(-1, 2).astype(np.float64)
+    pts[:, 0] = (pts[:, 0] + 0.5) / fx - 0.5
+    pts[:, 1] = (pts[:, 1] + 0.5) / fy - 0.5
+    pts = np.rint(pts)
+    np.clip(pts[:, 0], 0, w - 1, out=pts[:, 0])
+    np.clip(pts[:, 1], 0, h - 1, out=pts[:, 1])
+    return pts.astype(np.int32).reshape(-1, 1, 2)
+
+_ROI_KERNEL = np.ones((3, 3), np.uint8)
+
+def _filled_roi_mask(contour: np.ndarray, w: int, h: int, x: int, y: int, ws: Workspace | None = None) -> np.ndarray:
     """Binary ROI mask filled with the contour, then eroded to ignore bright outlines."""
-    roi_mask = np.zeros((h, w), dtype=np.uint8)
-    c_shift = contour.copy()
-    c_shift[:, 0, 0] -= x
-    c_shift[:, 0, 1] -= y
-    cv2.drawContours(roi_mask, [c_shift], -1, 255, thickness=-1)
+    if ws is None:
+        roi_mask, out = np.zeros((h, w), dtype=np.uint8), None
+    else:
+        roi_mask, out = ws.zeros("roi_fill", (h, w)), ws.get("roi_mask", (h, w))
+    cv2.drawContours(roi_mask, [contour], -1, 255, thickness=-1, offset=(-x, -y))
     # shrink slightly so color sampling avoids the neon-green border
-    roi_mask = cv2.erode(roi_mask, np.ones((3, 3), np.uint8), iterations=1)
-    return roi_mask
-
-def _draw_label(img: np.ndarray, text: str, org: Tuple[int, int], scale: float = 0.7) -> None:
-    x, y = org
-    cv2.putText(img, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, scale, (0, 0, 0), 5, cv2.LINE_AA)
-    cv2.putText(img, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, scale, (255, 255, 255), 2, cv2.LINE_AA)
+    return cv2.erode(roi_mask, _ROI_KERNEL, dst=out, iterations=1)
 
 # ───────────────────────── public API ─────────────────────────
 
-def analyze_image(path: str, cfg) -> np.ndarray:
-    img = cv2.imread(path)
-    if img is None:
-        raise FileNotFoundError(path)
+def detect(
+    img: np.ndarray,
+    cfg,
+    for_camera: bool = False,
+    tracker: ObjectTracker | None = None,
+    workspace: Workspace | None = None,
+) -> DetectionResult:
+    """
+    Run masking, contour filtering and classification on one BGR frame.
+
+    Does not draw, log or modify `img`; see io.viz.render and
+    log_detections for the optional consumers of the result.
+    With a `tracker`, objects get stable track ids and stable objects reuse
+    their cached classification instead of being classified again.
+    `cfg` is an AppConfig or the RuntimeParams of a mode (which then
+    decides the mode instead of `for_camera`).
+    A `workspace` (one per stream) keeps the frame-sized intermediates
+    (HSV, masks, color ROI masks) between calls instead of reallocating them.
+    """
+    if img is None or img.size == 0:
+        return DetectionResult.empty()
+    with profiling.frame("detect"):
+        return _detect(img, _params(cfg, for_camera), tracker, workspace)
 
+def _detect(
+    img: np.ndarray, params: RuntimeParams, tracker: ObjectTracker | None, ws: Workspace | None = None,
+) -> DetectionResult:
     h_img, w_img = img.shape[:2]
     img_area = int(h_img * w_img)
 
-    s_min, v_min = _mask_sv(cfg, for_camera=False)
-    mask = _color_mask(img, s_min, v_min)
-    cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-    logger = CSVLogger(cfg.paths.log_csv)
-    detect_kwargs = _detect_kwargs(cfg, for_camera=False)
-
-    for c in cnts:
-        if not contour_is_valid(c, **detect_kwargs, image_area=img_area):
-            continue
-
-        x, y, w, h = cv2.boundingRect(c)
-        roi = img[y:y + h, x:x + w]
-        roi_mask = _filled_roi_mask(c, w, h, x, y)
-
-        color, p_color = classify_color(roi, cfg.colors_hsv.__dict__, _pastel_s_thresh(cfg), roi_mask=roi_mask)
-        shape, p_shape = classify_shape(c)
-
-        label = "UNKNOWN Unknown" if (shape == "Unknown" and color == "unknown") else f"{color.upper()} {shape}"
-        cv2.drawContours(img, [c], -1, (0, 255, 0), 2)
-        _draw_label(img, label, (x, max(20, y - 6)))
-
-        logger.log(shape, color, float(max(p_color, p_shape)), "IMAGE", os.path.basename(path))
-
-    return img
+    with profiling.stage("hsv"):
+        ctx = FrameContext.from_bgr(img, ws)
+    s_min, v_min = params.s_min, params.v_min
+    detect_kwargs = params.filter_kwargs
+
+    scale = params.scale
+    if scale >= 1.0:
+        with profiling.stage("mask"):
+            mask = _color_mask(img, s_min, v_min, hsv=ctx.hsv, ws=ws)
+        with profiling.stage("contours"):
+            cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        with profiling.stage("filter"):
+            _, kept = filter_contours(cnts, **detect_kwargs, image_area=img_area, max_candidates=params.max_candidates)
+        profiling.count("contours", len(cnts))
+        profiling.count("rejected", len(cnts) - len(kept))
+        return _classify(ctx, kept, tracker, lut=params.lut, ws=ws)
+
+    # Coarse-to-fine: mask, contours and filtering on a downscaled frame;
+    # contours go back to full resolution for color sampling and drawing.
+    sw, sh = max(1, round(w_img * scale)), max(1, round(h_img * scale))
+    fx, fy = sw / w_img, sh / h_img
+    with profiling.stage("resize"):
+        dst = ws.get("small", (sh, sw, 3)) if ws is not None else None
+        small = cv2.resize(img, (sw, sh), dst=dst, interpolation=cv2.INTER_AREA)
+    with profiling.stage("mask"):
+        mask = _color_mask(small, s_min, v_min, ws=ws)
+    with profiling.stage("contours"):
+        cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    small_kwargs = _scaled_kwargs(detect_kwargs, fx, fy)
+    with profiling.stage("filter"):
+        _, kept = filter_contours(cnts, **small_kwargs, image_area=sw * sh, max_candidates=params.max_candidates)
+        full = [ContourFeatures(_upscale_contour(f.contour, fx, fy, w_img, h_img)) for f in kept]
+    profiling.count("contours", len(cnts))
+    profiling.count("rejected", len(cnts) - len(kept))
+    return _classify(ctx, kept, tracker, geometry=full, lut=params.lut, ws=ws)
+
+def _classify(
+    ctx: FrameContext,
+    kept: list[ContourFeatures],
+    tracker: ObjectTracker | None = None,
+    known: tuple | None = None,
+    geometry: list[ContourFeatures] | None = None,
+    lut: ColorLUT | None = None,
+    ws: Workspace | None = None,
+) -> DetectionResult:
+    """
+    Classify accepted contours.
+
+    Shapes are classified on `kept`. Colors are sampled, and results are
+    reported, on `geometry` when given: the same contours at full
+    resolution when `kept` came from a downscaled frame.
+
+    Skips contours whose labels are already known: `known` is an optional
+    (mask, shape_ids, color_ids, shape_conf, color_conf) tuple of per-contour
+    arrays supplied by the caller, and a tracker may reuse cached labels
+    for stable objects. `lut` is the compiled colors_hsv table (default
+    ranges when None); `ws` supplies reused mask buffers.
+    """
+    n = len(kept)
+    if geometry is None:
+        geometry = kept
+    contours = [f.contour for f in geometry]
+    bboxes = [f.bbox for f in geometry]
+
+    shape_ids = np.zeros(n, dtype=np.int8)
+    color_ids = np.zeros(n, dtype=np.int8)
+    shape_conf = np.zeros(n, dtype=np.float64)
+    color_conf = np.zeros(n, dtype=np.float64)
+
+    need = np.ones(n, dtype=bool)
+    if known is not None:
+        have = known[0]
+        shape_ids[have], color_ids[have], shape_conf[have], color_conf[have] = (a[have] for a in known[1:])
+        need &= ~have
+
+    track_ids = None
+    if tracker is not None:
+        areas = [f.area for f in geometry]
+        with profiling.stage("track"):
+            track_ids, reuse = tracker.match(bboxes, areas)
+        reuse &= need
+        if reuse.any():
+            shape_ids[reuse], color_ids[reuse], shape_conf[reuse], color_conf[reuse] = tracker.cached(track_ids[reuse])
+        need &= ~reuse
+    todo = np.flatnonzero(need)
+    profiling.count("classified", len(todo))
+    profiling.count("reused", n - len(todo))
+
+    with profiling.stage("color"):
+        ids, conf = classify_colors_batch(ctx, [contours[i] for i in todo], [bboxes[i] for i in todo], lut=lut, ws=ws)
+    color_ids[todo], color_conf[todo] = ids, conf
+    with profiling.stage("shape"):
+        for i in todo:
+            name, p = classify_shape(kept[i])
+            shape_ids[i], shape_conf[i] = SHAPE_IDS[name], p
+
+    if tracker is not None and len(todo):
+        tracker.record(
+            track_ids[todo], [bboxes[i] for i in todo], [areas[i] for i in todo],
+            shape_ids[todo], color_ids[todo], shape_conf[todo], color_conf[todo],
+        )
+
+    return DetectionResult.from_parts(contours, bboxes, shape_ids, color_ids, shape_conf, color_conf, track_ids)
+
+def log_detections(result: DetectionResult, logger: CSVLogger | SQLiteLogger, source: str, name: str) -> None:
+    with profiling.stage("log"):
+        for i, (shape, color, conf) in enumerate(result):
+            logger.log(shape, color, conf, source, name, track_id=result.track_id(i))
+
+def analyze_image(path: str, cfg, annotate: bool = True) -> np.ndarray:
+    """Detect and log one image file; returns it annotated (as read when not `annotate`)."""
+    with profiling.frame(os.path.basename(path)):
+        with profiling.stage("read"):
+            img = cv2.imread(path)
+        if img is None:
+            raise FileNotFoundError(path)
+
+        result = detect(img, cfg, for_camera=False)
+        with open_logger(cfg) as logger:
+            log_detections(result, logger, "IMAGE", os.path.basename(path))
+        # the image was decoded here, so it can be annotated in place
+        return draw_detections(img, result) if annotate else img
+
+def _analyze_dir_init() -> None:
+    # one OpenCV thread per worker process; the pool provides the parallelism
+    cv2.setNumThreads(1)
+
+def _load_image(
+    path: str,
+    need_image: bool,
+    cache: ResultCache | None = None,
+    cfg_digest: str = "",
+) -> Tuple[np.ndarray | None, str | None, DetectionResult | None]:
+    """
+    Decode `path`, or look it up in `cache` first.
+
+    Returns (image, cache key, cached result). On a cache hit the image is
+    only decoded when `need_image` (drawing, saving or display).
+    """
+    if cache is None:
+        return cv2.imread(path), None, None
+    with open(path, "rb") as f:
+        data = f.read()
+    key = cache.key(content_hash(data), cfg_digest)
+    cached = cache.get(key)
+    img = None
+    if cached is None or need_image:
+        img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    return img, key, cached
+
+def _analyze_dir_one(
+    path: str,
+    cfg,
+    keep_image: bool,
+    cache: ResultCache | None = None,
+    cfg_digest: str = "",
+) -> Tuple[str, DetectionResult, np.ndarray | None]:
+    """Detect (and optionally render/save) one image; runs in a worker or in-process."""
+    with profiling.stage("read"):
+        loaded = _load_image(path, _needs_image(cfg, keep_image), cache, cfg_digest)
+    return _analyze_loaded(path, loaded, cfg, keep_image, cache)
+
+def _needs_image(cfg, keep_image: bool) -> bool:
+    return keep_image or bool(getattr(cfg.video, "save_output", False))
+
+def _analyze_loaded(path: str, loaded, cfg, keep_image: bool, cache: ResultCache | None) -> Tuple[str, DetectionResult, np.ndarray | None]:
+    img, key, result = loaded
+    if result is None:
+        if img is None:
+            raise FileNotFoundError(path)
+        result = detect(img, cfg, for_camera=False)
+        if cache is not None:
+            cache.put(key, result)
+    elif img is None and _needs_image(cfg, keep_image):
+        raise FileNotFoundError(path)
 
-def analyze_dir(dir_path: str, cfg) -> None:
-    paths: Iterable[str] = sorted(
+    out = None
+    save = getattr(cfg.video, "save_output", False)
+    if save or keep_image:
+        out = draw_detections(img, result)
+        if save:
+            cv2.imwrite(os.path.join(cfg.paths.output_dir, os.path.basename(path)), out)
+    return path, result, (out if keep_image else None)
+
+def iter_analyze(
+    paths: Iterable[str],
+    cfg,
+    prefetch: int = 2,
+    keep_image: bool = False,
+    cache: ResultCache | None = None,
+) -> Iterator[Tuple[str, DetectionResult, np.ndarray | None]]:
+    """
+    Lazily analyze `paths` in order, yielding (path, result, annotated image).
+
+    The next `prefetch` images are decoded in a thread pool while the
+    current one is processed, so at most prefetch + 1 decoded images are
+    held at a time; `paths` may be any (lazy) iterable. The annotated image
+    is None unless `keep_image`; cfg.video.save_output still saves it.
+    Work the consumer does on an item counts towards that image's
+    profiling frame. With a result `cache`, images whose content and
+    detection settings are unchanged skip detection (and decoding, unless
+    the annotated image is needed).
+    """
+    paths = iter(paths)
+    digest = detection_config_hash(cfg) if cache is not None else ""
+    need_image = _needs_image(cfg, keep_image)
+    if prefetch <= 0:
+        for p in paths:
+            with profiling.frame(os.path.basename(p)):
+                yield _analyze_dir_one(p, cfg, keep_image, cache, digest)
+        return
+
+    with ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="scv-decode") as pool:
+        def load(p):
+            return pool.submit(_load_image, p, need_image, cache, digest)
+
+        pending = deque((p, load(p)) for p in islice(paths, prefetch))
+        while pending:
+            p, future = pending.popleft()
+            for nxt in islice(paths, 1):
+                pending.append((nxt, load(nxt)))
+            with profiling.frame(os.path.basename(p)):
+                with profiling.stage("read_wait"):
+                    loaded = future.result()
+                yield _analyze_loaded(p, loaded, cfg, keep_image, cache)
+
+def analyze_dir(
+    dir_path: str,
+    cfg,
+    workers: int = 1,
+    prefetch: int = 2,
+    cache: ResultCache | None = None,
+) -> list[str]:
+    """
+    Analyze every file in `dir_path` in sorted order, once each; returns the paths.
+
+    With workers > 1 images are processed in a process pool. Results come
+    back in input order and are logged by a single CSVLogger in this
+    process, so the CSV matches a sequential run row for row. A single
+    worker streams through iter_analyze, decoding `prefetch` images ahead.
+    With a result `cache`, unchanged images skip detection; the cache is
+    trimmed to its size budget at the end.
+    """
+    paths: list[str] = sorted(
         p for p in glob.glob(os.path.join(dir_path, "*"))
         if os.path.isfile(p)
     )
     os.makedirs(cfg.paths.output_dir, exist_ok=True)
 
-    for p in paths:
-        out = analyze_image(p, cfg)
-
-        if getattr(cfg.video, "show_window", True):
-            cv2.imshow("Result", out)
-            cv2.waitKey(200)
-
-        if getattr(cfg.video, "save_output", False):
-            out_path = os.path.join(cfg.paths.output_dir, os.path.basename(p))
-            cv2.imwrite(out_path, out)
-
-    if getattr(cfg.video, "show_window", True):
+    show = getattr(cfg.video, "show_window", True)
+
+    def consume(results: Iterable[Tuple[str, DetectionResult, np.ndarray | None]]) -> None:
+        for p, result, out in results:
+            log_detections(result, logger, "IMAGE", os.path.basename(p))
+            if show:
+                cv2.imshow("Result", out)
+                cv2.waitKey(200)
+
+    with open_logger(cfg) as logger:
+        if workers > 1 and len(paths) > 1:
+            n = min(workers, len(paths))
+            chunk = max(1, len(paths) // (n * 4))
+            digest = detection_config_hash(cfg) if cache is not None else ""
+            with ProcessPoolExecutor(max_workers=n, initializer=_analyze_dir_init) as pool:
+                consume(pool.map(
+                    _analyze_dir_one, paths, repeat(cfg), repeat(show), repeat(cache), repeat(digest), chunksize=chunk,
+                ))
+        else:
+            consume(iter_analyze(paths, cfg, prefetch=prefetch, keep_image=show, cache=cache))
+
+    if show:
         cv2.destroyAllWindows()
-
-def analyze_frame(img: np.ndarray, cfg, logger: CSVLogger | None = None) -> np.ndarray:
+    if cache is not None:
+        cache.evict()
+    return paths
+
+def process_frame(
+    img: np.ndarray,
+    cfg,
+    logger: CSVLogger | SQLiteLogger | None = None,
+    tracker: ObjectTracker | None = None,
+    incremental: IncrementalDetector | None = None,
+    source: str = "CAMERA",
+    name: str = "webcam",
+    workspace: Workspace | None = None,
+) -> DetectionResult:
+    """
+    Detect and log one camera (or video) frame without rendering (headless).
+
+    With an `incremental` detector (see incremental.py) only regions that
+    changed since the previous frame are re-processed; it owns its tracker.
+    `source` / `name` go into the log rows. Pass the stream's `workspace`
+    to reuse frame buffers across calls (see detect).
+    """
+    if img is None or img.size == 0:
+        return DetectionResult.empty()
+
+    with profiling.frame("frame"):
+        if incremental is not None:
+            result = incremental.detect(img)
+        else:
+            result = detect(img, cfg, for_camera=True, tracker=tracker, workspace=workspace)
+        if logger is None:
+            with open_logger(cfg) as logger:
+                log_detections(result, logger, source, name)
+        else:
+            log_detections(result, logger, source, name)
+        return result
+
+def analyze_frame(
+    img: np.ndarray,
+    cfg,
+    logger: CSVLogger | SQLiteLogger | None = None,
+    tracker: ObjectTracker | None = None,
+    incremental: IncrementalDetector | None = None,
+    source: str = "CAMERA",
+    name: str = "webcam",
+    workspace: Workspace | None = None,
+) -> np.ndarray:
+    """
+    process_frame, then return an annotated copy of the frame (`img` itself
+    is not modified). Streams that render separately, or not at all, call
+    process_frame and io.viz.render instead.
+    """
     if img is None or img.size == 0:
         return img
-
-    h, w = img.shape[:2]
-    img_area = int(h * w)
-
-    s_min, v_min = _mask_sv(cfg, for_camera=True)
-    mask = _color_mask(img, s_min, v_min)
-    cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-    if logger is None:
-        logger = CSVLogger(cfg.paths.log_csv)
-
-    detect_kwargs = _detect_kwargs(cfg, for_camera=True)
-
-    for c in cnts:
-        if not contour_is_valid(c, **detect_kwargs, image_area=img_area):
-            continue
-
-        x, y, ww, hh = cv2.boundingRect(c)
-        roi = img[y:y + hh, x:x + ww]
-        roi_mask = _filled_roi_mask(c, ww, hh, x, y)
-
-        color, p_color = classify_color(roi, cfg.colors_hsv.__dict__, _pastel_s_thresh(cfg), roi_mask=roi_mask)
-        shape, p_shape = classify_shape(c)
-
-        label = "UNKNOWN Unknown" if (shape == "Unknown" and color == "unknown") else f"{color.upper()} {shape}"
-        cv2.drawContours(img, [c], -1, (0, 255, 0), 2)
-        _draw_label(img, label, (x, max(20, y - 6)))
-
-        logger.log(shape, color, float(max(p_color, p_shape)), "CAMERA", "webcam")
-
-    return img
+    with profiling.frame("frame"):
+        result = process_frame(img, cfg, logger, tracker, incremental, source, name, workspace)
+        return render(img, result)
@@ -0,0 +1,183 @@
+"""
+profiling.py — Optional per-stage timers and counters for the pipeline.
+
+Responsibilities:
+• Time named pipeline stages with perf_counter_ns and count events
+  (contours found / rejected / classified …) per frame.
+• Summarize stages as percentiles across frames and dump per-frame traces.
+
+Does NOT:
+• Change what the pipeline computes, or cost anything measurable when off.
+
+Notes:
+• The pipeline calls the module functions stage() / count() / frame();
+  with no profiler enabled they return a shared no-op and return early.
+• One profiler is active per process. Frames are opened by the top-level
+  entry points (detect, analyze_image, analyze_frame …); nested frame()
+  calls fold into the outer one.
+• Not thread-safe: the first thread to open a frame owns the profiler;
+  stages and counts from other threads (render, encode …) are ignored.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class _NullContext:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL = _NullContext()
+
+
+class _Stage:
+    __slots__ = ("prof", "name", "t0")
+
+    def __init__(self, prof: "Profiler", name: str):
+        self.prof = prof
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        dt = time.perf_counter_ns() - self.t0
+        stages = self.prof._stages
+        stages[self.name] = stages.get(self.name, 0) + dt
+        return False
+
+
+class _Frame:
+    __slots__ = ("prof", "label", "t0")
+
+    def __init__(self, prof: "Profiler", label: str):
+        self.prof = prof
+        self.label = label
+
+    def __enter__(self):
+        p = self.prof
+        if p._owner is None:
+            p._owner = threading.get_ident()
+        p._depth += 1
+        if p._depth == 1:
+            p._stages, p._counts = {}, {}
+            self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        p = self.prof
+        p._depth -= 1
+        if p._depth == 0:
+            p.frames.append({
+                "label": self.label,
+                "total_ns": time.perf_counter_ns() - self.t0,
+                "stages": p._stages,
+                "counts": p._counts,
+            })
+            # stages/counts outside any frame go to a scratch record that is dropped
+            p._stages, p._counts = {}, {}
+        return False
+
+
+class Profiler:
+    """
+    Collects one record per frame: total time, time per stage (ns, summed
+    when a stage runs several times in a frame) and event counters.
+    """
+
+    def __init__(self):
+        self.frames: List[dict] = []
+        self._owner: Optional[int] = None   # thread id that records
+        self._depth = 0
+        self._stages: Dict[str, int] = {}
+        self._counts: Dict[str, int] = {}
+
+    def frame(self, label: str = "") -> _Frame:
+        return _Frame(self, label)
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self._counts[name] = self._counts.get(name, 0) + int(n)
+
+    def owned(self) -> bool:
+        """True on the thread that records (any thread before the first frame)."""
+        return self._owner is None or self._owner == threading.get_ident()
+
+    def summary(self) -> str:
+        """Per-stage percentiles (ms) across frames and per-frame counter averages."""
+        if not self.frames:
+            return "profile: no frames recorded"
+        n = len(self.frames)
+        totals = np.array([f["total_ns"] for f in self.frames], dtype=np.float64) / 1e6
+
+        names: List[str] = []
+        for f in self.frames:
+            names += [k for k in f["stages"] if k not in names]
+
+        lines = [f"profile: {n} frame(s)", f"{'stage':<12}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'share':>8}"]
+
+        def row(name, ms):
+            p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+            share = ms.sum() / max(1e-9, totals.sum())
+            lines.append(f"{name:<12}{p50:9.2f}{p90:9.2f}{p99:9.2f}{ms.max():9.2f}{share:8.1%}")
+
+        for name in names:
+            row(name, np.array([f["stages"].get(name, 0) for f in self.frames], dtype=np.float64) / 1e6)
+        row("frame", totals)
+
+        counts: Dict[str, int] = {}
+        for f in self.frames:
+            for k, v in f["counts"].items():
+                counts[k] = counts.get(k, 0) + v
+        if counts:
+            lines.append("counts/frame: " + ", ".join(f"{k} {v / n:.1f}" for k, v in counts.items()))
+        return "\n".join(lines)
+
+    def dump_trace(self, path: str) -> None:
+        """Write one JSON object per frame (times in ns)."""
+        with open(path, "w", encoding="utf-8") as f:
+            for i, rec in enumerate(self.frames):
+                f.write(json.dumps({"frame": i, **rec}) + "\n")
+
+
+_active: Optional[Profiler] = None
+
+def enable(profiler: Optional[Profiler] = None) -> Profiler:
+    """Make `profiler` (or a new one) the active profiler and return it."""
+    global _active
+    _active = profiler if profiler is not None else Profiler()
+    return _active
+
+def disable() -> None:
+    global _active
+    _active = None
+
+def active() -> Optional[Profiler]:
+    return _active
+
+def stage(name: str):
+    p = _active
+    return _NULL if p is None or not p.owned() else _Stage(p, name)
+
+def frame(label: str = ""):
+    p = _active
+    return _NULL if p is None or not p.owned() else _Frame(p, label)
+
+def count(name: str, n: int = 1) -> None:
+    p = _active
+    if p is not None and p.owned():
+        p.count(name, n)
@@ -0,0 +1,291 @@
+"""
+server.py — Local HTTP detection service.
+
+Responsibilities:
+• DetectionService: decode image bytes with cv2.imdecode and run detect()
+  on a pool of worker threads that were warmed up at startup and share one
+  compiled RuntimeParams (each worker keeps its own frame Workspace).
+• Bound the work in flight: at most workers + max_queue images are accepted
+  at a time; anything beyond that is rejected at once (503 + Retry-After)
+  instead of piling up. A batch larger than that limit can never fit and
+  gets 413.
+• make_server: a ThreadingHTTPServer exposing the service as JSON.
+
+Endpoints:
+    GET  /health         {"status": "ok", "workers", "capacity", "pending", …}
+    POST /detect         body = encoded image (PNG, JPEG …) → one result
+    POST /detect/batch   body = {"images": [base64, …]} → {"results": [...]}
+
+    A result is {"width", "height", "ms", "detections": [{"shape", "color",
+    "confidence", "bbox", "track_id"}, …]}; add ?contours=1 for outlines.
+    In a batch, an image that fails to decode gets {"error": "..."} and the
+    others are still processed.
+
+Does NOT:
+• Log detections, draw, track or cache results: every request is independent.
+
+Notes:
+• Threads rather than processes: OpenCV releases the GIL during the heavy
+  calls, and workers share the compiled config and color LUT for free.
+• Meant for localhost; there is no authentication.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlparse
+
+import cv2
+import numpy as np
+
+from .pipeline import detect
+from .utils.config import RuntimeParams
+from .workspace import Workspace
+
+
+class Busy(Exception):
+    """The service already holds as many images as it accepts."""
+
+
+class BatchTooLarge(Exception):
+    """A batch holds more images than the service accepts at once, ever."""
+
+
+def _warm_up_image() -> np.ndarray:
+    """Small constant frame with a few colored shapes, enough to run every detection stage."""
+    img = np.full((120, 160, 3), 255, np.uint8)
+    cv2.rectangle(img, (10, 20), (60, 70), (0, 0, 255), -1)
+    cv2.circle(img, (110, 60), 28, (0, 180, 0), -1)
+    return img
+
+
+class DetectionService:
+    def __init__(self, params: RuntimeParams, workers: int = 4, max_queue: int = 32):
+        self.params = params
+        self.workers = max(1, int(workers))
+        self.capacity = self.workers + max(0, int(max_queue))
+        self.pending = 0              # images accepted and not yet answered
+        self.served = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scv-serve")
+        self._warm_up()
+
+    def _warm_up(self) -> None:
+        """Start every worker thread and run one detection on it."""
+        barrier = threading.Barrier(self.workers)
+        img = _warm_up_image()
+
+        def warm():
+            barrier.wait()            # keeps each task on its own thread
+            detect(img, self.params, workspace=self._workspace())
+
+        for f in [self._pool.submit(warm) for _ in range(self.workers)]:
+            f.result()
+
+    def _workspace(self) -> Workspace:
+        ws = getattr(self._local, "ws", None)
+        if ws is None:
+            ws = self._local.ws = Workspace()
+        return ws
+
+    # ---------- admission ----------
+
+    def reserve(self, n: int) -> None:
+        """
+        Admit `n` images, or raise BatchTooLarge (n can never fit) or Busy
+        (not right now); pair every success with release(n).
+        """
+        with self._lock:
+            if n > self.capacity:
+                self.rejected += n
+                raise BatchTooLarge(f"batch of {n} images exceeds the limit of {self.capacity} per request")
+            if self.pending + n > self.capacity:
+                self.rejected += n
+                raise Busy(f"{self.pending} image(s) pending, capacity {self.capacity}")
+            self.pending += n
+
+    def release(self, n: int) -> None:
+        with self._lock:
+            self.pending -= n
+            self.served += n
+
+    # ---------- detection ----------
+
+    def _detect_one(self, data: bytes, contours: bool) -> dict:
+        if not data:
+            raise ValueError("empty image")
+        try:
+            img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        except cv2.error:
+            img = None
+        if img is None:
+            raise ValueError("could not decode image")
+        t0 = time.perf_counter()
+        result = detect(img, self.params, workspace=self._workspace())
+        return {
+            "width": int(img.shape[1]),
+            "height": int(img.shape[0]),
+            "ms": round((time.perf_counter() - t0) * 1000.0, 3),
+            "detections": result.records(contours),
+        }
+
+    def detect_many(self, images: List[bytes], contours: bool = False) -> List[dict]:
+        """
+        Results for encoded `images`, in order (raises Busy / BatchTooLarge
+        when they do not fit). Images that fail to decode yield {"error": ...}.
+        """
+        self.reserve(len(images))
+        try:
+            futures = [self._pool.submit(self._detect_one, data, contours) for data in images]
+            out = []
+            for f in futures:
+                try:
+                    out.append(f.result())
+                except ValueError as e:
+                    out.append({"error": str(e)})
+            return out
+        finally:
+            self.release(len(images))
+
+    def health(self) -> dict:
+        with self._lock:
+            return {
+                "status": "ok",
+                "mode": self.params.mode,
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "pending": self.pending,
+                "served": self.served,
+                "rejected": self.rejected,
+            }
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+# ───────────────────────── HTTP ─────────────────────────
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "DetectionServer"
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, payload: dict, headers: dict | None = None) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str, headers: dict | None = None) -> None:
+        self._send(status, {"error": message}, headers)
+
+    def _body(self) -> bytes | None:
+        """Request body, or None after answering 400/411/413."""
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self._error(411, "Content-Length required")
+            return None
+        try:
+            n = int(length)
+        except ValueError:
+            n = -1
+        if n < 0:
+            self.close_connection = True      # body length unknown
+            self._error(400, f"invalid Content-Length {length!r}")
+            return None
+        limit = self.server.max_body_bytes
+        if n > limit:
+            # discard moderately oversized bodies so the client sees the 413
+            # instead of a reset; anything larger just gets the connection closed
+            if n <= 4 * limit:
+                while n > 0:
+                    chunk = self.rfile.read(min(n, 1 << 16))
+                    if not chunk:
+                        break
+                    n -= len(chunk)
+            self.close_connection = True
+            self._error(413, f"body exceeds {limit} bytes")
+            return None
+        return self.rfile.read(n)
+
+    def do_GET(self) -> None:
+        if urlparse(self.path).path == "/health":
+            self._send(200, self.server.service.health())
+        else:
+            self._error(404, "not found")
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path not in ("/detect", "/detect/batch"):
+            self.close_connection = True      # body left unread
+            self._error(404, "not found")
+            return
+        contours = parse_qs(url.query).get("contours", ["0"])[0] not in ("0", "false", "")
+        body = self._body()
+        if body is None:
+            return
+
+        if url.path == "/detect":
+            images = [body]
+        else:
+            try:
+                images = [base64.b64decode(s, validate=True) for s in json.loads(body)["images"]]
+            except (ValueError, KeyError, TypeError, binascii.Error):
+                self._error(400, 'expected {"images": [base64, …]}')
+                return
+
+        try:
+            results = self.server.service.detect_many(images, contours)
+        except Busy as e:
+            self._error(503, str(e), {"Retry-After": "1"})
+            return
+        except BatchTooLarge as e:
+            self._error(413, str(e))
+            return
+        except Exception as e:  # keep serving; report instead of dropping the connection
+            self._error(500, f"{type(e).__name__}: {e}")
+            return
+
+        if url.path == "/detect/batch":
+            self._send(200, {"results": results})
+        elif "error" in results[0]:
+            self._send(400, results[0])
+        else:
+            self._send(200, results[0])
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class DetectionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service: DetectionService, max_body_bytes: int = 32 * 1024 * 1024, verbose: bool = False):
+        super().__init__(address, _Handler)
+        self.service = service
+        self.max_body_bytes = int(max_body_bytes)
+        self.verbose = verbose
+
+
+def make_server(
+    service: DetectionService,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    max_body_bytes: int = 32 * 1024 * 1024,
+    verbose: bool = False,
+) -> DetectionServer:
+    """HTTP server for `service`; port 0 picks a free port (see server_address)."""
+    return DetectionServer((host, port), service, max_body_bytes=max_body_bytes, verbose=verbose)
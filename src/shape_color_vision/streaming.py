@@ -0,0 +1,268 @@
+"""
+streaming.py — Staged, multi-threaded frame pipeline for live sources.
+
+Responsibilities:
+• Run capture, detection, optional rendering and display/output as
+  separate stages joined by bounded queues, so camera latency and
+  rendering do not add up with detection time.
+• Apply a drop policy when a stage falls behind:
+    - "latest": drop the oldest queued frame (freshest frame wins)
+    - "block":  wait for room (no frame is ever dropped)
+• Measure end-to-end latency (capture → output) per frame.
+
+Notes:
+• OpenCV releases the GIL in most calls, so stages overlap on multi-core
+  machines.
+• The output stage runs in the caller's thread, because GUI calls such as
+  cv2.imshow must stay on the main thread.
+"""
+
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+DROP_POLICIES = ("latest", "block")
+
+_END = object()  # end-of-stream marker passed through the queues
+
+
+@dataclass
+class StreamFrame:
+    """One frame travelling through the stages (times from time.perf_counter_ns)."""
+    index: int
+    image: np.ndarray
+    t_capture: int
+    result: Any = None
+    output: Optional[np.ndarray] = None
+    t_detected: int = 0
+    t_output: int = 0
+
+    @property
+    def latency_ms(self) -> float:
+        """Capture → output latency; capture → detection while not yet output."""
+        end = self.t_output or self.t_detected
+        return (end - self.t_capture) / 1e6 if end else 0.0
+
+
+class FrameQueue:
+    """Bounded queue between two stages, with a drop policy."""
+
+    def __init__(self, maxsize: int = 2, policy: str = "latest"):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"drop policy must be one of {DROP_POLICIES}, got {policy!r}")
+        self._q: queue.Queue = queue.Queue(maxsize=max(1, int(maxsize)))
+        self.policy = policy
+        self.dropped = 0
+
+    def put(self, item, stop: threading.Event) -> bool:
+        """Enqueue `item`; returns False if `stop` was set before it fit."""
+        if self.policy == "block":
+            return self._put_wait(item, stop)
+
+        while True:
+            try:
+                self._q.put_nowait(item)
+                return True
+            except queue.Full:
+                try:
+                    self._q.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def _put_wait(self, item, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                self._q.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def put_end(self, stop: threading.Event) -> None:
+        """Enqueue the end-of-stream marker behind the queued frames (under
+        either policy it waits for room); frames are only evicted once
+        `stop` is set."""
+        if self._put_wait(_END, stop):
+            return
+        while True:
+            try:
+                self._q.put_nowait(_END)
+                return
+            except queue.Full:
+                try:
+                    self._q.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: float = 0.05):
+        return self._q.get(timeout=timeout)
+
+
+@dataclass
+class LatencyStats:
+    """End-to-end latency summary of a finished stream."""
+    latencies_ms: List[float] = field(default_factory=list)
+    dropped: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    stopped: float = 0.0
+
+    def add(self, frame: StreamFrame) -> None:
+        self.latencies_ms.append(frame.latency_ms)
+
+    @property
+    def fps(self) -> float:
+        elapsed = (self.stopped or time.perf_counter()) - self.started
+        return len(self.latencies_ms) / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        if not self.latencies_ms:
+            return "no frames processed"
+        lat = np.asarray(self.latencies_ms)
+        p50, p95 = np.percentile(lat, [50, 95])
+        return (
+            f"{len(lat)} frame(s), {self.fps:.1f} FPS, dropped {self.dropped}; "
+            f"latency ms: mean {lat.mean():.1f}, p50 {p50:.1f}, p95 {p95:.1f}, max {lat.max():.1f}"
+        )
+
+
+class StagedPipeline:
+    """
+    capture thread → [queue] → detection thread → [queue] → (render thread → [queue] →) output (caller)
+
+    `read()` returns (ok, frame) like cv2.VideoCapture.read; the stream ends
+    when it returns ok=False. `process(frame)` returns (result, output image).
+    With `render(frame, result)`, the output image is produced on its own
+    thread instead, so annotation never holds up detection of the next
+    frame (process may then return None as its output).
+    Iterate over frames() in the caller's thread to consume outputs; each
+    frame's latency is recorded when the consumer asks for the next one.
+    """
+
+    def __init__(
+        self,
+        read: Callable[[], Tuple[bool, np.ndarray]],
+        process: Callable[[np.ndarray], Tuple[Any, Optional[np.ndarray]]],
+        queue_size: int = 2,
+        drop_policy: str = "latest",
+        render: Optional[Callable[[np.ndarray, Any], np.ndarray]] = None,
+    ):
+        self._read = read
+        self._process = process
+        self._render = render
+        self._in = FrameQueue(queue_size, drop_policy)
+        self._mid = FrameQueue(queue_size, drop_policy) if render is not None else None
+        self._out = FrameQueue(queue_size, drop_policy)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._error: Optional[BaseException] = None
+        self.stats = LatencyStats()
+
+    # ---------- stages ----------
+
+    def _capture_loop(self) -> None:
+        index = 0
+        try:
+            while not self._stop.is_set():
+                ok, frame = self._read()
+                if not ok or frame is None:
+                    break
+                item = StreamFrame(index=index, image=frame, t_capture=time.perf_counter_ns())
+                if not self._in.put(item, self._stop):
+                    break
+                index += 1
+        except BaseException as e:  # surfaced to the consumer
+            self._error = e
+        finally:
+            self._in.put_end(self._stop)
+
+    def _stage_loop(self, src: FrameQueue, dst: FrameQueue, work: Callable[[StreamFrame], None]) -> None:
+        try:
+            while True:
+                try:
+                    item = src.get()
+                except queue.Empty:
+                    if self._stop.is_set():
+                        break
+                    continue
+                if item is _END:
+                    break
+                work(item)
+                if not dst.put(item, self._stop):
+                    break
+        except BaseException as e:
+            self._error = e
+        finally:
+            dst.put_end(self._stop)
+
+    def _detect(self, item: StreamFrame) -> None:
+        item.result, item.output = self._process(item.image)
+        item.t_detected = time.perf_counter_ns()
+
+    def _render_frame(self, item: StreamFrame) -> None:
+        item.output = self._render(item.image, item.result)
+
+    # ---------- control ----------
+
+    def start(self) -> "StagedPipeline":
+        self.stats = LatencyStats()
+        stages = [(self._capture_loop, (), "capture")]
+        if self._render is None:
+            stages.append((self._stage_loop, (self._in, self._out, self._detect), "detect"))
+        else:
+            stages.append((self._stage_loop, (self._in, self._mid, self._detect), "detect"))
+            stages.append((self._stage_loop, (self._mid, self._out, self._render_frame), "render"))
+        for target, args, name in stages:
+            t = threading.Thread(target=target, args=args, name=f"scv-{name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=2.0)
+        self._threads.clear()
+        self.stats.dropped = self._in.dropped + self._out.dropped + (self._mid.dropped if self._mid is not None else 0)
+        self.stats.stopped = time.perf_counter()
+
+    def frames(self) -> Iterator[StreamFrame]:
+        """Yield processed frames in order until the source ends or stop() is called."""
+        prev: Optional[StreamFrame] = None
+        try:
+            while True:
+                if prev is not None:
+                    prev.t_output = time.perf_counter_ns()
+                    self.stats.add(prev)
+                    prev = None
+                try:
+                    item = self._out.get()
+                except queue.Empty:
+                    if self._stop.is_set():
+                        break
+                    continue
+                if item is _END:
+                    break
+                prev = item
+                yield item
+        finally:
+            if prev is not None:
+                prev.t_output = time.perf_counter_ns()
+                self.stats.add(prev)
+            self.stop()
+            if self._error is not None:
+                raise self._error
+
+    def __enter__(self) -> "StagedPipeline":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
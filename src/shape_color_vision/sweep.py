@@ -0,0 +1,288 @@
+"""
+sweep.py — Parameter sweeps over a labeled image set with cached stages.
+
+Responsibilities:
+• Expand a grid of config values (dotted keys such as image_mask.s_min or
+  image_detect.min_area) into parameter sets.
+• Evaluate each set against labeled images: precision / recall / F1 on the
+  (shape, color) pairs, plus an ms/image estimate from the stage timings.
+• Reuse intermediate results across sets: HSV per image, masks and contour
+  features keyed by (scale, s_min, v_min), labels per contour keyed by mask
+  and color ranges. A filter threshold change re-runs only the filter.
+
+Does NOT:
+• Log, draw or write config files; the caller prints or saves the table.
+
+Notes:
+• Results equal those of pipeline.detect() with the same config (tracking
+  and incremental detection are not part of a sweep).
+• ms/image adds up the measured cost of the stages a parameter set uses,
+  whether they were computed for it or reused from the cache.
+"""
+
+from __future__ import annotations
+
+import copy
+import itertools
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+import yaml
+
+from .detection.colors import COLOR_NAMES, ColorLUT, FrameContext, classify_colors_batch
+from .detection.shapes import ContourFeatures, _is_solid, classify_shape, contour_stats, prefilter_contours
+from .pipeline import (
+    _color_mask, _detect_kwargs, _params, _detect_scale, _mask_sv, _scaled_kwargs, _upscale_contour, color_lut,
+)
+
+
+@dataclass
+class LabeledImage:
+    name: str
+    img: np.ndarray
+    labels: Counter            # (shape, color) → count
+
+
+@dataclass
+class _MaskEntry:
+    feats: List[ContourFeatures]       # at detection scale (filter + shapes)
+    geometry: List[ContourFeatures]    # at full resolution (colors)
+    areas: np.ndarray                  # contour_stats of feats
+    bboxes: np.ndarray
+    ms: float                          # mask + contours (+ resize)
+    image_area: int
+    scale: Tuple[float, float]
+
+
+@dataclass
+class _LabelEntry:
+    shapes: List[str]
+    colors: List[str]
+    ms: np.ndarray                     # per-contour classification cost
+
+
+@dataclass
+class SweepStats:
+    mask_hits: int = 0
+    mask_misses: int = 0
+    label_hits: int = 0
+    label_misses: int = 0
+
+
+# ───────────────────────── inputs ─────────────────────────
+
+def load_labeled_set(labels_path: str) -> List[LabeledImage]:
+    """
+    Images and labels from a YAML file; image paths are relative to it:
+
+        samples/shapes_test1.png:
+          - [Circle, blue]
+          - [Unknown, unknown]
+    """
+    with open(labels_path, "r", encoding="utf-8") as f:
+        spec = yaml.safe_load(f) or {}
+    base = os.path.dirname(os.path.abspath(labels_path))
+    out = []
+    for name in sorted(spec):
+        img = cv2.imread(os.path.join(base, name))
+        if img is None:
+            raise FileNotFoundError(os.path.join(base, name))
+        out.append(LabeledImage(name, img, Counter((str(s), str(c)) for s, c in spec[name] or [])))
+    return out
+
+def parse_params(params: List[str]) -> Dict[str, list]:
+    """['image_mask.s_min=30,40', …] → {'image_mask.s_min': [30, 40], …}"""
+    grid = {}
+    for p in params:
+        key, sep, values = p.partition("=")
+        if not sep or not values:
+            raise ValueError(f"expected key=v1,v2,… got {p!r}")
+        grid[key.strip()] = [yaml.safe_load(v) for v in values.split(",")]
+    return grid
+
+def load_grid(path: str) -> Dict[str, list]:
+    """Grid from a YAML mapping of dotted keys to value lists."""
+    with open(path, "r", encoding="utf-8") as f:
+        grid = yaml.safe_load(f) or {}
+    return {str(k): list(v) for k, v in grid.items()}
+
+def expand_grid(grid: Dict[str, list]) -> List[Dict[str, object]]:
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+def apply_params(cfg, params: Dict[str, object]):
+    """Copy of `cfg` with dotted-key overrides applied (keys must exist)."""
+    cfg = copy.deepcopy(cfg)
+    for key, value in params.items():
+        *path, leaf = key.split(".")
+        obj = cfg
+        for part in path:
+            obj = getattr(obj, part, None)
+            if obj is None:
+                raise KeyError(f"unknown config section in {key!r}")
+        if not hasattr(obj, leaf):
+            raise KeyError(f"unknown config key {key!r}")
+        setattr(obj, leaf, value)
+    return cfg
+
+# ───────────────────────── cached stages ─────────────────────────
+
+class SweepCache:
+    """Intermediate results shared by all parameter sets of a sweep."""
+
+    def __init__(self, images: List[LabeledImage]):
+        self.images = images
+        self.stats = SweepStats()
+        self._ctx: Dict[int, Tuple[FrameContext, float]] = {}
+        self._masks: Dict[tuple, _MaskEntry] = {}
+        self._labels: Dict[tuple, _LabelEntry] = {}
+
+    def context(self, i: int) -> Tuple[FrameContext, float]:
+        if i not in self._ctx:
+            t0 = time.perf_counter()
+            ctx = FrameContext.from_bgr(self.images[i].img)
+            self._ctx[i] = (ctx, (time.perf_counter() - t0) * 1000.0)
+        return self._ctx[i]
+
+    def mask(self, i: int, scale: float, s_min: int, v_min: int) -> _MaskEntry:
+        key = (i, scale, s_min, v_min)
+        entry = self._masks.get(key)
+        if entry is not None:
+            self.stats.mask_hits += 1
+            return entry
+        self.stats.mask_misses += 1
+
+        img = self.images[i].img
+        ctx, _ = self.context(i)
+        h, w = img.shape[:2]
+        t0 = time.perf_counter()
+        if scale >= 1.0:
+            mask = _color_mask(img, s_min, v_min, hsv=ctx.hsv)
+            sw, sh, fx, fy = w, h, 1.0, 1.0
+        else:
+            sw, sh = max(1, round(w * scale)), max(1, round(h * scale))
+            fx, fy = sw / w, sh / h
+            mask = _color_mask(cv2.resize(img, (sw, sh), interpolation=cv2.INTER_AREA), s_min, v_min)
+        cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        ms = (time.perf_counter() - t0) * 1000.0
+
+        areas, bboxes = contour_stats(cnts)
+        feats = [ContourFeatures.from_stats(c, a, b) for c, a, b in zip(cnts, areas, bboxes)]
+        geometry = feats if scale >= 1.0 else [ContourFeatures(_upscale_contour(c, fx, fy, w, h)) for c in cnts]
+        entry = self._masks[key] = _MaskEntry(feats, geometry, areas, bboxes, ms, sw * sh, (fx, fy))
+        return entry
+
+    def labels(self, i: int, mask_key: tuple, entry: _MaskEntry, lut: ColorLUT) -> _LabelEntry:
+        """Shape and color of every contour of a mask (filter-independent)."""
+        key = (i, mask_key, lut.key)
+        cached = self._labels.get(key)
+        if cached is not None:
+            self.stats.label_hits += 1
+            return cached
+        self.stats.label_misses += 1
+
+        ctx, _ = self.context(i)
+        n = len(entry.feats)
+        ms = np.zeros(n)
+        t0 = time.perf_counter()
+        ids, _ = classify_colors_batch(ctx, [f.contour for f in entry.geometry], [f.bbox for f in entry.geometry], lut=lut)
+        if n:
+            ms += (time.perf_counter() - t0) * 1000.0 / n
+        shapes = []
+        for j, f in enumerate(entry.feats):
+            t0 = time.perf_counter()
+            shapes.append(classify_shape(f)[0])
+            ms[j] += (time.perf_counter() - t0) * 1000.0
+        cached = self._labels[key] = _LabelEntry(shapes, [COLOR_NAMES[c] for c in ids], ms)
+        return cached
+
+# ───────────────────────── evaluation ─────────────────────────
+
+@dataclass
+class SweepRow:
+    params: Dict[str, object]
+    precision: float
+    recall: float
+    f1: float
+    exact: int                 # images whose detections equal their labels
+    images: int
+    ms_per_image: float
+    detections: Dict[str, List[Tuple[str, str]]] = field(default_factory=dict)
+
+    @property
+    def fps(self) -> float:
+        return 1000.0 / self.ms_per_image if self.ms_per_image > 0 else float("inf")
+
+
+def evaluate(cache: SweepCache, cfg, for_camera: bool = False) -> SweepRow:
+    """Score one (already parameterized) config on the cached image set."""
+    s_min, v_min = _mask_sv(cfg, for_camera)
+    scale = _detect_scale(cfg, for_camera)
+    kwargs = _detect_kwargs(cfg, for_camera)
+    min_solidity = kwargs.pop("min_solidity")
+    max_candidates = _params(cfg, for_camera).max_candidates
+    lut = color_lut(cfg)
+
+    tp = n_pred = n_true = exact = 0
+    total_ms = 0.0
+    detections = {}
+    for i, item in enumerate(cache.images):
+        _, hsv_ms = cache.context(i)
+        entry = cache.mask(i, scale, s_min, v_min)
+        labels = cache.labels(i, (scale, s_min, v_min), entry, lut)
+
+        fx, fy = entry.scale
+        fk = kwargs if scale >= 1.0 else _scaled_kwargs(kwargs, fx, fy)
+        t0 = time.perf_counter()
+        # same steps as filter_contours, on the cached features (hulls computed once per mask)
+        cand = prefilter_contours(
+            entry.areas, entry.bboxes, **fk, image_area=entry.image_area, max_candidates=max_candidates,
+        )
+        keep = [j for j in cand.tolist() if _is_solid(entry.feats[j], min_solidity)]
+        filter_ms = (time.perf_counter() - t0) * 1000.0
+
+        pred = [(labels.shapes[j], labels.colors[j]) for j in keep]
+        got = Counter(pred)
+        tp += sum((got & item.labels).values())
+        n_pred += len(pred)
+        n_true += sum(item.labels.values())
+        exact += got == item.labels
+        total_ms += hsv_ms + entry.ms + filter_ms + float(labels.ms[keep].sum())
+        detections[item.name] = pred
+
+    precision = tp / n_pred if n_pred else 1.0
+    recall = tp / n_true if n_true else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    n = max(1, len(cache.images))
+    return SweepRow({}, precision, recall, f1, exact, len(cache.images), total_ms / n, detections)
+
+def run_sweep(images: List[LabeledImage], cfg, grid: Dict[str, list], for_camera: bool = False) -> Tuple[List[SweepRow], SweepStats]:
+    """Evaluate every parameter set of `grid`; rows are sorted best F1 first, then fastest."""
+    cache = SweepCache(images)
+    rows = []
+    for params in expand_grid(grid):
+        row = evaluate(cache, apply_params(cfg, params), for_camera)
+        row.params = params
+        rows.append(row)
+    rows.sort(key=lambda r: (-r.f1, r.ms_per_image))
+    return rows, cache.stats
+
+def format_table(rows: List[SweepRow]) -> str:
+    if not rows:
+        return "(no parameter sets)"
+    keys = list(rows[0].params)
+    head = keys + ["precision", "recall", "f1", "exact", "ms/img", "fps"]
+    body = [
+        [str(r.params[k]) for k in keys]
+        + [f"{r.precision:.3f}", f"{r.recall:.3f}", f"{r.f1:.3f}", f"{r.exact}/{r.images}", f"{r.ms_per_image:.2f}", f"{r.fps:.1f}"]
+        for r in rows
+    ]
+    widths = [max(len(h), *(len(b[c]) for b in body)) for c, h in enumerate(head)]
+    lines = ["  ".join(h.rjust(w) for h, w in zip(head, widths))]
+    lines += ["  ".join(v.rjust(w) for v, w in zip(b, widths)) for b in body]
+    return "\n".join(lines)
@@ -6,6 +6,8 @@ Responsibilities:
 • Provide typed access (dict-like or attribute-like) to config values.
 • Validate required fields and apply defaults.
 • Isolate system parameters so detection code stays flexible (OCP).
+• Compile the detection settings of one mode into a frozen RuntimeParams
+  and hot-reload them from the YAML file (ConfigWatcher).
 
 Notes:
 • Contains no detection or visualization logic.
@@ -14,12 +16,20 @@ Notes:
 
 
 
+import os
+import time
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping
 
 # src/shape_color_vision/utils/config.py
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import yaml
 
+from ..detection.colors import ColorLUT, compile_color_lut
+
+MODES = ("image", "camera")
+
 @dataclass
 class Paths:
     image_dir: str = "data/samples"
@@ -42,6 +52,8 @@ class Detect:
     min_extent: float = 0.50
     min_width: int = 16
     min_height: int = 16
+    scale: float = 1.0            # run masking/contours at this fraction of the input resolution
+    max_candidates: int = 0       # hull/solidity test only for the N largest pre-filtered contours (0 = all)
 
 @dataclass
 class HSVRanges:
@@ -57,6 +69,47 @@ class Mask:
     s_min: int = 40
     v_min: int = 40
 
+@dataclass
+class Log:
+    backend: str = "auto"         # "csv", "sqlite", or "auto" (by paths.log_csv suffix)
+    unique: bool = False          # sqlite: reject duplicate (shape, color, source, name) in the store
+    buffered: bool = False        # keep the CSV open, write rows from a background thread
+    flush_rows: int = 256         # flush once this many rows are pending ...
+    flush_interval_s: float = 1.0 # ... or after this many seconds
+    dedup_ttl_s: float | None = None   # re-log a repeated detection after this window (None = never)
+    dedup_capacity: int | None = None  # remember at most this many detections (None = unbounded)
+
+@dataclass
+class Tracking:
+    enabled: bool = False         # camera: track objects and reuse their classification
+    iou_match: float = 0.3        # min IoU to continue a track
+    stable_iou: float = 0.85      # min IoU vs. the last classified box to reuse its labels
+    max_area_change: float = 0.15 # max relative area change to reuse its labels
+    refresh_frames: int = 30      # reclassify at least this often
+    max_misses: int = 5           # drop a track after this many frames unseen
+
+@dataclass
+class Incremental:
+    enabled: bool = False         # camera: only re-process tiles that changed
+    tile: int = 64                # tile size (px) for frame differencing
+    diff_thresh: int = 12         # per-pixel change (0..255) that marks a tile as changed
+    margin_tiles: int = 1         # also re-process this many tiles around a change
+
+@dataclass
+class Cache:
+    enabled: bool = False         # image command: skip images whose content and config are unchanged
+    dir: str = "cache/results"
+    max_mb: float = 256.0         # least recently used entries are evicted beyond this
+
+@dataclass
+class Serve:
+    host: str = "127.0.0.1"
+    port: int = 8765
+    mode: str = "image"           # detection settings used for requests (image / camera)
+    workers: int = 4              # detection threads, warmed up at startup
+    max_queue: int = 32           # images waiting for a worker before requests get 503
+    max_body_mb: float = 32.0     # larger request bodies get 413
+
 @dataclass
 class AppConfig:
     paths: Paths
@@ -68,6 +121,15 @@ class AppConfig:
     camera_detect: Detect | None = None
     image_mask: Mask | None = None
     camera_mask: Mask | None = None
+    logging: Log = field(default_factory=Log)
+    tracking: Tracking = field(default_factory=Tracking)
+    incremental: Incremental = field(default_factory=Incremental)
+    cache: Cache = field(default_factory=Cache)
+    serve: Serve = field(default_factory=Serve)
+
+    def runtime(self, mode: str = "image") -> "RuntimeParams":
+        """Frozen detection settings for `mode`; see compile_runtime."""
+        return compile_runtime(self, mode)
 
 def load_config(path: str) -> AppConfig:
     with open(path, "r", encoding="utf-8") as f:
@@ -83,6 +145,11 @@ def load_config(path: str) -> AppConfig:
     camera_detect = Detect(**cfg["camera_detect"]) if "camera_detect" in cfg else None
     image_mask = Mask(**cfg["image_mask"]) if "image_mask" in cfg else None
     camera_mask = Mask(**cfg["camera_mask"]) if "camera_mask" in cfg else None
+    logging = Log(**(cfg.get("logging") or {}))
+    tracking = Tracking(**(cfg.get("tracking") or {}))
+    incremental = Incremental(**(cfg.get("incremental") or {}))
+    cache = Cache(**(cfg.get("cache") or {}))
+    serve = Serve(**(cfg.get("serve") or {}))
 
     return AppConfig(
         paths=paths,
@@ -93,4 +160,127 @@ def load_config(path: str) -> AppConfig:
         camera_detect=camera_detect,
         image_mask=image_mask,
         camera_mask=camera_mask,
+        logging=logging,
+        tracking=tracking,
+        incremental=incremental,
+        cache=cache,
+        serve=serve,
     )
+
+
+# ───────────────────────── compiled runtime parameters ─────────────────────────
+
+@dataclass(frozen=True)
+class RuntimeParams:
+    """
+    Detection settings of one mode, resolved once and frozen.
+
+    The pipeline accepts this wherever it takes a cfg; per-frame code then
+    reads plain attributes instead of resolving per-mode sections and
+    defaults again. Edits to the AppConfig after compiling do not show up
+    here: compile again (or use ConfigWatcher) to pick them up.
+    """
+    mode: str
+    s_min: int
+    v_min: int
+    filter_kwargs: Mapping[str, float]     # contour_is_valid thresholds (read-only)
+    scale: float                           # masking/contour resolution factor
+    max_candidates: int                    # cap on contours reaching the hull test (0 = none)
+    lut: ColorLUT                          # compiled colors_hsv
+    config: Any = field(compare=False, repr=False)   # AppConfig it was compiled from
+
+    @property
+    def for_camera(self) -> bool:
+        return self.mode == "camera"
+
+
+def compile_runtime(cfg: AppConfig, mode: str = "image") -> RuntimeParams:
+    """Resolve per-mode sections, fallbacks and defaults of `cfg` into RuntimeParams."""
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+    camera = mode == "camera"
+
+    d = getattr(cfg, f"{mode}_detect", None) or cfg.detect
+    filter_kwargs = dict(
+        min_area=int(getattr(d, "min_area", 800)),
+        min_solidity=float(getattr(d, "min_solidity", 0.65)),
+        min_bbox_area_ratio=float(getattr(d, "min_bbox_area_ratio", 0.0015)),
+        min_extent=float(getattr(d, "min_extent", 0.50)),
+        min_width=int(getattr(d, "min_width", 16)),
+        min_height=int(getattr(d, "min_height", 16)),
+    )
+    scale = min(1.0, max(0.05, float(getattr(d, "scale", 1.0) or 1.0)))
+
+    mask = getattr(cfg, f"{mode}_mask", None)
+    if mask is not None:
+        s_min, v_min = int(getattr(mask, "s_min", 40)), int(getattr(mask, "v_min", 40))
+    else:
+        s_min, v_min = (35, 45) if camera else (40, 40)
+
+    return RuntimeParams(
+        mode=mode,
+        s_min=s_min,
+        v_min=v_min,
+        filter_kwargs=MappingProxyType(filter_kwargs),
+        scale=scale,
+        max_candidates=max(0, int(getattr(d, "max_candidates", 0) or 0)),
+        lut=compile_color_lut(getattr(cfg, "colors_hsv", None)),
+        config=cfg,
+    )
+
+def load_runtime(path: str, mode: str = "image") -> RuntimeParams:
+    return compile_runtime(load_config(path), mode)
+
+
+class ConfigWatcher:
+    """
+    Hot reload of one mode's RuntimeParams from a YAML file.
+
+    Call poll() between frames: at most every `interval` seconds it checks
+    the file's mtime/size and, when it changed, loads and compiles it. The
+    new params replace the old ones in a single assignment, so a frame
+    always sees one consistent set. A file that fails to load (e.g. caught
+    mid-save) keeps the previous params and is retried once it changes.
+    Only detection settings take effect; logging, tracking and the like
+    stay as they were at startup.
+    """
+
+    def __init__(self, path: str, mode: str = "image", interval: float = 0.5, clock=time.monotonic):
+        self.path = path
+        self.mode = mode
+        self.interval = float(interval)
+        self._clock = clock
+        self._stamp = self._file_stamp()
+        self.params = load_runtime(path, mode)
+        self._checked = clock()
+        self.reloads = 0
+        self.error: Exception | None = None
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def poll(self) -> RuntimeParams:
+        """Current params, reloaded first if the file changed."""
+        now = self._clock()
+        if now - self._checked < self.interval:
+            return self.params
+        self._checked = now
+
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return self.params
+        self._stamp = stamp
+        try:
+            params = load_runtime(self.path, self.mode)
+        except Exception as e:  # keep running on the last good config
+            self.error = e
+            return self.params
+        self.error = None
+        if params != self.params:
+            self.params = params
+            self.reloads += 1
+        return self.params
@@ -0,0 +1,159 @@
+"""
+synth.py — Seeded synthetic scenes with ground truth.
+
+Responsibilities:
+• Render non-overlapping shapes (circle, triangle, square, rectangle) in the
+  palette colors on a white background, at any resolution and object count.
+• Optionally add Gaussian noise and dark outlines.
+• Return the ground truth (bbox, shape, color) for every rendered object.
+
+Does NOT:
+• Run detection or time anything (see bench.py).
+
+Notes:
+• Same SceneSpec (including seed) → byte-identical image and truth.
+• Objects are placed one per grid cell, so very dense scenes get small
+  objects; those may fall below the detector's min_area on purpose.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+SHAPES = ("Circle", "Triangle", "Square", "Rectangle")
+
+# Saturated BGR values that sit in the middle of each default hue band
+PALETTE: Dict[str, Tuple[int, int, int]] = {
+    "red": (30, 30, 220),
+    "yellow": (20, 210, 230),
+    "green": (40, 180, 30),
+    "blue": (210, 60, 20),
+    "violet": (200, 30, 140),
+}
+
+# Named resolutions for specs and the benchmark presets
+RESOLUTIONS: Dict[str, Tuple[int, int]] = {
+    "vga": (640, 480),
+    "hd": (1280, 720),
+    "fhd": (1920, 1080),
+    "4k": (3840, 2160),
+    "8k": (7680, 4320),
+}
+
+
+@dataclass
+class SceneSpec:
+    width: int = 640
+    height: int = 480
+    objects: int = 10
+    seed: int = 0
+    shapes: Dict[str, float] = field(default_factory=lambda: {s: 1.0 for s in SHAPES})
+    colors: Dict[str, float] = field(default_factory=lambda: {c: 1.0 for c in PALETTE})
+    noise: float = 0.0        # std-dev of additive Gaussian noise (0..255 scale)
+    outline: int = 0          # dark outline thickness in px (0 = none)
+    fill: float = 0.7         # object size as a fraction of its grid cell
+
+
+@dataclass
+class TruthObject:
+    bbox: Tuple[int, int, int, int]   # x, y, w, h
+    shape: str
+    color: str
+
+
+def _pick(rng: np.random.Generator, weights: Dict[str, float], n: int) -> List[str]:
+    names = [k for k, w in weights.items() if w > 0]
+    if not names:
+        raise ValueError("scene mix must give at least one entry a positive weight")
+    p = np.array([weights[k] for k in names], dtype=np.float64)
+    return [names[i] for i in rng.choice(len(names), size=n, p=p / p.sum())]
+
+def _grid(w: int, h: int, n: int) -> Tuple[int, int]:
+    """Columns and rows of near-square cells, at least n of them."""
+    cols = max(1, int(np.ceil(np.sqrt(n * w / h))))
+    rows = max(1, int(np.ceil(n / cols)))
+    return cols, rows
+
+def _polygon(shape: str, cx: float, cy: float, size: float, aspect: float) -> np.ndarray:
+    r = size / 2.0
+    if shape == "Triangle":
+        ang = np.deg2rad([-90.0, 30.0, 150.0])
+        pts = np.stack([cx + r * np.cos(ang), cy + r * np.sin(ang)], axis=1)
+    elif shape == "Square":
+        pts = np.array([[cx - r, cy - r], [cx + r, cy - r], [cx + r, cy + r], [cx - r, cy + r]])
+    else:  # Rectangle: long side horizontal, short side = size / aspect
+        s = r / aspect
+        pts = np.array([[cx - r, cy - s], [cx + r, cy - s], [cx + r, cy + s], [cx - r, cy + s]])
+    return np.round(pts).astype(np.int32)
+
+def make_scene(spec: SceneSpec) -> Tuple[np.ndarray, List[TruthObject]]:
+    """Render `spec` into a BGR image and return it with its ground truth."""
+    w, h = int(spec.width), int(spec.height)
+    rng = np.random.default_rng(spec.seed)
+    img = np.full((h, w, 3), 255, dtype=np.uint8)
+
+    n = int(spec.objects)
+    cols, rows = _grid(w, h, n)
+    cw, ch = w / cols, h / rows
+    cells = rng.permutation(cols * rows)[:n]
+    shapes = _pick(rng, spec.shapes, n)
+    colors = _pick(rng, spec.colors, n)
+
+    truth: List[TruthObject] = []
+    for cell, shape, color in zip(cells, shapes, colors):
+        cell_min = min(cw, ch)
+        size = cell_min * spec.fill * rng.uniform(0.8, 1.0)
+        slack_x, slack_y = (cw - size) / 2.0, (ch - size) / 2.0
+        cx = (cell % cols + 0.5) * cw + rng.uniform(-slack_x, slack_x) * 0.5
+        cy = (cell // cols + 0.5) * ch + rng.uniform(-slack_y, slack_y) * 0.5
+        bgr = PALETTE[color]
+
+        if shape == "Circle":
+            r = int(round(size / 2.0))
+            c = (int(round(cx)), int(round(cy)))
+            cv2.circle(img, c, r, bgr, -1, cv2.LINE_AA)
+            if spec.outline:
+                cv2.circle(img, c, r, (20, 20, 20), spec.outline, cv2.LINE_AA)
+            bbox = (c[0] - r, c[1] - r, 2 * r + 1, 2 * r + 1)
+        else:
+            pts = _polygon(shape, cx, cy, size, rng.uniform(1.6, 2.2))
+            cv2.fillPoly(img, [pts], bgr, cv2.LINE_AA)
+            if spec.outline:
+                cv2.polylines(img, [pts], True, (20, 20, 20), spec.outline, cv2.LINE_AA)
+            bbox = cv2.boundingRect(pts)
+        truth.append(TruthObject(tuple(int(v) for v in bbox), shape, color))
+
+    if spec.noise > 0:
+        noisy = img.astype(np.float32) + rng.normal(0.0, spec.noise, img.shape).astype(np.float32)
+        img = np.clip(noisy, 0, 255).astype(np.uint8)
+    return img, truth
+
+def match_truth(truth: List[TruthObject], bboxes: np.ndarray, labels: List[Tuple[str, str]]) -> Dict[str, float]:
+    """
+    Match detections to ground truth by bbox center containment.
+
+    Returns recall (truth objects with a detection on them) and label
+    accuracy (matched objects whose shape and color are both right).
+    """
+    if not truth:
+        return {"recall": 1.0, "label_accuracy": 1.0}
+    b = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    centers = b[:, :2] + b[:, 2:] / 2.0
+    found = correct = 0
+    used = np.zeros(len(b), dtype=bool)
+    for t in truth:
+        x, y, w, h = t.bbox
+        inside = (~used & (centers[:, 0] >= x) & (centers[:, 0] <= x + w)
+                  & (centers[:, 1] >= y) & (centers[:, 1] <= y + h))
+        hits = np.flatnonzero(inside)
+        if not len(hits):
+            continue
+        j = hits[0]
+        used[j] = True
+        found += 1
+        correct += labels[j] == (t.shape, t.color)
+    return {"recall": found / len(truth), "label_accuracy": correct / max(1, found)}
@@ -0,0 +1,61 @@
+"""
+workspace.py — Reusable per-stream frame buffers.
+
+Responsibilities:
+• Hand out named scratch arrays (HSV frame, masks, color ROI masks …) that are
+  allocated once and reused on every following frame, so a camera or video
+  loop stops churning frame-sized arrays through the allocator.
+• Count allocations, so steady-state behavior can be checked (and shows up
+  as the `alloc` counter when profiling is on).
+
+Does NOT:
+• Decide which buffers a stage needs; detection code asks for them by name.
+
+Notes:
+• Buffers are flat and only grow: a request for a smaller shape is a view
+  into the existing buffer, a larger one (new frame size) reallocates.
+• Arrays returned by get() are overwritten by the next frame. Nothing that
+  outlives a frame (results, cached labels) may keep a reference to them.
+• One workspace per stream / thread; it is not thread-safe.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+from . import profiling
+
+
+class Workspace:
+    def __init__(self):
+        self._bufs: Dict[str, np.ndarray] = {}
+        self.allocations = 0
+        self.bytes_allocated = 0
+
+    def get(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """C-contiguous array `name` of `shape` / `dtype`; contents are undefined."""
+        dtype = np.dtype(dtype)
+        n = 1
+        for d in shape:
+            n *= int(d)
+        buf = self._bufs.get(name)
+        if buf is None or buf.dtype != dtype or buf.size < n:
+            buf = self._bufs[name] = np.empty(max(n, 1), dtype=dtype)
+            self.allocations += 1
+            self.bytes_allocated += buf.nbytes
+            profiling.count("alloc")
+        return buf[:n].reshape(shape)
+
+    def zeros(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        out = self.get(name, shape, dtype)
+        out.fill(0)
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        return sum(b.nbytes for b in self._bufs.values())
+
+    def clear(self) -> None:
+        self._bufs.clear()
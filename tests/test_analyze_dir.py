@@ -0,0 +1,34 @@
+# tests/test_analyze_dir.py
+import csv
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.utils.config import load_config
+from shape_color_vision.pipeline import analyze_dir
+
+
+def _run(tmp_path, workers):
+    cfg = load_config(str(ROOT / "configs" / "default.yaml"))
+    cfg.paths.output_dir = str(tmp_path / f"out{workers}")
+    cfg.paths.log_csv = str(tmp_path / f"det{workers}.csv")
+    cfg.video.show_window = False
+    cfg.video.save_output = True
+
+    analyze_dir(str(ROOT / "data" / "samples"), cfg, workers=workers)
+    with open(cfg.paths.log_csv, newline="", encoding="utf-8") as f:
+        rows = [r[1:] for r in csv.reader(f)]  # drop timestamps
+    outputs = sorted(p.name for p in Path(cfg.paths.output_dir).iterdir())
+    return rows, outputs
+
+
+def test_process_pool_matches_sequential(tmp_path):
+    seq_rows, seq_out = _run(tmp_path, 1)
+    par_rows, par_out = _run(tmp_path, 3)
+    assert len(seq_rows) > 1
+    assert par_rows == seq_rows
+    assert par_out == seq_out
@@ -0,0 +1,64 @@
+# tests/test_bench.py
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.bench import TIMED, _stage_times, compare, load_results, run_suite, save_results, scene_spec
+from shape_color_vision.pipeline import detect
+from shape_color_vision.utils.config import load_config
+from shape_color_vision.utils.synth import SceneSpec, make_scene, match_truth
+
+CFG = load_config(str(ROOT / "configs" / "default.yaml"))
+
+
+def test_scene_is_seeded():
+    a, ta = make_scene(SceneSpec(objects=12, seed=3, noise=5.0, outline=2))
+    b, tb = make_scene(SceneSpec(objects=12, seed=3, noise=5.0, outline=2))
+    c, _ = make_scene(SceneSpec(objects=12, seed=4))
+    assert np.array_equal(a, b) and ta == tb
+    assert not np.array_equal(a, c)
+    assert len(ta) == 12
+
+
+def test_scene_mix_is_respected():
+    _, truth = make_scene(SceneSpec(objects=30, shapes={"Circle": 1.0}, colors={"green": 1.0, "red": 0.0}))
+    assert {(t.shape, t.color) for t in truth} == {("Circle", "green")}
+
+
+def test_clean_scene_matches_ground_truth():
+    img, truth = make_scene(scene_spec("hd", seed=1, objects=40))
+    result = detect(img, CFG)
+    labels = [(result.shape(i), result.color(i)) for i in range(len(result))]
+    assert match_truth(truth, result.bboxes, labels) == {"recall": 1.0, "label_accuracy": 1.0}
+
+
+def test_batch_color_beats_the_per_contour_loop():
+    for spec in (scene_spec("vga", objects=10), scene_spec("fhd", objects=300)):
+        img, _ = make_scene(spec)
+        ms = _stage_times(img, CFG, repeat=3)
+        assert ms["color"] < ms["color_loop"], (spec, ms)
+
+
+def test_suite_json_and_baseline_compare(tmp_path):
+    results = run_suite([scene_spec("320x240", objects=4)], CFG, repeat=1)
+    rec = results["scenes"][0]
+    assert set(TIMED) <= set(rec["ms"])
+    assert rec["detected"] == 4 and rec["recall"] == 1.0
+
+    path = tmp_path / "bench.json"
+    save_results(results, str(path))
+    baseline = load_results(str(path))
+    assert compare(results, baseline) == []
+
+    # a baseline twice as fast and more accurate flags every metric
+    for k in TIMED:
+        baseline["scenes"][0]["ms"][k] = rec["ms"][k] / 2.0
+    baseline["scenes"][0]["label_accuracy"] = 2.0
+    regressions = compare(results, baseline, tolerance=0.25)
+    assert len(regressions) == len(TIMED) + 1
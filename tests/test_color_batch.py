@@ -0,0 +1,67 @@
+# tests/test_color_batch.py
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.detection.colors import (
+    COLOR_NAMES, FrameContext, classify_color, classify_colors_batch,
+)
+from shape_color_vision.pipeline import _color_mask, _filled_roi_mask
+
+SAMPLES = sorted((ROOT / "data" / "samples").glob("*.png"))
+
+
+def _per_contour(img, contours):
+    out = []
+    for c in contours:
+        x, y, w, h = cv2.boundingRect(c)
+        roi_mask = _filled_roi_mask(c, w, h, x, y)
+        out.append(classify_color(img[y:y + h, x:x + w], {}, roi_mask=roi_mask))
+    return out
+
+
+def _check(img, contours):
+    ctx = FrameContext.from_bgr(img)
+    bboxes = [cv2.boundingRect(c) for c in contours]
+    ids, conf = classify_colors_batch(ctx, contours, bboxes)
+    batch = [(COLOR_NAMES[i], float(p)) for i, p in zip(ids, conf)]
+    assert batch == _per_contour(img, contours)
+
+
+def test_batch_matches_per_contour_on_samples():
+    assert SAMPLES
+    for path in SAMPLES:
+        img = cv2.imread(str(path))
+        mask = _color_mask(img, 40, 40)
+        cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        _check(img, [c for c in cnts if cv2.contourArea(c) > 0])
+
+
+def test_batch_matches_per_contour_on_random_blobs():
+    rng = np.random.default_rng(7)
+    hsv = np.zeros((360, 480, 3), np.uint8)
+    for _ in range(60):
+        center = tuple(int(v) for v in rng.integers(0, (480, 360)))
+        axes = tuple(int(v) for v in rng.integers(4, 40, size=2))
+        color = tuple(int(v) for v in (rng.integers(0, 180), rng.integers(30, 256), rng.integers(30, 256)))
+        cv2.ellipse(hsv, center, axes, float(rng.integers(0, 180)), 0, 360, color, -1)
+    img = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+    noise = rng.integers(-25, 26, size=img.shape)
+    img = np.clip(img.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    mask = _color_mask(img, 40, 40)
+    cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    assert len(cnts) > 10
+    _check(img, list(cnts))
+
+
+def test_batch_empty():
+    ctx = FrameContext.from_bgr(np.zeros((8, 8, 3), np.uint8))
+    ids, conf = classify_colors_batch(ctx, [], [])
+    assert ids.shape == (0,) and conf.shape == (0,)
@@ -0,0 +1,110 @@
+# tests/test_color_lut.py
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.detection.colors import (
+    BLUE, GREEN, RED, UNKNOWN, VIOLET, YELLOW, compile_color_lut,
+)
+from shape_color_vision.utils.config import load_config
+
+
+def _hand_rules(h, s, rb_ratio):
+    """The hue-band if-chain the lookup table replaced, kept as the reference."""
+    red_dist = np.minimum(h, 180.0 - h)
+    vetoed = (
+        (s < 60)
+        | ((155 <= h) & (h < 175))
+        | ((150 <= h) & (h < 175) & (s < 120))
+        | ((5.0 <= red_dist) & (red_dist < 22.0))
+    )
+    ids = np.full(h.shape, UNKNOWN, dtype=np.int8)
+    band_lo, band_hi = h.copy(), h.copy()
+
+    def band(sel, color_id, lo, hi):
+        ids[sel] = color_id
+        band_lo[sel] = lo
+        band_hi[sel] = hi
+
+    red = red_dist < 5.0
+    ids[red & (s >= 110)] = RED
+    band_lo[red] = np.where(h[red] < 90, -5.0, 175.0)
+    band_hi[red] = np.where(h[red] < 90, 5.0, 185.0)
+    rest = ~red
+    band(rest & (22 <= h) & (h < 40), YELLOW, 22, 40)
+    band(rest & (40 <= h) & (h < 95), GREEN, 40, 95)
+    band(rest & (95 <= h) & (h < 132), BLUE, 95, 132)
+    band(rest & (132 <= h) & (h < 155), VIOLET, 132, 155)
+    tie = (125 <= h) & (h < 140)
+    purple = rb_ratio >= 0.55
+    band(tie & purple, VIOLET, 132, 155)
+    band(tie & ~purple, BLUE, 95, 132)
+    ids[vetoed] = UNKNOWN
+
+    edge_dist = np.minimum(np.abs(h - band_lo), np.abs(band_hi - h))
+    conf = np.clip(edge_dist / np.maximum(1e-6, (band_hi - band_lo) / 2.0), 0.0, 1.0)
+    conf[ids == UNKNOWN] = 0.0
+    return ids, conf
+
+
+def _grid():
+    h, s = np.meshgrid(np.arange(360) / 2.0, np.arange(511) / 2.0, indexing="ij")
+    return h.ravel(), s.ravel()
+
+
+def test_default_lut_matches_hand_rules_on_full_grid():
+    h, s = _grid()
+    v = np.full(h.shape, 128.0)
+    lut = compile_color_lut()
+    for ratio in (0.2, 0.55, 1.5):
+        rb = np.full(h.shape, ratio)
+        ids, conf = lut.classify(h, s, v, rb)
+        ref_ids, ref_conf = _hand_rules(h, s, rb)
+        np.testing.assert_array_equal(ids, ref_ids)
+        np.testing.assert_allclose(conf, ref_conf, atol=1e-9)
+
+
+def test_default_config_compiles_to_default_lut():
+    cfg = load_config(str(ROOT / "configs" / "default.yaml"))
+    lut, ref = compile_color_lut(cfg.colors_hsv), compile_color_lut()
+    np.testing.assert_array_equal(lut.ids, ref.ids)
+    np.testing.assert_allclose(lut.conf, ref.conf)
+
+
+def test_lut_is_cached_per_ranges():
+    ranges = {"green": [40, 60, 0, 95, 255, 255]}
+    assert compile_color_lut(ranges) is compile_color_lut(dict(ranges))
+    assert compile_color_lut(ranges) is not compile_color_lut()
+
+
+def test_custom_ranges_and_v_gate():
+    lut = compile_color_lut({"green": [40, 60, 100, 95, 255, 255], "yellow": [25, 60, 0, 40, 255, 255]})
+    ids, _ = lut.classify([60, 60, 30, 23, 110], [200, 200, 200, 200, 200], [150, 50, 150, 150, 150], [1, 1, 1, 1, 1])
+    # green needs V >= 100; 23 is outside the narrowed yellow range; blue has no range
+    assert ids.tolist() == [GREEN, UNKNOWN, YELLOW, UNKNOWN, UNKNOWN]
+
+
+def test_tie_break_only_between_configured_blue_and_violet():
+    h, s, v = [130, 130, 137], [200, 200, 200], [150, 150, 150]
+    lut = compile_color_lut({"green": [40, 60, 0, 95, 255, 255]})
+    for ratio in (0.2, 1.5):
+        ids, conf = lut.classify(h, s, v, [ratio] * 3)
+        assert ids.tolist() == [UNKNOWN] * 3 and not conf.any()
+
+    # a custom green band inside the tie zone stays green whatever R/B is
+    lut = compile_color_lut({"green": [120, 60, 0, 140, 255, 255], "blue": [95, 60, 0, 120, 255, 255],
+                             "violet": [140, 60, 0, 155, 255, 255]})
+    for ratio in (0.2, 1.5):
+        ids, _ = lut.classify(h, s, v, [ratio] * 3)
+        assert ids.tolist() == [GREEN] * 3
+
+    # blue alone: no violet to tie with
+    lut = compile_color_lut({"blue": [95, 60, 0, 140, 255, 255]})
+    ids, _ = lut.classify(h, s, v, [1.5] * 3)
+    assert ids.tolist() == [BLUE] * 3
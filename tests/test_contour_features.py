@@ -0,0 +1,63 @@
+# tests/test_contour_features.py
+import sys
+from collections import Counter
+from pathlib import Path
+
+import cv2
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.detection.shapes import ContourFeatures, classify_shape, contour_is_valid
+from shape_color_vision.pipeline import _color_mask
+
+SAMPLES = sorted((ROOT / "data" / "samples").glob("*.png"))
+KWARGS = dict(min_area=800, min_solidity=0.65, min_extent=0.5, min_width=16, min_height=16)
+
+
+def _contours(path):
+    img = cv2.imread(str(path))
+    cnts, _ = cv2.findContours(_color_mask(img, 40, 40), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return cnts, img.shape[0] * img.shape[1]
+
+
+def test_record_gives_the_same_answers_as_raw_contours():
+    for path in SAMPLES:
+        cnts, image_area = _contours(path)
+        for c in cnts:
+            f = ContourFeatures(c)
+            assert contour_is_valid(f, **KWARGS, image_area=image_area) == contour_is_valid(c, **KWARGS, image_area=image_area)
+            assert classify_shape(f) == classify_shape(c)
+            assert f.bbox == tuple(cv2.boundingRect(c))
+            assert f.area == cv2.contourArea(c)
+
+
+def test_each_measurement_runs_at_most_once(monkeypatch):
+    calls = Counter()
+    for name in ("contourArea", "convexHull", "boundingRect", "arcLength", "approxPolyDP", "minEnclosingCircle"):
+        fn = getattr(cv2, name)
+
+        def counted(*args, _fn=fn, _name=name, **kwargs):
+            calls[_name] += 1
+            return _fn(*args, **kwargs)
+        monkeypatch.setattr(cv2, name, counted)
+
+    cnts, image_area = _contours(SAMPLES[0])
+    kept = [f for f in map(ContourFeatures, cnts) if contour_is_valid(f, **KWARGS, image_area=image_area)]
+    assert kept
+    for f in kept:
+        calls.clear()
+        classify_shape(f)
+        f.bbox                                   # the pipeline's ROI box
+        classify_shape(f)                        # a second pass reuses everything
+        assert calls["contourArea"] == 0 and calls["convexHull"] == 0 and calls["boundingRect"] == 0
+        assert calls["arcLength"] <= 1 and calls["approxPolyDP"] <= 1 and calls["minEnclosingCircle"] <= 1
+
+    calls.clear()
+    f = ContourFeatures(cnts[0])
+    for _ in range(3):
+        contour_is_valid(f, min_area=0, min_solidity=0.0, min_extent=0.0, min_width=0, min_height=0)
+    # area of the contour and of its hull, one hull, one bounding box
+    assert (calls["contourArea"], calls["convexHull"], calls["boundingRect"]) == (2, 1, 1)
@@ -0,0 +1,91 @@
+# tests/test_contour_filter.py
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.detection.shapes import (
+    ContourFeatures, contour_is_valid, contour_stats, filter_contours, prefilter_contours,
+)
+from shape_color_vision.incremental import IncrementalDetector
+from shape_color_vision.pipeline import _detect_kwargs, detect
+from shape_color_vision.utils.config import load_config
+from shape_color_vision.utils.synth import SceneSpec, make_scene
+
+CFG = load_config(str(ROOT / "configs" / "default.yaml"))
+
+
+def _noisy_contours(seed=0, shape=(240, 320)):
+    rng = np.random.default_rng(seed)
+    mask = (rng.random(shape) > 0.93).astype(np.uint8) * 255
+    mask = cv2.dilate(mask, np.ones((3, 3), np.uint8))
+    for k in range(12):                                # a few large blobs among the speckle
+        x, y = int(rng.integers(0, shape[1] - 60)), int(rng.integers(0, shape[0] - 60))
+        cv2.rectangle(mask, (x, y), (x + 20 + 3 * k, y + 25 + 2 * k), 255, -1)
+    cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return list(cnts), shape[0] * shape[1]
+
+
+def test_contour_stats_match_opencv():
+    cnts, _ = _noisy_contours()
+    areas, bboxes = contour_stats(cnts)
+    assert np.allclose(areas, [cv2.contourArea(c) for c in cnts])
+    assert (bboxes == np.array([cv2.boundingRect(c) for c in cnts])).all()
+
+    areas, bboxes = contour_stats([])
+    assert areas.shape == (0,) and bboxes.shape == (0, 4)
+
+
+def test_filter_contours_matches_contour_is_valid():
+    cnts, image_area = _noisy_contours(seed=1)
+    for for_camera in (False, True):
+        kwargs = dict(_detect_kwargs(CFG, for_camera), min_area=100, min_width=8, min_height=8)
+        expected = [i for i, c in enumerate(cnts) if contour_is_valid(ContourFeatures(c), **kwargs, image_area=image_area)]
+        idx, feats = filter_contours(cnts, **kwargs, image_area=image_area)
+        assert idx.tolist() == expected
+        assert [f.bbox for f in feats] == [cv2.boundingRect(cnts[i]) for i in expected]
+
+
+def test_cap_keeps_the_largest_in_input_order():
+    areas = np.array([50.0, 400.0, 100.0, 300.0, 200.0])
+    bboxes = np.array([[0, 0, 20, 20]] * 5)
+    idx = prefilter_contours(areas, bboxes, min_area=0, min_extent=0.0, min_width=0, min_height=0, max_candidates=3)
+    assert idx.tolist() == [1, 3, 4]
+    assert prefilter_contours(areas, bboxes, min_area=0, min_extent=0.0, min_width=0, min_height=0).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_max_candidates_bounds_detections():
+    img, _ = make_scene(SceneSpec(width=640, height=480, objects=12, seed=3))
+    params = CFG.runtime("image")
+    full = detect(img, params)
+    assert params.max_candidates == 0 and len(full) > 3
+
+    capped = detect(img, replace(params, max_candidates=3))
+    assert len(capped) <= 3
+    kept = {tuple(b) for b in capped.bboxes.tolist()}
+    assert kept <= {tuple(b) for b in full.bboxes.tolist()}
+
+
+def test_incremental_still_matches_detect():
+    base, _ = make_scene(SceneSpec(width=640, height=480, objects=2, seed=5))
+    grown = base.copy()
+    cv2.rectangle(grown, (560, 400), (610, 450), (0, 0, 255), -1)     # a third object, away from the others
+    frames = [base, base, grown, grown, base]
+
+    for cap in (0, 2):
+        params = replace(CFG.runtime("camera"), max_candidates=cap)
+        inc = IncrementalDetector(params, diff_thresh=0)
+        for img in frames:
+            got = inc.detect(img)
+            expected = detect(img, params)
+            assert got.bboxes.tolist() == expected.bboxes.tolist()
+            assert [got.label(i) for i in range(len(got))] == [expected.label(i) for i in range(len(expected))]
+        if cap:
+            assert len(detect(grown, params)) == cap
@@ -0,0 +1,66 @@
+# tests/test_detect_api.py
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.utils.config import load_config
+from shape_color_vision.pipeline import detect, draw_detections
+from shape_color_vision.detection.results import DetectionResult
+
+
+def _cfg():
+    return load_config(str(ROOT / "configs" / "default.yaml"))
+
+
+def test_detect_returns_arrays_and_leaves_frame_untouched():
+    img = cv2.imread(str(ROOT / "data" / "samples" / "shapes_test1.png"))
+    before = img.copy()
+    res = detect(img, _cfg())
+
+    assert np.array_equal(img, before)
+    assert len(res) == 6
+    assert res.bboxes.shape == (6, 4)
+    assert res.offsets[-1] == len(res.points)
+    assert {(c.upper(), s) for s, c, _ in res} >= {("BLUE", "Circle"), ("RED", "Triangle")}
+
+    # contours in the shared buffer reproduce their bounding boxes
+    for i in range(len(res)):
+        assert tuple(cv2.boundingRect(res.contour(i))) == tuple(res.bboxes[i])
+
+    out = draw_detections(img, res)
+    assert out is img and not np.array_equal(img, before)
+
+
+def test_detect_empty_frame():
+    res = detect(np.zeros((64, 64, 3), np.uint8), _cfg())
+    assert len(res) == 0
+    assert len(DetectionResult.empty()) == 0
+
+
+class _NullLogger:
+    def log(self, *args, **kwargs):
+        pass
+
+
+def test_analyze_frame_renders_on_a_copy():
+    from shape_color_vision.io.viz import render
+    from shape_color_vision.pipeline import analyze_frame, process_frame
+
+    img = cv2.imread(str(ROOT / "data" / "samples" / "shapes_test1.png"))
+    before = img.copy()
+    cfg = _cfg()
+
+    res = process_frame(img, cfg, logger=_NullLogger())
+    assert len(res) > 0 and np.array_equal(img, before)
+
+    out = analyze_frame(img, cfg, logger=_NullLogger())
+    assert out is not img and np.array_equal(img, before)
+    assert np.array_equal(out, render(img, res))
+    assert np.array_equal(out, draw_detections(img.copy(), res))
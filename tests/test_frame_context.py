@@ -0,0 +1,67 @@
+# tests/test_frame_context.py
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.detection.colors import (
+    PIX_MIN_S, PIX_MIN_V, FrameContext, classify_color, classify_color_in_frame,
+)
+from shape_color_vision.pipeline import _color_mask, _filled_roi_mask, analyze_frame, detect
+from shape_color_vision.utils.config import load_config
+
+CFG = load_config(str(ROOT / "configs" / "default.yaml"))
+SAMPLES = sorted((ROOT / "data" / "samples").glob("*.png"))
+
+
+def test_context_holds_one_hsv_conversion_and_validity():
+    img = cv2.imread(str(SAMPLES[0]))
+    ctx = FrameContext.from_bgr(img)
+    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+    assert ctx.bgr is img
+    assert np.array_equal(ctx.hsv, hsv)
+    expected = ((hsv[..., 1] >= PIX_MIN_S) & (hsv[..., 2] >= PIX_MIN_V)).astype(np.uint8) * 255
+    assert np.array_equal(ctx.valid, expected)
+    assert np.array_equal(_color_mask(img, 40, 40, hsv=ctx.hsv), _color_mask(img, 40, 40))
+
+
+def test_in_frame_classification_matches_roi_classification():
+    for path in SAMPLES:
+        img = cv2.imread(str(path))
+        ctx = FrameContext.from_bgr(img)
+        cnts, _ = cv2.findContours(_color_mask(img, 40, 40, hsv=ctx.hsv), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for c in cnts:
+            x, y, w, h = cv2.boundingRect(c)
+            roi_mask = _filled_roi_mask(c, w, h, x, y)
+            assert classify_color_in_frame(ctx, (x, y, w, h), roi_mask) == classify_color(
+                img[y:y + h, x:x + w], {}, roi_mask=roi_mask,
+            )
+    assert classify_color_in_frame(ctx, (0, 0, 0, 5)) == ("unknown", 0.0)
+
+
+def test_frame_is_converted_to_hsv_once(monkeypatch):
+    img = cv2.imread(str(SAMPLES[0]))
+    conversions = []
+    cvt = cv2.cvtColor
+
+    def counting(src, code, *args, **kwargs):
+        if code == cv2.COLOR_BGR2HSV:
+            conversions.append(src.shape)
+        return cvt(src, code, *args, **kwargs)
+
+    monkeypatch.setattr(cv2, "cvtColor", counting)
+
+    class NullLogger:
+        def log(self, *args, **kwargs):
+            pass
+
+    for run in (lambda: detect(img, CFG), lambda: analyze_frame(img, CFG, NullLogger())):
+        conversions.clear()
+        run()
+        assert conversions == [img.shape]
@@ -0,0 +1,71 @@
+# tests/test_incremental.py
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.incremental import MORPH_REACH, IncrementalDetector
+from shape_color_vision.pipeline import detect
+from shape_color_vision.utils.config import load_config
+
+
+def _cfg():
+    return load_config(str(ROOT / "configs" / "default.yaml"))
+
+
+def _same(a, b):
+    assert len(a) == len(b)
+    for name in ("bboxes", "shape_ids", "color_ids", "shape_conf", "color_conf", "offsets", "points"):
+        assert np.array_equal(getattr(a, name), getattr(b, name)), name
+
+
+def test_incremental_matches_full_detection():
+    cfg = _cfg()
+    base = cv2.imread(str(ROOT / "data" / "samples" / "shapes_test3.png"))
+    base = cv2.copyMakeBorder(base, 0, 0, 0, 160, cv2.BORDER_CONSTANT, value=(255, 255, 255))
+    frames = [base, base.copy(), base.copy(), base.copy()]
+    cv2.rectangle(frames[2], (830, 50), (910, 130), (255, 0, 0), -1)     # new object
+    frames[3] = frames[2].copy()
+    cv2.circle(frames[3], (870, 300), 40, (0, 0, 255), -1)              # another one ...
+    cv2.rectangle(frames[3], (30, 350), (200, 500), (255, 255, 255), -1)   # ... and one removed
+    assert [len(detect(f, cfg, for_camera=True)) for f in frames] == [10, 10, 11, 11]
+
+    inc = IncrementalDetector(cfg, for_camera=True, tile=32, diff_thresh=0)
+    fractions = []
+    for frame in frames:
+        _same(inc.detect(frame), detect(frame, cfg, for_camera=True))
+        fractions.append(inc.dirty_fraction)
+
+    assert fractions[0] == 1.0
+    assert fractions[1] == 0.0            # static frame: nothing recomputed
+    assert 0.0 < fractions[2] < 0.5
+    assert 0.0 < fractions[3] < 0.5
+
+
+def test_small_margins_are_widened_to_the_morphology_reach():
+    cfg = _cfg()
+    base = cv2.imread(str(ROOT / "data" / "samples" / "shapes_test1.png"))
+    moved = base.copy()
+    h, w = base.shape[:2]
+    cv2.rectangle(moved, (w // 2 - 30, h // 2 - 30), (w // 2 + 30, h // 2 + 30), (0, 200, 0), -1)
+    for tile in (8, 32, 64):
+        inc = IncrementalDetector(cfg, tile=tile, diff_thresh=0, margin_tiles=0)
+        assert inc.margin_tiles * inc.tile >= MORPH_REACH
+        for frame in (base, moved, base):
+            _same(inc.detect(frame), detect(frame, cfg, for_camera=True))
+
+
+def test_frame_size_change_resets():
+    cfg = _cfg()
+    inc = IncrementalDetector(cfg, diff_thresh=0)
+    img = cv2.imread(str(ROOT / "data" / "samples" / "shapes_test1.png"))
+    inc.detect(img)
+    small = cv2.resize(img, None, fx=0.5, fy=0.5)
+    _same(inc.detect(small), detect(small, cfg, for_camera=True))
+    assert inc.dirty_fraction == 1.0
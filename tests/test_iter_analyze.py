@@ -0,0 +1,69 @@
+# tests/test_iter_analyze.py
+import sys
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.pipeline import detect, iter_analyze
+from shape_color_vision.utils.config import load_config
+from shape_color_vision.utils.synth import SceneSpec, make_scene
+
+CFG = load_config(str(ROOT / "configs" / "default.yaml"))
+CFG.video.save_output = False
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    paths = []
+    for i in range(8):
+        img, _ = make_scene(SceneSpec(width=320, height=240, objects=1 + i % 4, seed=i))
+        p = tmp_path / f"img{i}.png"
+        cv2.imwrite(str(p), img)
+        paths.append(str(p))
+    return paths
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_yields_in_order_with_detect_results(image_paths, prefetch):
+    got = list(iter_analyze(image_paths, CFG, prefetch=prefetch, keep_image=True))
+    assert [p for p, _, _ in got] == image_paths
+    for p, result, out in got:
+        expected = detect(cv2.imread(p), CFG)
+        assert np.array_equal(result.bboxes, expected.bboxes)
+        assert np.array_equal(result.color_ids, expected.color_ids)
+        assert out is not None and out.shape == (240, 320, 3)
+
+
+def test_prefetch_depth_bounds_reads(image_paths, monkeypatch):
+    started = []
+    lock = threading.Lock()
+    real_imread = cv2.imread
+
+    def imread(path, *args):
+        with lock:
+            started.append(path)
+        return real_imread(path, *args)
+
+    monkeypatch.setattr(cv2, "imread", imread)
+
+    def lazy_paths():
+        yield from image_paths
+
+    for k, (p, _, _) in enumerate(iter_analyze(lazy_paths(), CFG, prefetch=2)):
+        time.sleep(0.01)  # let the decode threads run ahead as far as they can
+        assert len(started) <= k + 1 + 2
+    assert sorted(started) == sorted(image_paths)
+
+
+def test_missing_file_raises(image_paths):
+    with pytest.raises(FileNotFoundError):
+        list(iter_analyze(image_paths[:2] + ["/nonexistent.png"], CFG, prefetch=2))
@@ -0,0 +1,157 @@
+# tests/test_logger_csv.py
+import csv
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.io.logger_csv import CSVLogger, HEADER
+
+
+def _rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def _feed(logger):
+    for i in range(10):
+        logger.log("Circle", "red", 0.9, "CAMERA", f"cam{i % 4}")
+    logger.log("Square", "blue", 0.5, "IMAGE", "a.png")
+
+
+def test_buffered_matches_unbuffered(tmp_path):
+    plain = tmp_path / "plain.csv"
+    buf = tmp_path / "buf.csv"
+    _feed(CSVLogger(str(plain)))
+    with CSVLogger(str(buf), buffered=True, flush_rows=1000, flush_interval=60) as logger:
+        _feed(logger)
+        assert _rows(buf) == [HEADER]  # nothing written until a threshold or close
+
+    strip = lambda rows: [r[1:] for r in rows[1:]]
+    assert _rows(buf)[0] == HEADER
+    assert strip(_rows(buf)) == strip(_rows(plain))
+    assert len(_rows(buf)) == 1 + 5
+
+
+def test_buffered_flushes_on_row_threshold(tmp_path):
+    path = tmp_path / "det.csv"
+    logger = CSVLogger(str(path), buffered=True, flush_rows=3, flush_interval=60)
+    for i in range(3):
+        logger.log("Circle", "red", 0.9, "IMAGE", f"{i}.png")
+    deadline = time.time() + 2
+    while len(_rows(path)) < 4 and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(_rows(path)) == 4
+    logger.close()
+    logger.close()
+
+
+def test_log_does_not_wait_for_disk_writes(tmp_path):
+    path = tmp_path / "det.csv"
+    logger = CSVLogger(str(path), buffered=True, flush_rows=1000, flush_interval=60)
+    writing, release = threading.Event(), threading.Event()
+    writer = logger._writer
+
+    class SlowWriter:
+        def writerows(self, rows):
+            writing.set()
+            release.wait(5)
+            writer.writerows(rows)
+
+    logger._writer = SlowWriter()
+    logger.log("Circle", "red", 0.9, "IMAGE", "a.png")
+    flusher = threading.Thread(target=logger.flush)
+    flusher.start()
+    assert writing.wait(2)
+
+    t0 = time.perf_counter()
+    logger.log("Square", "blue", 0.5, "IMAGE", "b.png")      # while the flush is stuck on disk
+    assert time.perf_counter() - t0 < 1.0
+    release.set()
+    flusher.join()
+    logger.close()
+    assert [r[5] for r in _rows(path)[1:]] == ["a.png", "b.png"]
+
+
+def test_existing_file_keeps_single_header(tmp_path):
+    path = tmp_path / "det.csv"
+    CSVLogger(str(path)).log("Circle", "red", 0.9, "IMAGE", "a.png")
+    with CSVLogger(str(path), buffered=True) as logger:
+        logger.log("Circle", "red", 0.9, "IMAGE", "b.png")
+    rows = _rows(path)
+    assert rows[0] == HEADER and rows.count(HEADER) == 1 and len(rows) == 3
+
+
+def test_legacy_header_dedups_without_track_ids(tmp_path):
+    path = tmp_path / "det.csv"
+    CSVLogger(str(path))                                   # old file: no track_id column
+    logger = CSVLogger(str(path), track_ids=True)
+    for track_id in (1, 2, 7):                             # the same object, re-acquired
+        logger.log("Circle", "red", 0.9, "CAMERA", "webcam", track_id=track_id)
+    assert _rows(path) == [HEADER, _rows(path)[1]] and len(_rows(path)[1]) == len(HEADER)
+
+    tracked = tmp_path / "tracked.csv"
+    logger = CSVLogger(str(tracked), track_ids=True)
+    for track_id in (1, 2):
+        logger.log("Circle", "red", 0.9, "CAMERA", "webcam", track_id=track_id)
+    assert [r[-1] for r in _rows(tracked)] == ["track_id", "1", "2"]
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_dedup_ttl_relogs_after_window():
+    from shape_color_vision.io.dedup import DedupCache
+    clock = _Clock()
+    cache = DedupCache(ttl=10.0, clock=clock)
+    assert cache.should_log("a")
+    clock.t = 9.9
+    assert not cache.should_log("a")
+    clock.t = 10.0
+    assert cache.should_log("a")
+    assert len(cache) == 1
+
+
+def test_dedup_capacity_stays_flat():
+    from shape_color_vision.io.dedup import DedupCache
+    cache = DedupCache(capacity=3)
+    for k in "abcd":
+        assert cache.should_log(k)
+    assert len(cache) == 3
+    assert cache.should_log("a")        # evicted → logged again
+    assert not cache.should_log("d")    # recent → suppressed
+    assert not cache.should_log("c")
+    assert cache.should_log("e")        # evicts "a", the least recently used
+    assert not cache.should_log("c")
+    assert len(cache) == 3
+
+
+def test_dedup_ttl_memory_flat_over_many_keys():
+    from shape_color_vision.io.dedup import DedupCache
+    clock = _Clock()
+    cache = DedupCache(ttl=5.0, clock=clock)
+    for i in range(10_000):
+        clock.t = float(i)
+        cache.should_log(i)
+    assert len(cache) <= 5
+
+
+def test_logger_ttl_relogs(tmp_path):
+    path = tmp_path / "det.csv"
+    logger = CSVLogger(str(path), dedup_ttl=60.0)
+    logger.log("Circle", "red", 0.9, "CAMERA", "webcam")
+    logger.log("Circle", "red", 0.9, "CAMERA", "webcam")
+    assert len(_rows(path)) == 2
+    logger._seen._clock = lambda: time.monotonic() + 61.0
+    logger.log("Circle", "red", 0.9, "CAMERA", "webcam")
+    assert len(_rows(path)) == 3
@@ -0,0 +1,93 @@
+# tests/test_logger_sqlite.py
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.io.logger_sqlite import SQLiteLogger, query_detections
+from shape_color_vision.utils.config import load_config
+from shape_color_vision.pipeline import open_logger
+
+
+def _feed(logger):
+    logger.log("Circle", "red", 0.912, "CAMERA", "webcam")
+    logger.log("Circle", "red", 0.5, "CAMERA", "webcam")    # duplicate
+    logger.log("Square", "blue", 0.8, "IMAGE", "a.png")
+    logger.log("Square", "blue", 0.8, "IMAGE", "b.png")
+
+
+def test_rows_are_batched_and_queryable(tmp_path):
+    db = str(tmp_path / "det.db")
+    with SQLiteLogger(db, batch_rows=100, flush_interval=60) as logger:
+        _feed(logger)
+        assert query_detections(db) == []  # still pending
+    rows = query_detections(db)
+    assert [(r["shape"], r["color"], r["name"]) for r in rows] == [
+        ("Circle", "red", "webcam"), ("Square", "blue", "a.png"), ("Square", "blue", "b.png"),
+    ]
+    assert rows[0]["confidence"] == pytest.approx(0.91)
+    assert len(query_detections(db, color="blue", source="IMAGE")) == 2
+    assert len(query_detections(db, shape="Circle", limit=5)) == 1
+    assert query_detections(db, until="2000-01-01") == []
+
+    mode = sqlite3.connect(db).execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_idle_rows_are_committed_after_the_interval(tmp_path):
+    db = str(tmp_path / "det.db")
+    with SQLiteLogger(db, batch_rows=100, flush_interval=0.05) as logger:
+        _feed(logger)                      # then no more detections
+        deadline = time.time() + 2
+        while len(query_detections(db)) < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(query_detections(db)) == 3
+
+
+def test_log_does_not_wait_for_inserts(tmp_path):
+    db = str(tmp_path / "det.db")
+    logger = SQLiteLogger(db, batch_rows=1, flush_interval=60)
+    writing, release = threading.Event(), threading.Event()
+    insert = logger._insert_rows
+
+    def slow_insert(conn, rows):
+        writing.set()
+        release.wait(5)
+        insert(conn, rows)
+
+    logger._insert_rows = slow_insert
+    logger.log("Circle", "red", 0.9, "IMAGE", "a.png")      # fills a batch: the flush thread inserts it
+    assert writing.wait(2)
+
+    t0 = time.perf_counter()
+    logger.log("Square", "blue", 0.5, "IMAGE", "b.png")      # while that insert is stuck on disk
+    assert time.perf_counter() - t0 < 1.0
+    release.set()
+    logger.close()
+    assert [r["name"] for r in query_detections(db)] == ["a.png", "b.png"]
+
+
+def test_unique_key_dedups_across_instances(tmp_path):
+    db = str(tmp_path / "det.db")
+    for _ in range(3):
+        with SQLiteLogger(db, unique=True) as logger:
+            _feed(logger)
+    assert len(query_detections(db)) == 3
+
+
+def test_open_logger_selects_backend(tmp_path):
+    cfg = load_config(str(ROOT / "configs" / "default.yaml"))
+    cfg.paths.log_csv = str(tmp_path / "det.sqlite")
+    with open_logger(cfg) as logger:
+        assert isinstance(logger, SQLiteLogger)
+    cfg.paths.log_csv = str(tmp_path / "det.csv")
+    with open_logger(cfg) as logger:
+        assert not isinstance(logger, SQLiteLogger)
@@ -0,0 +1,128 @@
+# tests/test_multistream.py
+import csv
+import sys
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+import yaml
+from typer.testing import CliRunner
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.main import app
+from shape_color_vision.multistream import MultiStreamScheduler, Stream, open_stream, parse_source
+from shape_color_vision.utils.config import load_config
+from shape_color_vision.utils.synth import SceneSpec, make_scene
+
+
+def _stream(name, n, policy="block", delay=0.0, queue_size=2):
+    count = [0]
+
+    def read():
+        if delay:
+            time.sleep(delay)
+        count[0] += 1
+        return count[0] <= n, np.full((4, 4, 3), count[0] % 256, np.uint8)
+    return Stream(name=name, source="TEST", read=read, policy=policy, queue_size=queue_size)
+
+
+def test_round_robin_keeps_streams_in_order_one_frame_at_a_time():
+    streams = [_stream("a", 30), _stream("b", 30), _stream("c", 30)]
+    seen = {s.name: [] for s in streams}
+    in_flight = {s.name: 0 for s in streams}
+    lock = threading.Lock()
+
+    def process(stream, frame, ws, name):
+        with lock:
+            in_flight[stream.name] += 1
+            assert in_flight[stream.name] == 1
+        time.sleep(0.001)
+        seen[stream.name].append(int(frame[0, 0, 0]))
+        with lock:
+            in_flight[stream.name] -= 1
+
+    MultiStreamScheduler(streams, workers=4, process=process).run()
+    for s in streams:
+        assert seen[s.name] == list(range(1, 31))
+        assert s.stats.frames == 30 and s.stats.dropped == 0 and s.stats.fps > 0
+
+
+def test_single_worker_alternates_between_streams():
+    streams = [_stream("a", 20), _stream("b", 20)]
+    order = []
+
+    def process(stream, frame, ws, name):
+        time.sleep(0.002)              # slower than capture: both buffers stay full
+        order.append(stream.name)
+
+    MultiStreamScheduler(streams, workers=1, process=process).run()
+    head = order[2:30]
+    assert all(x != y for x, y in zip(head, head[1:]))
+
+
+def test_latest_policy_drops_for_slow_consumers():
+    streams = [_stream("live", 80, policy="latest", queue_size=1), _stream("file", 10)]
+
+    def process(stream, frame, ws, name):
+        time.sleep(0.01)
+
+    MultiStreamScheduler(streams, workers=1, process=process).run()
+    live, file = streams
+    assert live.stats.dropped > 0 and live.stats.frames + live.stats.dropped == 80
+    assert file.stats.frames == 10 and file.stats.dropped == 0
+
+
+def test_names_must_be_unique_and_parse_source():
+    with pytest.raises(ValueError):
+        MultiStreamScheduler([_stream("a", 1), _stream("a", 1)], process=lambda *a: None)
+    assert parse_source("0") == ("cam0", "0")
+    assert parse_source("door=videos/door.mp4") == ("door", "videos/door.mp4")
+    assert parse_source("data/samples/") == ("samples", "data/samples/")
+
+
+def test_streams_command_logs_each_source(tmp_path):
+    video = tmp_path / "clip.avi"
+    scene, _ = make_scene(SceneSpec(width=320, height=240, objects=3, seed=4))
+    w = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"MJPG"), 10.0, (320, 240))
+    for _ in range(6):
+        w.write(scene)
+    w.release()
+
+    cfg = yaml.safe_load((ROOT / "configs" / "default.yaml").read_text())
+    cfg["paths"].update(output_dir=str(tmp_path / "out"), log_csv=str(tmp_path / "det.csv"))
+    cfg_path = tmp_path / "cfg.yaml"
+    cfg_path.write_text(yaml.safe_dump(cfg))
+
+    res = CliRunner().invoke(app, [
+        "streams", str(video), f"shelf={ROOT / 'data' / 'samples'}", "-c", str(cfg_path), "-w", "2", "--report-every", "0",
+    ])
+    assert res.exit_code == 0, res.output
+    assert "clip.avi" in res.output and "shelf" in res.output
+
+    with open(tmp_path / "det.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    samples = {p.name for p in (ROOT / "data" / "samples").iterdir() if cv2.imread(str(p)) is not None}
+    assert {(r["source"], r["name"]) for r in rows} == {("VIDEO", "clip.avi")} | {("IMAGE", n) for n in samples}
+
+
+def test_image_directories_name_each_file_and_skip_tracking(tmp_path):
+    scene, _ = make_scene(SceneSpec(width=160, height=120, objects=2, seed=1))
+    for n in ("a.png", "b.png"):
+        cv2.imwrite(str(tmp_path / n), scene)
+    cfg = yaml.safe_load((ROOT / "configs" / "default.yaml").read_text())
+    cfg["tracking"]["enabled"] = True
+    cfg_path = tmp_path / "cfg.yaml"
+    cfg_path.write_text(yaml.safe_dump(cfg))
+
+    s = open_stream(f"shelf={tmp_path}", load_config(str(cfg_path)))
+    assert s.source == "IMAGE" and s.tracker is None and s.incremental is None
+    names = []
+    MultiStreamScheduler([s], workers=1, process=lambda st, f, ws, name: names.append(name)).run()
+    assert names == ["a.png", "b.png"]
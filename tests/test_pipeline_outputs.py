@@ -4,6 +4,8 @@ import sys
 from pathlib import Path
 from collections import Counter
 
+import pytest
+
 # --- make 'src' importable regardless of where pytest runs ---
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
@@ -100,9 +102,11 @@ def _format_table(expected_set, detected_set):
     ]
     return "\n".join(lines)
 
-def _run_one(image_key: str, tmp_path):
+def _run_one(image_key: str, tmp_path, scale: float | None = None):
     img_path = _find_sample(ALIASES[image_key])
     cfg = _load_cfg(tmp_path)
+    if scale is not None:
+        cfg.image_detect.scale = scale
 
     # fresh CSV each run
     csv_path = Path(cfg.paths.log_csv)
@@ -132,3 +136,8 @@ def test_sample2(tmp_path):
 
 def test_sample3(tmp_path):
     _run_one("shapes_test3.png", tmp_path)
+
+# Coarse-to-fine detection: the reference outputs hold down to scale 0.5
+@pytest.mark.parametrize("image_key", sorted(EXPECTED))
+def test_reference_at_half_scale(image_key, tmp_path):
+    _run_one(image_key, tmp_path, scale=0.5)
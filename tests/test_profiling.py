@@ -0,0 +1,85 @@
+# tests/test_profiling.py
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision import profiling
+from shape_color_vision.pipeline import analyze_frame, detect
+from shape_color_vision.utils.config import load_config
+from shape_color_vision.utils.synth import SceneSpec, make_scene
+
+CFG = load_config(str(ROOT / "configs" / "default.yaml"))
+
+
+def test_disabled_records_nothing():
+    profiling.disable()
+    assert profiling.stage("x") is profiling.stage("y")  # shared no-op
+    img, _ = make_scene(SceneSpec(objects=5, seed=2))
+    detect(img, CFG)
+    assert profiling.active() is None
+
+
+def test_detect_stages_and_counts():
+    img, truth = make_scene(SceneSpec(objects=8, seed=2))
+    expected = detect(img, CFG)
+    prof = profiling.enable()
+    try:
+        result = detect(img, CFG)
+        detect(img, CFG)
+    finally:
+        profiling.disable()
+
+    assert np.array_equal(result.bboxes, expected.bboxes)
+    assert len(prof.frames) == 2
+    rec = prof.frames[0]
+    assert {"hsv", "mask", "contours", "filter", "color", "shape"} <= set(rec["stages"])
+    assert rec["counts"]["classified"] == len(truth)
+    assert rec["counts"]["contours"] - rec["counts"]["rejected"] == len(truth)
+    assert sum(rec["stages"].values()) <= rec["total_ns"]
+    assert "color" in prof.summary()
+
+
+def test_nested_frames_fold_and_trace(tmp_path):
+    img, _ = make_scene(SceneSpec(objects=3, seed=5))
+    prof = profiling.enable()
+    try:
+        analyze_frame(img, CFG, logger=_NullLogger())
+    finally:
+        profiling.disable()
+
+    assert len(prof.frames) == 1  # detect's frame folds into analyze_frame's
+    assert {"draw", "log", "color"} <= set(prof.frames[0]["stages"])
+
+    path = tmp_path / "trace.jsonl"
+    prof.dump_trace(str(path))
+    lines = path.read_text().splitlines()
+    assert len(lines) == 1 and json.loads(lines[0])["label"] == "frame"
+
+
+class _NullLogger:
+    def log(self, *args, **kwargs):
+        pass
+
+
+def test_other_threads_are_ignored():
+    import threading
+
+    prof = profiling.enable()
+    try:
+        with profiling.frame("main"):
+            with profiling.stage("work"):
+                pass
+            t = threading.Thread(target=lambda: (profiling.stage("render").__enter__(), profiling.count("x")))
+            t.start()
+            t.join()
+    finally:
+        profiling.disable()
+    assert list(prof.frames[0]["stages"]) == ["work"]
+    assert prof.frames[0]["counts"] == {}
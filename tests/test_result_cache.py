@@ -0,0 +1,126 @@
+# tests/test_result_cache.py
+import csv
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import yaml
+from typer.testing import CliRunner
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision import pipeline
+from shape_color_vision.io.result_cache import ResultCache
+from shape_color_vision.main import app
+from shape_color_vision.utils.config import load_config
+
+SAMPLES = ROOT / "data" / "samples"
+
+
+def _cfg(tmp_path):
+    cfg = load_config(str(ROOT / "configs" / "default.yaml"))
+    cfg.paths.output_dir = str(tmp_path / "out")
+    cfg.paths.log_csv = str(tmp_path / "det.csv")
+    cfg.video.show_window = False
+    cfg.video.save_output = False
+    cfg.logging.dedup_capacity = None
+    return cfg
+
+
+def _rows(cfg):
+    with open(cfg.paths.log_csv, newline="", encoding="utf-8") as f:
+        return [r[1:] for r in csv.reader(f)][1:]  # drop header and timestamps
+
+
+def _count_detect(monkeypatch):
+    calls = []
+    real = pipeline.detect
+
+    def detect(img, cfg, **kwargs):
+        calls.append(1)
+        return real(img, cfg, **kwargs)
+
+    monkeypatch.setattr(pipeline, "detect", detect)
+    return calls
+
+
+def test_round_trip_and_lru_eviction(tmp_path):
+    img = cv2.imread(str(SAMPLES / "shapes_test1.png"))
+    result = pipeline.detect(img, _cfg(tmp_path))
+    cache = ResultCache(str(tmp_path / "c"), max_bytes=10**9)
+    cache.put("a" * 64, result)
+    back = cache.get("a" * 64)
+    for k, v in result.arrays().items():
+        assert np.array_equal(getattr(back, k), v)
+    assert cache.get("b" * 64) is None and (cache.hits, cache.misses) == (1, 1)
+
+    size = cache.size_bytes()
+    cache.put("b" * 64, result)
+    old = time.time() - 100
+    os.utime(cache._path("b" * 64), (old, old))  # b is now least recently used
+    cache.max_bytes = size
+    assert cache.evict() == 1
+    assert cache.get("a" * 64) is not None and cache.get("b" * 64) is None
+
+
+def test_analyze_dir_skips_unchanged_images(tmp_path, monkeypatch):
+    images = tmp_path / "images"
+    shutil.copytree(SAMPLES, images)
+    cfg = _cfg(tmp_path)
+    cache = ResultCache(str(tmp_path / "cache"))
+    calls = _count_detect(monkeypatch)
+    n = len(os.listdir(images))
+
+    paths = pipeline.analyze_dir(str(images), cfg, cache=cache)
+    assert len(paths) == n and len(calls) == n
+    first = _rows(cfg)
+
+    os.remove(cfg.paths.log_csv)
+    pipeline.analyze_dir(str(images), cfg, workers=2, cache=cache)
+    assert len(calls) == n  # every image came from the cache
+    assert _rows(cfg) == first
+
+    # changed content or changed detection settings miss the cache
+    cv2.imwrite(str(images / "shapes_test2.png"), cv2.flip(cv2.imread(str(images / "shapes_test2.png")), 1))
+    pipeline.analyze_dir(str(images), cfg, cache=cache)
+    assert len(calls) == n + 1
+    cfg.image_mask.s_min += 5
+    pipeline.analyze_dir(str(images), cfg, cache=cache)
+    assert len(calls) == 2 * n + 1
+
+
+def test_image_command_processes_each_image_once(tmp_path, monkeypatch):
+    raw = yaml.safe_load((ROOT / "configs" / "default.yaml").read_text())
+    raw["paths"].update(image_dir=str(SAMPLES), output_dir=str(tmp_path / "out"), log_csv=str(tmp_path / "det.csv"))
+    raw["video"].update(show_window=False, save_output=True)
+    raw["cache"].update(dir=str(tmp_path / "cache"))
+    cfg_path = tmp_path / "cfg.yaml"
+    cfg_path.write_text(yaml.safe_dump(raw))
+    calls = _count_detect(monkeypatch)
+    n = len(os.listdir(SAMPLES))
+
+    res = CliRunner().invoke(app, ["image", "-c", str(cfg_path)])   # cache is opt-in
+    assert res.exit_code == 0, res.output
+    assert len(calls) == n and not (tmp_path / "cache").exists()
+    assert len(os.listdir(tmp_path / "out")) == n
+
+    res = CliRunner().invoke(app, ["image", "-c", str(cfg_path), "--cache"])
+    assert res.exit_code == 0 and len(calls) == 2 * n
+    res = CliRunner().invoke(app, ["image", "-c", str(cfg_path), "--cache"])
+    assert res.exit_code == 0 and len(calls) == 2 * n
+    res = CliRunner().invoke(app, ["image", "-c", str(cfg_path), "--cache", "--clear-cache"])
+    assert res.exit_code == 0 and len(calls) == 3 * n
+
+    raw["cache"]["enabled"] = True                                  # or opt in from the config
+    cfg_path.write_text(yaml.safe_dump(raw))
+    res = CliRunner().invoke(app, ["image", "-c", str(cfg_path)])
+    assert res.exit_code == 0 and len(calls) == 3 * n
+    res = CliRunner().invoke(app, ["image", "-c", str(cfg_path), "--no-cache"])
+    assert res.exit_code == 0 and len(calls) == 4 * n
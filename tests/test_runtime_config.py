@@ -0,0 +1,84 @@
+# tests/test_runtime_config.py
+import copy
+import dataclasses
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.pipeline import detect
+from shape_color_vision.utils.config import ConfigWatcher, compile_runtime, load_config
+from shape_color_vision.utils.synth import SceneSpec, make_scene
+
+CONFIG = ROOT / "configs" / "default.yaml"
+CFG = load_config(str(CONFIG))
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_compile_resolves_mode_sections():
+    image, camera = CFG.runtime("image"), CFG.runtime("camera")
+    assert (image.s_min, image.v_min) == (CFG.image_mask.s_min, CFG.image_mask.v_min)
+    assert (camera.s_min, camera.v_min) == (CFG.camera_mask.s_min, CFG.camera_mask.v_min)
+    assert image.filter_kwargs["min_area"] == CFG.image_detect.min_area
+    assert camera.filter_kwargs["min_area"] == CFG.camera_detect.min_area
+    assert camera.for_camera and not image.for_camera
+    with pytest.raises(ValueError):
+        compile_runtime(CFG, "video")
+
+
+def test_params_are_frozen_and_detached_from_cfg():
+    cfg = copy.deepcopy(CFG)
+    params = cfg.runtime("image")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        params.s_min = 0
+    with pytest.raises(TypeError):
+        params.filter_kwargs["min_area"] = 0
+    cfg.image_mask.s_min += 10
+    assert params.s_min == CFG.image_mask.s_min
+    assert cfg.runtime("image") != params
+
+
+@pytest.mark.parametrize("mode", ["image", "camera"])
+def test_detect_with_params_matches_config(mode):
+    img, _ = make_scene(SceneSpec(objects=8, seed=4))
+    a = detect(img, CFG, for_camera=mode == "camera")
+    b = detect(img, CFG.runtime(mode))
+    assert np.array_equal(a.bboxes, b.bboxes)
+    assert np.array_equal(a.shape_ids, b.shape_ids)
+    assert np.array_equal(a.color_ids, b.color_ids)
+
+
+def test_watcher_reloads_changed_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    shutil.copy(CONFIG, path)
+    clock = FakeClock()
+    watcher = ConfigWatcher(str(path), "camera", interval=1.0, clock=clock)
+    before = watcher.poll()
+
+    text = path.read_text(encoding="utf-8")
+    path.write_text(text.replace(f"s_min: {CFG.camera_mask.s_min}", "s_min: 77", 1) + "\n", encoding="utf-8")
+    clock.t = 0.5
+    assert watcher.poll() is before            # not due yet
+    clock.t = 1.5
+    after = watcher.poll()
+    assert after is not before and watcher.reloads == 1
+
+    # a broken save keeps the last good params
+    path.write_text("camera_mask: [unclosed\n", encoding="utf-8")
+    clock.t = 3.0
+    assert watcher.poll() is after
+    assert watcher.error is not None and watcher.reloads == 1
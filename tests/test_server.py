@@ -0,0 +1,129 @@
+# tests/test_server.py
+import base64
+import http.client
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import cv2
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.pipeline import detect
+from shape_color_vision.server import BatchTooLarge, Busy, DetectionService, make_server
+from shape_color_vision.utils.config import load_config
+
+CFG = load_config(str(ROOT / "configs" / "default.yaml"))
+SAMPLE = ROOT / "data" / "samples" / "shapes_test1.png"
+
+
+@pytest.fixture
+def served():
+    service = DetectionService(CFG.runtime("image"), workers=2, max_queue=2)
+    server = make_server(service, port=0, max_body_bytes=1 << 20)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    yield service, f"http://{host}:{port}"
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def _post(url, body, content_type="application/octet-stream"):
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": content_type}, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_single_image_matches_detect(served):
+    _, base = served
+    status, body = _post(base + "/detect", SAMPLE.read_bytes())
+    assert status == 200
+
+    expected = detect(cv2.imread(str(SAMPLE)), CFG)
+    assert body["width"] > 0 and body["height"] > 0
+    assert [(d["shape"], d["color"], d["bbox"]) for d in body["detections"]] == [
+        (r["shape"], r["color"], r["bbox"]) for r in expected.records()
+    ]
+
+
+def test_batch_reports_bad_images_individually(served):
+    _, base = served
+    good = base64.b64encode(SAMPLE.read_bytes()).decode()
+    bad = base64.b64encode(b"not an image").decode()
+    status, body = _post(base + "/detect/batch?contours=1", json.dumps({"images": [good, bad, good]}).encode(), "application/json")
+    assert status == 200
+    first, broken, last = body["results"]
+    assert "error" in broken
+    assert first["detections"] == last["detections"]
+    assert all("contour" in d for d in first["detections"])
+
+    status, _ = _post(base + "/detect/batch", b"{}", "application/json")
+    assert status == 400
+    status, _ = _post(base + "/detect", b"garbage")
+    assert status == 400
+
+
+def test_empty_images_are_reported_not_raised(served):
+    service, base = served
+    first, empty = service.detect_many([SAMPLE.read_bytes(), b""])
+    assert "detections" in first and "error" in empty
+
+    status, body = _post(base + "/detect", b"")
+    assert status == 400 and "error" in body
+    status, body = _post(base + "/detect/batch", json.dumps({"images": [""]}).encode(), "application/json")
+    assert status == 200 and "error" in body["results"][0]
+
+
+def test_bad_content_length_is_rejected(served):
+    _, base = served
+    host, port = base.rsplit("/", 1)[1].split(":")
+    for length in ("abc", "-5"):
+        conn = http.client.HTTPConnection(host, int(port), timeout=10)
+        conn.putrequest("POST", "/detect")
+        conn.putheader("Content-Length", length)
+        conn.endheaders()
+        resp = conn.getresponse()
+        assert resp.status == 400 and "Content-Length" in json.loads(resp.read())["error"]
+        conn.close()
+
+
+def test_backpressure_and_limits(served):
+    service, base = served
+    service.reserve(service.capacity)              # every slot taken
+    try:
+        status, body = _post(base + "/detect", SAMPLE.read_bytes())
+        assert status == 503 and "capacity" in body["error"]
+    finally:
+        service.release(service.capacity)
+
+    with pytest.raises(BatchTooLarge):             # a batch larger than the service
+        service.detect_many([b""] * (service.capacity + 1))
+    good = base64.b64encode(SAMPLE.read_bytes()).decode()
+    req = urllib.request.Request(
+        base + "/detect/batch", data=json.dumps({"images": [good] * (service.capacity + 1)}).encode(),
+        headers={"Content-Type": "application/json"}, method="POST",
+    )
+    with pytest.raises(urllib.error.HTTPError) as err:
+        urllib.request.urlopen(req, timeout=10)
+    assert err.value.code == 413 and err.value.headers.get("Retry-After") is None
+    assert f"limit of {service.capacity}" in json.loads(err.value.read())["error"]
+
+    status, _ = _post(base + "/detect", b"x" * ((1 << 20) + 1))
+    assert status == 413
+
+    with urllib.request.urlopen(base + "/health", timeout=10) as resp:
+        health = json.loads(resp.read())
+    assert health["status"] == "ok" and health["pending"] == 0
+    assert health["rejected"] >= 1 + 2 * (service.capacity + 1)
@@ -0,0 +1,100 @@
+# tests/test_streaming.py
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.streaming import _END, FrameQueue, StagedPipeline
+
+
+def _source(n_frames, delay=0.001):
+    count = [0]
+
+    def read():
+        count[0] += 1
+        time.sleep(delay)
+        return count[0] <= n_frames, np.full((4, 4, 3), count[0] % 256, np.uint8)
+    return read
+
+
+def _slow_process(frame):
+    time.sleep(0.005)
+    return frame.mean(), frame
+
+
+def test_block_policy_keeps_every_frame_in_order():
+    pipe = StagedPipeline(_source(30), _slow_process, queue_size=2, drop_policy="block")
+    with pipe:
+        indices = [f.index for f in pipe.frames()]
+    assert indices == list(range(30))
+    assert pipe.stats.dropped == 0
+    assert len(pipe.stats.latencies_ms) == 30
+    assert all(ms > 0 for ms in pipe.stats.latencies_ms)
+
+
+def test_latest_policy_drops_stale_frames_but_stays_ordered():
+    pipe = StagedPipeline(_source(60, delay=0.0), _slow_process, queue_size=1, drop_policy="latest")
+    with pipe:
+        indices = [f.index for f in pipe.frames()]
+    assert indices == sorted(indices)
+    assert len(indices) + pipe.stats.dropped == 60
+    assert pipe.stats.dropped > 0
+    assert indices[-1] == 59            # the end marker never evicts the last frame
+
+
+def test_end_marker_waits_behind_queued_frames():
+    q = FrameQueue(maxsize=1, policy="latest")
+    stop = threading.Event()
+    q.put("last", stop)
+    ender = threading.Thread(target=q.put_end, args=(stop,))
+    ender.start()
+    time.sleep(0.1)
+    assert q.get() == "last" and q.dropped == 0
+    ender.join(2)
+    assert q.get() is _END
+
+
+def test_consumer_can_stop_early():
+    pipe = StagedPipeline(_source(10_000, delay=0.0), _slow_process, queue_size=2, drop_policy="block")
+    with pipe:
+        for f in pipe.frames():
+            if f.index == 3:
+                break
+    assert len(pipe.stats.latencies_ms) == 4
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        StagedPipeline(_source(1), _slow_process, drop_policy="newest")
+
+
+def test_render_stage_builds_output_off_the_detection_thread():
+    import threading
+
+    threads = {}
+
+    def process(frame):
+        threads["detect"] = threading.current_thread().name
+        return frame.mean(), None
+
+    def render(frame, result):
+        threads["render"] = threading.current_thread().name
+        out = frame.copy()
+        out[0, 0] = 255
+        return out
+
+    pipe = StagedPipeline(_source(20), process, queue_size=2, drop_policy="block", render=render)
+    with pipe:
+        frames = list(pipe.frames())
+    assert [f.index for f in frames] == list(range(20))
+    assert all(f.output is not None and f.output[0, 0, 0] == 255 for f in frames)
+    assert all(f.image[0, 0, 0] != 255 for f in frames)       # input frames untouched
+    assert threads["detect"] != threads["render"]
@@ -0,0 +1,60 @@
+# tests/test_sweep.py
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.pipeline import detect
+from shape_color_vision.sweep import apply_params, load_labeled_set, parse_params, run_sweep
+from shape_color_vision.utils.config import load_config
+
+CFG = load_config(str(ROOT / "configs" / "default.yaml"))
+IMAGES = load_labeled_set(str(ROOT / "data" / "sample_labels.yaml"))
+
+
+def test_parse_params():
+    assert parse_params(["image_mask.s_min=30,40", "image_detect.scale=0.5"]) == {
+        "image_mask.s_min": [30, 40],
+        "image_detect.scale": [0.5],
+    }
+    with pytest.raises(ValueError):
+        parse_params(["image_mask.s_min"])
+
+
+def test_apply_params_copies_and_checks_keys():
+    cfg = apply_params(CFG, {"image_mask.s_min": 55})
+    assert cfg.image_mask.s_min == 55 and CFG.image_mask.s_min != 55
+    with pytest.raises(KeyError):
+        apply_params(CFG, {"image_mask.nope": 1})
+
+
+def test_reference_config_scores_perfectly():
+    rows, _ = run_sweep(IMAGES, CFG, {"image_mask.s_min": [CFG.image_mask.s_min]})
+    assert rows[0].f1 == 1.0 and rows[0].exact == len(IMAGES)
+
+
+def test_sweep_matches_detect_and_reuses_stages():
+    grid = {
+        "image_mask.s_min": [30, 60],
+        "image_detect.min_area": [800, 20000],
+        "image_detect.scale": [1.0, 0.5],
+    }
+    rows, stats = run_sweep(IMAGES, CFG, grid)
+    assert len(rows) == 8
+
+    for row in rows:
+        cfg = apply_params(CFG, row.params)
+        for item in IMAGES:
+            r = detect(item.img, cfg)
+            expected = Counter((r.shape(i), r.color(i)) for i in range(len(r)))
+            assert Counter(row.detections[item.name]) == expected, row.params
+
+    # one mask / label pass per (image, scale, s_min); min_area only re-filters
+    assert stats.mask_misses == stats.label_misses == 4 * len(IMAGES)
+    assert stats.mask_hits == 4 * len(IMAGES)
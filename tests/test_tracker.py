@@ -0,0 +1,100 @@
+# tests/test_tracker.py
+import csv
+import sqlite3
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import shape_color_vision.pipeline as pipeline
+from shape_color_vision.detection.tracker import ObjectTracker, iou_matrix
+from shape_color_vision.io.logger_csv import CSVLogger, TRACKED_HEADER
+from shape_color_vision.io.logger_sqlite import SQLiteLogger, query_detections
+from shape_color_vision.utils.config import load_config
+
+
+def _cfg():
+    return load_config(str(ROOT / "configs" / "default.yaml"))
+
+
+def _frame():
+    return cv2.imread(str(ROOT / "data" / "samples" / "shapes_test1.png"))
+
+
+def test_iou_matrix():
+    iou = iou_matrix([[0, 0, 10, 10]], [[0, 0, 10, 10], [5, 0, 10, 10], [20, 20, 5, 5]])
+    assert np.allclose(iou, [[1.0, 50 / 150, 0.0]])
+
+
+def test_static_scene_reuses_classification(monkeypatch):
+    cfg, img = _cfg(), _frame()
+    plain = pipeline.detect(img, cfg, for_camera=True)
+
+    calls = []
+    real = pipeline.classify_shape
+    monkeypatch.setattr(pipeline, "classify_shape", lambda f: calls.append(1) or real(f))
+
+    tracker = ObjectTracker(refresh_frames=10)
+    results = [pipeline.detect(img, cfg, for_camera=True, tracker=tracker) for _ in range(5)]
+
+    assert len(calls) == len(plain)  # classified on the first frame only
+    for res in results:
+        assert list(res.track_ids) == list(results[0].track_ids)
+        assert list(res) == list(plain)
+    assert len(set(results[0].track_ids)) == len(plain)
+
+
+def test_moved_object_is_reclassified_and_keeps_id():
+    tracker = ObjectTracker(stable_iou=0.9)
+    box = np.array([[100, 100, 50, 50]])
+    ids1, reuse1 = tracker.match(box, [2500.0])
+    tracker.record(ids1, box, [2500.0], [1], [2], [0.9], [0.8])
+    ids2, reuse2 = tracker.match(box + [8, 0, 0, 0], [2500.0])
+    assert not reuse1[0] and not reuse2[0]
+    assert ids1[0] == ids2[0]
+    ids3, reuse3 = tracker.match(box, [2500.0])
+    assert reuse3[0] and tracker.cached(ids3)[1][0] == 2
+
+
+def test_tracks_expire_after_misses():
+    tracker = ObjectTracker(max_misses=2)
+    tracker.match([[0, 0, 10, 10]], [100.0])
+    for _ in range(3):
+        tracker.match(np.zeros((0, 4)), [])
+    assert len(tracker) == 0
+
+
+def test_logs_one_row_per_tracked_object(tmp_path):
+    path = tmp_path / "det.csv"
+    with CSVLogger(str(path), track_ids=True) as logger:
+        logger.log("Circle", "red", 0.9, "CAMERA", "webcam", track_id=1)
+        logger.log("Circle", "red", 0.9, "CAMERA", "webcam", track_id=1)
+        logger.log("Circle", "red", 0.9, "CAMERA", "webcam", track_id=2)
+    with path.open(newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == TRACKED_HEADER
+    assert [r[-1] for r in rows[1:]] == ["1", "2"]
+
+
+def test_sqlite_store_migrates_old_schema(tmp_path):
+    db = str(tmp_path / "det.db")
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE detections (id INTEGER PRIMARY KEY, timestamp TEXT NOT NULL, shape TEXT NOT NULL, "
+                 "color TEXT NOT NULL, confidence REAL NOT NULL, source TEXT NOT NULL, name TEXT NOT NULL)")
+    conn.execute("CREATE UNIQUE INDEX ux_detections_key ON detections(shape, color, source, name)")
+    conn.execute("INSERT INTO detections VALUES (1, '2025-01-01T00:00:00', 'Circle', 'red', 0.9, 'CAMERA', 'webcam')")
+    conn.commit()
+    conn.close()
+
+    with SQLiteLogger(db, unique=True) as logger:
+        logger.log("Circle", "red", 0.9, "CAMERA", "webcam", track_id=7)
+        logger.log("Circle", "red", 0.9, "CAMERA", "webcam", track_id=8)
+    rows = query_detections(db)
+    assert [r["track_id"] for r in rows] == [-1, 7, 8]
+    assert len(query_detections(db, track_id=7)) == 1
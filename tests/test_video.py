@@ -0,0 +1,88 @@
+# tests/test_video.py
+import csv
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import yaml
+from typer.testing import CliRunner
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision.io.video import VideoSource, VideoWriterThread
+from shape_color_vision.main import app
+from shape_color_vision.utils.synth import SceneSpec, make_scene
+
+FPS = 10.0
+
+
+def _write_video(path, n=20):
+    """n frames of the same scene; the frame index is encoded in a gray corner patch."""
+    scene, _ = make_scene(SceneSpec(width=320, height=240, objects=3, seed=4))
+    w = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), FPS, (320, 240))
+    for i in range(n):
+        frame = scene.copy()
+        frame[:16, :16] = i * 10
+        w.write(frame)
+    w.release()
+
+
+def _indices(src):
+    out = []
+    while True:
+        ok, frame = src.read()
+        if not ok:
+            return out
+        assert round(frame[:16, :16].mean() / 10) == src.last_index
+        out.append(src.last_index)
+
+
+def test_stride_and_time_range(tmp_path):
+    path = tmp_path / "in.avi"
+    _write_video(path)
+    with VideoSource(str(path)) as src:
+        assert _indices(src) == list(range(20))
+    with VideoSource(str(path), stride=3) as src:
+        assert _indices(src) == [0, 3, 6, 9, 12, 15, 18]
+        assert src.output_fps == FPS / 3
+    with VideoSource(str(path), stride=2, start_s=0.5, end_s=1.2) as src:
+        assert _indices(src) == [5, 7, 9, 11]
+
+
+def test_writer_thread_round_trip(tmp_path):
+    out = tmp_path / "out.avi"
+    with VideoWriterThread(str(out), FPS, fourcc="MJPG", queue_size=2) as writer:
+        for i in range(12):
+            writer.write(np.full((48, 64, 3), i * 20, np.uint8))
+    assert writer.frames_written == 12
+    cap = cv2.VideoCapture(str(out))
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 12
+    cap.release()
+
+
+def test_video_command(tmp_path):
+    path = tmp_path / "in.avi"
+    _write_video(path)
+    cfg = yaml.safe_load((ROOT / "configs" / "default.yaml").read_text())
+    cfg["paths"].update(output_dir=str(tmp_path / "out"), log_csv=str(tmp_path / "det.csv"))
+    cfg["video"].update(show_window=False, save_output=False)
+    cfg["logging"]["dedup_capacity"] = None
+    cfg_path = tmp_path / "cfg.yaml"
+    cfg_path.write_text(yaml.safe_dump(cfg))
+
+    out = tmp_path / "annotated.avi"
+    res = CliRunner().invoke(app, [
+        "video", str(path), "-c", str(cfg_path), "--output", str(out), "--fourcc", "MJPG", "--stride", "4",
+    ])
+    assert res.exit_code == 0, res.output
+    cap = cv2.VideoCapture(str(out))
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 5
+    cap.release()
+
+    with open(tmp_path / "det.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows and {r["source"] for r in rows} == {"VIDEO"} and {r["name"] for r in rows} == {"in.avi"}
@@ -0,0 +1,89 @@
+# tests/test_workspace.py
+import copy
+import sys
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from shape_color_vision import profiling
+from shape_color_vision.pipeline import detect
+from shape_color_vision.utils.config import load_config
+from shape_color_vision.utils.synth import SceneSpec, make_scene
+from shape_color_vision.workspace import Workspace
+
+CFG = load_config(str(ROOT / "configs" / "default.yaml"))
+
+
+def _same(a, b):
+    assert np.array_equal(a.bboxes, b.bboxes)
+    assert np.array_equal(a.shape_ids, b.shape_ids)
+    assert np.array_equal(a.color_ids, b.color_ids)
+    assert np.allclose(a.color_conf, b.color_conf)
+    assert np.array_equal(a.points, b.points)
+
+
+def test_buffers_are_reused_and_grow_only():
+    ws = Workspace()
+    a = ws.get("x", (4, 5))
+    assert ws.get("x", (4, 5)).base is a.base
+    assert ws.get("x", (2, 3)).base is a.base        # smaller: view of the same buffer
+    assert ws.allocations == 1
+    ws.get("x", (8, 8))
+    ws.get("x", (4, 5), np.int32)
+    assert ws.allocations == 3
+    assert not ws.zeros("y", (3, 3)).any()
+
+
+@pytest.mark.parametrize("scale", [1.0, 0.5])
+def test_results_match_detect_without_workspace(scale):
+    cfg = copy.deepcopy(CFG)
+    cfg.camera_detect.scale = scale
+    ws = Workspace()
+    for seed in range(3):
+        img, _ = make_scene(SceneSpec(width=480, height=360, objects=8, seed=seed))
+        _same(detect(img, cfg, for_camera=True, workspace=ws), detect(img, cfg, for_camera=True))
+
+
+def test_steady_state_allocates_nothing_new():
+    ws = Workspace()
+    frames = [make_scene(SceneSpec(width=640, height=480, objects=10, seed=s))[0] for s in range(4)]
+    detect(frames[0], CFG, for_camera=True, workspace=ws)
+    warm = ws.allocations
+
+    prof = profiling.enable()
+    try:
+        for img in frames[1:]:
+            detect(img, CFG, for_camera=True, workspace=ws)
+    finally:
+        profiling.disable()
+    assert ws.allocations == warm
+    assert all("alloc" not in f["counts"] for f in prof.frames)
+
+
+def _peak_bytes(fn):
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def test_workspace_lowers_per_frame_peak_memory():
+    img, _ = make_scene(SceneSpec(width=1280, height=720, objects=10, seed=1))
+    ws = Workspace()
+    detect(img, CFG, for_camera=True, workspace=ws)   # warm up
+
+    fresh = _peak_bytes(lambda: detect(img, CFG, for_camera=True))
+    pooled = _peak_bytes(lambda: detect(img, CFG, for_camera=True, workspace=ws))
+    # the HSV frame alone is w*h*3 bytes; pooled frames must not allocate it again
+    assert fresh - pooled > img.size